@@ -7,6 +7,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
 from oauth2client.service_account import ServiceAccountCredentials
+from backend.core.artist_directory import ArtistHandleDirectory
 
 # Replace with your Spotify API credentials
 CLIENT_ID = '796b5d9f1aee4442809aa268982ed067'
@@ -26,6 +27,8 @@ creds = ServiceAccountCredentials.from_json_keyfile_name('C:\\Aum.Music\\credent
 client = gspread.authorize(creds)
 spreadsheet_url = "https://docs.google.com/spreadsheets/d/1j8jRlbBJi_6GREbj9vhlUvv6SQXAFkZp32M4WLy0Wkk"
 sheet = client.open_by_url(spreadsheet_url).worksheet("IG Artist")
+# Same index the backend uses: the sheet is read once, new handles are written back in one batch
+artist_directory = ArtistHandleDirectory(sheet=sheet)
 
 # Configure logging
 log_file_path = 'script_log.log'
@@ -70,18 +73,9 @@ def smooth_scroll_to_element(driver, css_selector):
         return False
 
 
-def check_in_db(name):
+def check_in_db(name, artist_id=None):
     """Simple check for artist name in the database."""
-    try:
-        ig_user_col = sheet.col_values(4)  # IG user column
-        artist_name_col = sheet.col_values(1)  # Artist Name column
-    except Exception as e:
-        logging.error(f"Error accessing Google Sheet: {e}")
-        return "No"
-    if name in artist_name_col:
-        index = artist_name_col.index(name)
-        return sheet.cell(index + 1, 4).value or "NONE"
-    return "NONE"
+    return artist_directory.lookup(name=name, artist_id=artist_id) or "NONE"
 
 
 def check_instagram_profile(username):
@@ -125,7 +119,8 @@ def scrape_artist_pages(driver, artists_info):
             logging.warning(f"Element not found or timeout occurred: {e}")
 
         # Get db_status (simple check)
-        db_status = check_in_db(name)
+        artist_id = spotify_url.rstrip('/').split('/')[-1].split('?')[0]
+        db_status = check_in_db(name, artist_id)
         print(f"{name}: {instagram_username} (In DB: {db_status})")
         key = (name, instagram_username, db_status)
 
@@ -140,9 +135,14 @@ def scrape_artist_pages(driver, artists_info):
             else:
                 valid_username = "NONE"
             key = (name, valid_username, db_status)
+            if valid_username not in ("NONE", db_status):
+                artist_directory.record(name, valid_username, artist_id)
+        elif instagram_username != "NONE":
+            artist_directory.record(name, instagram_username, artist_id)
 
         instagram_accounts[key] = instagram_accounts.get(key, 0) + 1
 
+    artist_directory.flush()
     return instagram_accounts
 
 
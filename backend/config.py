@@ -17,6 +17,23 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "super_secret_key_change_me") 
     FRONTEND_URL = os.getenv("FRONTEND_URL", "http://127.0.0.1:5174")
     
+    # Worker threads per scan; the Spotify HTTP pools are sized from this
+    SCAN_CONCURRENCY = int(os.getenv("SCAN_CONCURRENCY", "5"))
+
+    # Scan planning: runs estimated above SCAN_CALL_BUDGET Spotify calls are refused (0 = no limit);
+    # scans bigger than one burst are paced at SPOTIFY_CALLS_PER_SEC
+    SCAN_CALL_BUDGET = int(os.getenv("SCAN_CALL_BUDGET", "0"))
+    SPOTIFY_CALLS_PER_SEC = float(os.getenv("SPOTIFY_CALLS_PER_SEC", "5"))
+    SPOTIFY_BURST_CALLS = int(os.getenv("SPOTIFY_BURST_CALLS", "150"))
+
+    # Public URL of this service, used to self-chain budgeted automation runs
+    SELF_URL = os.getenv("SELF_URL")
+
+    # Artist -> Instagram handle sheet (optional, falls back to local storage)
+    ARTIST_SHEET_URL = os.getenv("ARTIST_SHEET_URL")
+    ARTIST_SHEET_TAB = os.getenv("ARTIST_SHEET_TAB", "IG Artist")
+    GOOGLE_SHEETS_CREDENTIALS = os.getenv("GOOGLE_SHEETS_CREDENTIALS")
+
     # Scopes
     SCOPE = 'playlist-modify-public playlist-modify-private user-follow-read user-follow-modify user-library-read user-library-modify user-read-email user-read-private'
 
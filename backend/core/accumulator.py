@@ -0,0 +1,172 @@
+import zlib
+import datetime
+import threading
+from .storage_manager import storage
+from .engine import get_normalized_key
+
+ACCUMULATOR_FILE = "cache/weekly_accumulator.json"
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def week_bounds(today, finalize_day):
+    """The 7-day window ending on the next `finalize_day` (today included)."""
+    target = WEEKDAYS.index(finalize_day.lower()) if finalize_day.lower() in WEEKDAYS else 4
+    week_end = today + datetime.timedelta(days=(target - today.weekday()) % 7)
+    return week_end - datetime.timedelta(days=6), week_end
+
+
+def slice_of(artist_id, count):
+    """Stable roster slicing (crc32, not hash(), so it survives restarts)."""
+    return zlib.crc32(artist_id.encode("utf-8")) % count
+
+
+def artist_in_slice(artist_id, index, count):
+    return slice_of(artist_id, count) == index
+
+
+class WeeklyAccumulator:
+    """
+    Persisted result set for the current week. Daily automation runs append
+    their kept tracks (deduplicated by track ID and by normalized name/artists);
+    the run on the finalize day exports the accumulated set and starts a new week.
+    """
+
+    def __init__(self, filename=ACCUMULATOR_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+
+    def _empty(self, week_start, week_end):
+        return {
+            "week_start": week_start.isoformat(),
+            "week_end": week_end.isoformat(),
+            "tracks": [],
+            "runs": [],
+            "scanned_until": None,
+            "slice_scanned_until": {}  # Slice index -> last end_date checked for that slice
+        }
+
+    @staticmethod
+    def _next_day(date_str):
+        return datetime.date.fromisoformat(date_str) + datetime.timedelta(days=1) if date_str else None
+
+    def load(self, today, finalize_day):
+        week_start, week_end = week_bounds(today, finalize_day)
+        data = storage.load_json(self.filename)
+        if not data or data.get("week_start") != week_start.isoformat():
+            data = self._empty(week_start, week_end)
+        return data
+
+    def plan_run(self, config, today=None):
+        """
+        Turns the automation config into the settings for today's mini-scan.
+        'window' strategy: every artist, only the days not scanned yet this week.
+        'slice' strategy: one rotating slice of the roster, from the day after
+        that slice was last checked. The finalize-day run re-checks each slice
+        only for the days since its own last check (settings 'slice_starts'),
+        so releases later in the week than an artist's slice run still make
+        the export without re-scanning the week.
+        """
+        today = today or datetime.date.today()
+        finalize_day = config.get("run_day", "friday")
+        data = self.load(today, finalize_day)
+        week_start = datetime.date.fromisoformat(data["week_start"])
+        week_end = datetime.date.fromisoformat(data["week_end"])
+
+        settings = dict(config.get("settings", {}))
+        settings["accumulate"] = True
+        settings["finalize"] = today >= week_end
+
+        if config.get("daily_strategy", "window") == "slice":
+            slices = max(1, int(config.get("roster_slices", 7)))
+            coverage = data.get("slice_scanned_until") or {}
+
+            def slice_start(index):
+                return max(filter(None, [week_start, self._next_day(coverage.get(str(index)))]))
+
+            if settings["finalize"]:
+                settings.pop("artist_slice", None)
+                # Slices already checked through today are left out
+                starts = {str(index): slice_start(index) for index in range(slices) if slice_start(index) <= today}
+                settings["slice_starts"] = {index: start.isoformat() for index, start in starts.items()}
+                settings["slice_count"] = slices
+                start = min(starts.values(), default=today)
+            else:
+                index = (today - week_start).days % slices
+                settings["artist_slice"] = [index, slices]
+                start = slice_start(index)
+            settings["start_date"] = min(start, today).isoformat()
+        else:
+            scanned_until = data.get("scanned_until")
+            start = week_start
+            if scanned_until:
+                start = max(week_start, datetime.date.fromisoformat(scanned_until) + datetime.timedelta(days=1))
+            settings["start_date"] = min(start, today).isoformat()
+
+        settings["end_date"] = today.isoformat()
+        settings["week_start"] = data["week_start"]
+        settings["week_end"] = data["week_end"]
+        return settings
+
+    def add(self, tracks, settings):
+        """Merges a run's kept tracks into the week. Returns how many were new."""
+        today = datetime.date.fromisoformat(settings["end_date"])
+        week_end = datetime.date.fromisoformat(settings["week_end"])
+        with self.lock:
+            data = self.load(today, WEEKDAYS[week_end.weekday()])
+            seen_ids = {t.get("id") for t in data["tracks"]}
+            seen_keys = {get_normalized_key(t) for t in data["tracks"]}
+
+            added = 0
+            for track in tracks:
+                key = get_normalized_key(track)
+                if track.get("id") in seen_ids or key in seen_keys:
+                    continue
+                data["tracks"].append(track)
+                seen_ids.add(track.get("id"))
+                seen_keys.add(key)
+                added += 1
+
+            data["scanned_until"] = max(filter(None, [data.get("scanned_until"), settings["end_date"]]))
+            checked = []
+            if settings.get("artist_slice"):
+                checked = [str(settings["artist_slice"][0])]
+            elif settings.get("slice_starts") is not None:
+                checked = list(settings["slice_starts"])
+            coverage = data.setdefault("slice_scanned_until", {})
+            for index in checked:
+                coverage[index] = max(filter(None, [coverage.get(index), settings["end_date"]]))
+            data["runs"].append({
+                "at": datetime.datetime.now().isoformat(),
+                "start_date": settings["start_date"],
+                "end_date": settings["end_date"],
+                "artist_slice": settings.get("artist_slice"),
+                "slice_starts": settings.get("slice_starts"),
+                "found": len(tracks),
+                "added": added
+            })
+            storage.save_json(self.filename, data)
+        return added
+
+    def finalize(self, settings):
+        """Returns the week's tracks and clears the accumulator for the next week."""
+        with self.lock:
+            data = storage.load_json(self.filename) or {}
+            if data.get("week_start") != settings["week_start"]:
+                return []
+            tracks = data.get("tracks", [])
+            storage.save_json(self.filename, {**data, "tracks": [], "finalized_at": datetime.datetime.now().isoformat(), "exported": len(tracks)})
+            return tracks
+
+    def get_summary(self, finalize_day="friday"):
+        data = self.load(datetime.date.today(), finalize_day)
+        return {
+            "week_start": data["week_start"],
+            "week_end": data["week_end"],
+            "tracks": len(data.get("tracks", [])),
+            "scanned_until": data.get("scanned_until"),
+            "runs": data.get("runs", [])[-7:]
+        }
+
+# Global instance
+weekly_accumulator = WeeklyAccumulator()
@@ -0,0 +1,130 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+from .storage_manager import storage
+
+ALBUM_CACHE_FILE = "cache/album_tracks_cache.json"
+
+DEFAULT_MAX_ALBUMS = 20000
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_TTL_SEC = None  # Released track lists practically never change
+
+
+def slim_track(track, album):
+    """Keeps only the fields the filter, dashboard and export stages read."""
+    return {
+        'id': track.get('id'),
+        'name': track.get('name'),
+        'uri': track.get('uri'),
+        'duration_ms': track.get('duration_ms'),
+        'explicit': track.get('explicit', False),
+        'track_number': track.get('track_number'),
+        'disc_number': track.get('disc_number'),
+        'artists': [{'id': a.get('id'), 'name': a.get('name')} for a in track.get('artists', [])],
+        'album': {
+            'id': album['id'],
+            'name': album['name'],
+            'images': album.get('images', []),
+            'release_date': album.get('release_date')
+        }
+    }
+
+
+def slim_album_tracks(album):
+    items = (album.get('tracks') or {}).get('items') or []
+    return [slim_track(t, album) for t in items if t]
+
+
+class AlbumTrackCache:
+    """
+    Persistent album ID -> slimmed track list cache shared by every scan.
+    LRU-ordered and bounded by album count and approximate serialized size,
+    with an optional staleness TTL. Thread-safe for the scan worker pool.
+    """
+
+    def __init__(self, filename=ALBUM_CACHE_FILE, max_albums=DEFAULT_MAX_ALBUMS,
+                 max_bytes=DEFAULT_MAX_BYTES, ttl_sec=DEFAULT_TTL_SEC):
+        self.filename = filename
+        self.max_albums = max_albums
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.lock = threading.Lock()
+        self.entries = None  # album_id -> {"tracks", "stored_at", "size"}
+        self.total_bytes = 0
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_loaded(self):
+        if self.entries is not None:
+            return
+        loaded = storage.load_json(self.filename, {}) or {}
+        # Stored oldest-used first, so OrderedDict order is the LRU order
+        self.entries = OrderedDict(loaded.get("albums", []))
+        self.total_bytes = sum(e.get("size", 0) for e in self.entries.values())
+
+    def _is_fresh(self, entry):
+        return self.ttl_sec is None or time.time() - entry["stored_at"] <= self.ttl_sec
+
+    def get_many(self, album_ids):
+        """Returns ({album_id: tracks} for fresh hits, [missing album_ids])."""
+        found = {}
+        missing = []
+        with self.lock:
+            self._ensure_loaded()
+            for aid in album_ids:
+                entry = self.entries.get(aid)
+                if entry is not None and self._is_fresh(entry):
+                    self.entries.move_to_end(aid)
+                    found[aid] = entry["tracks"]
+                else:
+                    missing.append(aid)
+            self.hits += len(found)
+            self.misses += len(missing)
+            if found:
+                self.dirty = True  # LRU order changed
+        return found, missing
+
+    def cached_ids(self, album_ids):
+        """The album IDs with a fresh entry, without touching LRU order or hit counters (for estimates)."""
+        with self.lock:
+            self._ensure_loaded()
+            return {aid for aid in album_ids if aid in self.entries and self._is_fresh(self.entries[aid])}
+
+    def put(self, album_id, tracks):
+        size = len(json.dumps(tracks, default=str))
+        with self.lock:
+            self._ensure_loaded()
+            old = self.entries.pop(album_id, None)
+            if old is not None:
+                self.total_bytes -= old.get("size", 0)
+            self.entries[album_id] = {"tracks": tracks, "stored_at": time.time(), "size": size}
+            self.total_bytes += size
+            self._evict()
+            self.dirty = True
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_albums or self.total_bytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.get("size", 0)
+
+    def save(self):
+        with self.lock:
+            if self.entries is None or not self.dirty:
+                return
+            storage.save_json(self.filename, {"albums": list(self.entries.items())})
+            self.dirty = False
+
+    def stats(self):
+        with self.lock:
+            self._ensure_loaded()
+            return {
+                "albums": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+# Global instance
+album_cache = AlbumTrackCache()
@@ -0,0 +1,207 @@
+import json
+import time
+import sqlite3
+import datetime
+import threading
+from .storage_manager import storage
+from .engine import log_message
+
+ARCHIVE_FILE = "cache/scan_archive.sqlite"
+MAX_PUSH_ATTEMPTS = 3
+READ_REFRESH_SEC = 300   # Pick up other instances' appends on GCS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    scan_id TEXT UNIQUE NOT NULL,
+    week TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    started_at TEXT,
+    finished_at TEXT,
+    duration_sec REAL,
+    api_calls INTEGER,
+    kept_count INTEGER,
+    excluded_count INTEGER,
+    settings TEXT
+);
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    scan INTEGER NOT NULL REFERENCES scans(id),
+    week TEXT NOT NULL,
+    track_id TEXT,
+    name TEXT,
+    artist_id TEXT,
+    artist_name TEXT,
+    album_id TEXT,
+    album_name TEXT,
+    release_date TEXT,
+    duration_ms INTEGER,
+    explicit INTEGER,
+    kept INTEGER NOT NULL,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS credits (
+    artist_id TEXT NOT NULL,
+    track INTEGER NOT NULL REFERENCES tracks(id)
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_release ON tracks(release_date);
+CREATE INDEX IF NOT EXISTS idx_tracks_week ON tracks(week, kept);
+CREATE INDEX IF NOT EXISTS idx_tracks_track ON tracks(track_id);
+CREATE INDEX IF NOT EXISTS idx_tracks_artist ON tracks(artist_id, release_date);
+CREATE INDEX IF NOT EXISTS idx_credits_artist ON credits(artist_id);
+"""
+
+
+def iso_week(date_str):
+    year, week, _ = datetime.date.fromisoformat(date_str).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _track_row(scan_rowid, week, track, kept, reason):
+    artists = track.get('artists') or [{}]
+    album = track.get('album') or {}
+    return (
+        scan_rowid, week, track.get('id'), track.get('name'),
+        artists[0].get('id'), artists[0].get('name'),
+        album.get('id'), album.get('name'), album.get('release_date'),
+        track.get('duration_ms'), int(bool(track.get('explicit'))), int(kept), reason
+    )
+
+
+class ScanArchive:
+    """
+    Append-only SQLite history of every finished scan: settings, timing, API
+    calls, and each kept or excluded track (slim columns, no images). Indexed by
+    artist (primary and credited), release date and scan week. On GCS the
+    database is worked on as a local copy and pushed back with a generation
+    check, so two instances appending at once don't lose a scan.
+    """
+
+    def __init__(self, filename=ARCHIVE_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.local_path = None
+        self.fetched_at = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.local_path)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _refresh(self, force=False):
+        if self.local_path is None:
+            self.local_path = storage.local_path_for(self.filename)
+        if force or time.time() - self.fetched_at > READ_REFRESH_SEC:
+            version = storage.fetch_file(self.filename, self.local_path)
+            self.fetched_at = time.time()
+            return version
+        return None
+
+    # --- Writing ---
+
+    def record_scan(self, scan_id, settings, kept, excluded, run_stats=None):
+        """Appends one scan. `excluded` is [{'track', 'reason'}] as returned by refilter."""
+        run_stats = run_stats or {}
+        week = iso_week(settings.get('week_end') or settings['end_date'])
+        scan_row = (
+            scan_id, week, settings.get('start_date'), settings.get('end_date'),
+            run_stats.get('started_at'), datetime.datetime.now().isoformat(),
+            run_stats.get('duration_sec'), run_stats.get('api_calls'),
+            len(kept), len(excluded), json.dumps(settings, default=str)
+        )
+
+        with self.lock:
+            for attempt in range(MAX_PUSH_ATTEMPTS):
+                version = self._refresh(force=True)
+                conn = self._connect()
+                try:
+                    with conn:
+                        if conn.execute("SELECT 1 FROM scans WHERE scan_id = ?", (scan_id,)).fetchone():
+                            return 0
+                        scan_rowid = conn.execute(
+                            "INSERT INTO scans (scan_id, week, start_date, end_date, started_at, finished_at, "
+                            "duration_sec, api_calls, kept_count, excluded_count, settings) VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                            scan_row
+                        ).lastrowid
+                        rows = [_track_row(scan_rowid, week, t, True, None) for t in kept]
+                        rows += [_track_row(scan_rowid, week, e['track'], False, e['reason']) for e in excluded]
+                        all_tracks = kept + [e['track'] for e in excluded]
+                        credits = []
+                        for track, row in zip(all_tracks, rows):
+                            rowid = conn.execute(
+                                "INSERT INTO tracks (scan, week, track_id, name, artist_id, artist_name, album_id, "
+                                "album_name, release_date, duration_ms, explicit, kept, reason) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)",
+                                row
+                            ).lastrowid
+                            credits.extend((a['id'], rowid) for a in track.get('artists', []) if a.get('id'))
+                        conn.executemany("INSERT INTO credits (artist_id, track) VALUES (?, ?)", credits)
+                finally:
+                    conn.close()
+
+                if storage.push_file_if_version(self.local_path, self.filename, version) is not None:
+                    log_message(f"Archive: recorded scan {scan_id} ({len(kept)} kept, {len(excluded)} excluded, week {week})")
+                    return len(rows)
+                log_message(f"Archive: concurrent update, retrying ({attempt + 1}/{MAX_PUSH_ATTEMPTS})")
+        log_message(f"Archive: gave up recording scan {scan_id}")
+        return 0
+
+    # --- Queries ---
+
+    def _query(self, sql, params=()):
+        with self.lock:
+            self._refresh()
+            conn = self._connect()
+            try:
+                return [dict(row) for row in conn.execute(sql, params).fetchall()]
+            finally:
+                conn.close()
+
+    def list_scans(self, limit=50):
+        return self._query(
+            "SELECT scan_id, week, start_date, end_date, started_at, finished_at, duration_sec, api_calls, "
+            "kept_count, excluded_count FROM scans ORDER BY id DESC LIMIT ?", (limit,)
+        )
+
+    def artist_history(self, artist_id, limit=100):
+        """Releases the artist was credited on across all scans, newest first."""
+        releases = self._query(
+            "SELECT t.album_id, t.album_name, t.release_date, MIN(t.week) AS first_week, "
+            "COUNT(DISTINCT t.track_id) AS tracks, COUNT(DISTINCT CASE WHEN t.kept THEN t.track_id END) AS kept "
+            "FROM credits c JOIN tracks t ON t.id = c.track WHERE c.artist_id = ? "
+            "GROUP BY t.album_id ORDER BY t.release_date DESC LIMIT ?",
+            (artist_id, limit)
+        )
+        return {
+            "artist_id": artist_id,
+            "releases": releases,
+            "weeks_with_kept_tracks": len({r["first_week"] for r in releases if r["kept"]}),
+            "last_release": releases[0]["release_date"] if releases else None
+        }
+
+    def week_summary(self, week):
+        scans = self._query(
+            "SELECT scan_id, start_date, end_date, kept_count, excluded_count, duration_sec, api_calls "
+            "FROM scans WHERE week = ? ORDER BY id", (week,)
+        )
+        reasons = self._query(
+            "SELECT COALESCE(SUBSTR(reason, 1, INSTR(reason || ':', ':') - 1), 'kept') AS reason, COUNT(*) AS tracks "
+            "FROM tracks WHERE week = ? GROUP BY 1 ORDER BY 2 DESC", (week,)
+        )
+        kept = self._query(
+            "SELECT DISTINCT track_id, name, artist_name, album_name, release_date FROM tracks "
+            "WHERE week = ? AND kept = 1 ORDER BY artist_name", (week,)
+        )
+        return {"week": week, "scans": scans, "reasons": reasons, "kept": kept}
+
+    def artist_activity(self, since_date, limit=500):
+        """Kept-release counts per primary artist since a date, most active first (for prioritizing the roster)."""
+        return self._query(
+            "SELECT artist_id, artist_name, COUNT(DISTINCT album_id) AS releases, MAX(release_date) AS last_release "
+            "FROM tracks WHERE release_date >= ? AND kept = 1 GROUP BY artist_id ORDER BY releases DESC LIMIT ?",
+            (since_date, limit)
+        )
+
+# Global instance
+scan_archive = ScanArchive()
@@ -0,0 +1,190 @@
+import datetime
+import threading
+import importlib.util
+from typing import Dict, List, Optional
+from .storage_manager import storage
+from ..config import settings as app_settings
+
+# gspread is only needed when the directory is backed by the Google Sheet,
+# so it's imported when the sheet is opened, not at startup
+GSPREAD_AVAILABLE = importlib.util.find_spec("gspread") is not None
+
+ARTIST_HANDLES_FILE = "cache/artist_handles.json"
+
+# Legacy "IG Artist" sheet layout (0-based): A = Artist Name, D = IG user
+SHEET_NAME_COL = 0
+SHEET_HANDLE_COL = 3
+SHEET_ROW_WIDTH = 4
+
+
+def normalize_artist_name(name):
+    return " ".join(name.lower().split())
+
+
+class ArtistHandleDirectory:
+    """
+    In-memory artist -> Instagram handle index.
+    The sheet (or the local file standing in for it) is read once per load; lookups
+    by Spotify ID or normalized name are dict hits. New findings are buffered and
+    written back in one batch by flush().
+    """
+
+    def __init__(self, filename=ARTIST_HANDLES_FILE, sheet=None):
+        self.filename = filename
+        self.sheet = sheet  # An already opened worksheet (legacy scripts); else opened from settings
+        self.lock = threading.Lock()
+        self.by_id: Dict[str, dict] = {}
+        self.by_name: Dict[str, dict] = {}
+        self.pending: List[dict] = []
+        self.sheet_rows: Dict[str, int] = {}  # normalized name -> 1-based sheet row
+        self.sheet_row_count = 0
+        self.loaded = False
+
+    # --- Loading ---
+
+    def _get_sheet(self):
+        if self.sheet is not None:
+            return self.sheet
+        if not (GSPREAD_AVAILABLE and app_settings.ARTIST_SHEET_URL and app_settings.GOOGLE_SHEETS_CREDENTIALS):
+            return None
+        import gspread
+        client = gspread.service_account(filename=app_settings.GOOGLE_SHEETS_CREDENTIALS)
+        return client.open_by_url(app_settings.ARTIST_SHEET_URL).worksheet(app_settings.ARTIST_SHEET_TAB)
+
+    def _index(self, entry):
+        if entry.get("spotify_id"):
+            self.by_id[entry["spotify_id"]] = entry
+        if entry.get("name"):
+            self.by_name[normalize_artist_name(entry["name"])] = entry
+
+    def load(self, force=False):
+        """Loads the local store, then overlays the sheet (one get_all_values call) if configured."""
+        with self.lock:
+            if self.loaded and not force:
+                return
+            self.by_id = {}
+            self.by_name = {}
+            self.sheet_rows = {}
+
+            for entry in storage.load_json(self.filename, {}).get("entries", []):
+                self._index(entry)
+
+            try:
+                sheet = self._get_sheet()
+                if sheet is not None:
+                    rows = sheet.get_all_values()
+                    self.sheet_row_count = len(rows)
+                    for row_number, row in enumerate(rows[1:], start=2):  # Skip header
+                        if not row or not row[SHEET_NAME_COL].strip():
+                            continue
+                        name = row[SHEET_NAME_COL].strip()
+                        handle = row[SHEET_HANDLE_COL].strip() if len(row) > SHEET_HANDLE_COL else ""
+                        key = normalize_artist_name(name)
+                        existing = self.by_name.get(key, {})
+                        self.sheet_rows[key] = row_number
+                        self._index({
+                            "name": name,
+                            "spotify_id": existing.get("spotify_id"),
+                            "handle": handle or existing.get("handle"),
+                            "source": "sheet"
+                        })
+                    print(f"ArtistHandleDirectory: Loaded {len(rows) - 1} rows from sheet")
+            except Exception as e:
+                print(f"ArtistHandleDirectory: Error loading sheet, using local store only: {e}")
+
+            self.loaded = True
+
+    # --- Lookups ---
+
+    def lookup(self, name: Optional[str] = None, artist_id: Optional[str] = None) -> Optional[str]:
+        """Returns the known handle for an artist, or None."""
+        entry = self.get_entry(name, artist_id)
+        return entry.get("handle") if entry else None
+
+    def get_entry(self, name: Optional[str] = None, artist_id: Optional[str] = None) -> Optional[dict]:
+        self.load()
+        if artist_id and artist_id in self.by_id:
+            return self.by_id[artist_id]
+        if name:
+            return self.by_name.get(normalize_artist_name(name))
+        return None
+
+    # --- Writes ---
+
+    def record(self, name: str, handle: Optional[str], artist_id: Optional[str] = None, source="spotify"):
+        """Adds or updates an entry in memory and queues it for the next flush(). Nameless artists are skipped."""
+        if not (name or "").strip():
+            return
+        self.load()
+        with self.lock:
+            existing = self.by_id.get(artist_id) if artist_id else None
+            if existing is None:
+                existing = self.by_name.get(normalize_artist_name(name))
+            if existing and existing.get("handle") == handle and (not artist_id or existing.get("spotify_id") == artist_id):
+                return
+
+            entry = {
+                "name": name,
+                "spotify_id": artist_id or (existing or {}).get("spotify_id"),
+                "handle": handle,
+                "source": source,
+                "updated_at": datetime.datetime.now().isoformat()
+            }
+            self._index(entry)
+            self.pending.append(entry)
+
+    def flush(self):
+        """
+        Persists the whole index through StorageManager, then writes back to the sheet
+        with one batch_update for known rows and one append_rows for new artists.
+        If either write fails the findings stay queued for the next flush().
+        """
+        with self.lock:
+            if not self.pending:
+                return 0
+            pending = self.pending
+            self.pending = []
+            entries = {id(e): e for e in list(self.by_id.values()) + list(self.by_name.values())}
+
+        try:
+            storage.save_json(self.filename, {"entries": list(entries.values())})
+            sheet = self._get_sheet()
+            if sheet is not None:
+                from gspread.utils import rowcol_to_a1
+                updates = []
+                new_rows = {}
+                for entry in pending:
+                    key = normalize_artist_name(entry["name"])
+                    if key in self.sheet_rows:
+                        cell = rowcol_to_a1(self.sheet_rows[key], SHEET_HANDLE_COL + 1)
+                        updates.append({"range": cell, "values": [[entry["handle"] or ""]]})
+                    else:
+                        row = [""] * SHEET_ROW_WIDTH
+                        row[SHEET_NAME_COL] = entry["name"]
+                        row[SHEET_HANDLE_COL] = entry["handle"] or ""
+                        new_rows[key] = row  # Last finding per artist wins
+                if updates:
+                    sheet.batch_update(updates, value_input_option="RAW")
+                if new_rows:
+                    sheet.append_rows(list(new_rows.values()), value_input_option="RAW")
+                    for key in new_rows:
+                        self.sheet_row_count += 1
+                        self.sheet_rows[key] = self.sheet_row_count
+        except Exception as e:
+            print(f"ArtistHandleDirectory: Error writing back, keeping {len(pending)} findings queued: {e}")
+            with self.lock:
+                self.pending = pending + self.pending
+            return 0
+
+        return len(pending)
+
+    def stats(self):
+        self.load()
+        return {
+            "by_id": len(self.by_id),
+            "by_name": len(self.by_name),
+            "pending": len(self.pending)
+        }
+
+# Global instance
+artist_directory = ArtistHandleDirectory()
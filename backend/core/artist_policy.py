@@ -0,0 +1,186 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from .storage_manager import storage
+
+ARTIST_POLICY_FILE = "cache/artist_policy.json"
+# The legacy script's lists; they seed the stored policy the first time it's read
+LEGACY_FILES = {"exclude": "ExclusionArtists.txt", "no_filter": "ArtistNoFilter.txt"}
+POLICY_LISTS = tuple(LEGACY_FILES)
+
+RELOAD_CHECK_SEC = 30        # How often the stored version is compared (one metadata read)
+MAX_UPDATE_ATTEMPTS = 3
+MAX_COMPILED_SETTINGS = 32   # Per-settings exclusion variants kept compiled
+
+ARTIST_ID_RE = re.compile(r"^[0-9A-Za-z]{22}$")
+ARTIST_LINK_RE = re.compile(r"(?:artist/|spotify:artist:)([0-9A-Za-z]{22})")
+
+
+def normalize_artist_name(name):
+    return " ".join((name or "").lower().split())
+
+
+def compile_entries(entries):
+    """
+    (IDs, normalized names) for free-form entries. Artist links and URIs are
+    IDs. Everything else goes into the name set, and bare 22-character base62
+    tokens into the ID set as well, so no entry depends on guessing its kind.
+    """
+    ids = set()
+    names = set()
+    for entry in entries:
+        entry = (entry or "").strip()
+        if not entry:
+            continue
+        link = ARTIST_LINK_RE.search(entry)
+        if link:
+            ids.add(link.group(1))
+            continue
+        if ARTIST_ID_RE.match(entry):
+            ids.add(entry)
+        names.add(normalize_artist_name(entry))
+    return frozenset(ids), frozenset(names)
+
+
+def _read_legacy(path):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except Exception as e:
+        print(f"ArtistPolicy: could not read {path}: {e}")
+        return []
+
+
+class ArtistPolicy:
+    """Immutable snapshot of the exclusion and no-filter lists as hash sets by ID and by normalized name."""
+
+    __slots__ = ("exclude_ids", "exclude_names", "no_filter_ids", "no_filter_names", "version")
+
+    def __init__(self, exclude_ids, exclude_names, no_filter_ids, no_filter_names, version=0):
+        self.exclude_ids = exclude_ids
+        self.exclude_names = exclude_names
+        self.no_filter_ids = no_filter_ids
+        self.no_filter_names = no_filter_names
+        self.version = version
+
+    def is_excluded(self, artist_id, artist_name=None):
+        return artist_id in self.exclude_ids or normalize_artist_name(artist_name) in self.exclude_names
+
+    def no_filter_for(self, artists):
+        """The engine's no_filter_artists: the no-filter IDs plus the given artists matched by name."""
+        if not self.no_filter_names:
+            return self.no_filter_ids
+        return self.no_filter_ids | {a['id'] for a in artists if normalize_artist_name(a.get('name')) in self.no_filter_names}
+
+    def with_exclusions(self, entries):
+        ids, names = compile_entries(entries)
+        return ArtistPolicy(self.exclude_ids | ids, self.exclude_names | names,
+                            self.no_filter_ids, self.no_filter_names, self.version)
+
+
+class ArtistPolicyIndex:
+    """
+    The stored artist lists ('exclude', 'no_filter'), compiled into one shared
+    ArtistPolicy. The stored file's version is re-checked at most every
+    RELOAD_CHECK_SEC, so edits from another instance or the API apply to the
+    next scan without a restart. A running scan keeps the snapshot it started with.
+    """
+
+    def __init__(self, filename=ARTIST_POLICY_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.lists = None
+        self.version = 0
+        self.policy = None
+        self.checked_at = 0
+        self.compiled = OrderedDict()   # (version, settings exclusions) -> ArtistPolicy
+        self.reloads = 0
+
+    def _load(self):
+        data, version = storage.load_json_versioned(self.filename)
+        if data is None:
+            data = {name: _read_legacy(path) for name, path in LEGACY_FILES.items()}
+            if any(data.values()):
+                new_version = storage.save_json_if_version(self.filename, data, 0)
+                if new_version is None:  # Another instance seeded it first
+                    data, new_version = storage.load_json_versioned(self.filename, {})
+                version = new_version
+                print(f"ArtistPolicy: seeded from legacy files ({', '.join(f'{k}: {len(v)}' for k, v in data.items())})")
+
+        self.lists = {name: list(data.get(name, [])) for name in POLICY_LISTS}
+        self.version = version
+        self.policy = ArtistPolicy(*compile_entries(self.lists["exclude"]), *compile_entries(self.lists["no_filter"]), version)
+        self.compiled.clear()
+        self.checked_at = time.time()
+        self.reloads += 1
+
+    def current(self):
+        with self.lock:
+            if self.policy is None:
+                self._load()
+            elif time.time() - self.checked_at > RELOAD_CHECK_SEC:
+                self.checked_at = time.time()
+                if storage.get_version(self.filename) != self.version:
+                    self._load()
+            return self.policy
+
+    def for_settings(self, settings):
+        """The stored policy plus the scan settings' own exclude_artists."""
+        policy = self.current()
+        extra = tuple(settings.get('exclude_artists') or ())
+        if not extra:
+            return policy
+        key = (policy.version, extra)
+        with self.lock:
+            compiled = self.compiled.get(key)
+            if compiled is None:
+                compiled = policy.with_exclusions(extra)
+                self.compiled[key] = compiled
+                if len(self.compiled) > MAX_COMPILED_SETTINGS:
+                    self.compiled.popitem(last=False)
+            else:
+                self.compiled.move_to_end(key)
+            return compiled
+
+    def update(self, list_name, add=(), remove=(), replace=None):
+        """Edits one stored list (compare-and-swap, retried) and reloads the index."""
+        if list_name not in POLICY_LISTS:
+            raise ValueError(f"Unknown list '{list_name}' (expected one of {', '.join(POLICY_LISTS)})")
+        self.current()  # Seeds the stored file on first use
+
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            data, version = storage.load_json_versioned(self.filename, {})
+            entries = list(replace) if replace is not None else list(data.get(list_name, []))
+            removed = {e.strip() for e in remove}
+            entries = [e for e in entries if e.strip() not in removed]
+            for entry in add:
+                if entry.strip() and entry.strip() not in entries:
+                    entries.append(entry.strip())
+            data[list_name] = entries
+            if storage.save_json_if_version(self.filename, data, version) is not None:
+                with self.lock:
+                    self._load()
+                return self.describe()
+        raise RuntimeError("Artist policy was updated concurrently, try again")
+
+    def describe(self):
+        self.current()
+        with self.lock:
+            return {**{name: list(entries) for name, entries in self.lists.items()}, **self._stats()}
+
+    def _stats(self):
+        return {
+            "version": self.version,
+            "exclude_ids": len(self.policy.exclude_ids),
+            "exclude_names": len(self.policy.exclude_names),
+            "no_filter_ids": len(self.policy.no_filter_ids),
+            "no_filter_names": len(self.policy.no_filter_names),
+            "reloads": self.reloads
+        }
+
+# Global instance
+artist_policy = ArtistPolicyIndex()
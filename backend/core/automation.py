@@ -5,15 +5,26 @@ import logging
 import datetime
 from .storage_manager import storage
 from ..config import settings as app_settings
-from spotipy.oauth2 import SpotifyOAuth
-from spotipy import Spotify
+from .token_manager import token_manager
+from .client_factory import client_factory
 
 AUTOMATION_FILE = "cache/automation_config.json"
 TOKENS_FILE = "cache/automation_tokens.json"
 
 class AutomationManager:
     def __init__(self):
-        self.config = self.load_config()
+        self._config = None
+
+    @property
+    def config(self):
+        # Loaded on first use so importing the app doesn't hit storage
+        if self._config is None:
+            self._config = self.load_config()
+        return self._config
+
+    @config.setter
+    def config(self, value):
+        self._config = value
 
     def load_config(self):
         return storage.load_json(AUTOMATION_FILE, {
@@ -45,21 +56,14 @@ class AutomationManager:
         if not token_info:
             raise Exception("No automation tokens found. Please run a manual scan first to authorize.")
 
-        # Create OAuth object
-        sp_oauth = SpotifyOAuth(
-            client_id=app_settings.SPOTIFY_CLIENT_ID,
-            client_secret=app_settings.SPOTIFY_CLIENT_SECRET,
-            redirect_uri=app_settings.SPOTIFY_REDIRECT_URI,
-            scope="user-library-read user-follow-read playlist-modify-private playlist-modify-public user-top-read"
-        )
-
-        # Refresh token logic
-        if sp_oauth.is_token_expired(token_info):
-            new_token = sp_oauth.refresh_access_token(token_info['refresh_token'])
-            self.save_tokens(new_token)
-            token_info = new_token
+        # Refresh through the shared token manager, so a headless run and the
+        # web session never refresh the same token concurrently
+        fresh_token = token_manager.get_user_token(token_info)
+        if fresh_token['access_token'] != token_info['access_token']:
+            self.save_tokens(fresh_token)
+            token_info = fresh_token
 
-        return Spotify(auth=token_info['access_token'])
+        return client_factory.user_client(token_info['access_token'])
 
     def should_run_now(self):
         # Logic to check if current time matches schedule (Not strictly needed if using Cron)
@@ -0,0 +1,220 @@
+import re
+import json
+import time
+import uuid
+import hashlib
+import datetime
+from ..config import settings as app_settings
+from .storage_manager import storage
+from .scanner import scanner
+from .album_cache import album_cache
+from .discography_cache import discography_cache
+from .candidate_cache import candidate_cache
+from .enrichment import enrichment_cache
+from .scan_windows import with_window_span
+from .scan_planner import estimate_scan, apply_pacing
+
+SCAN_JOB_FILE = "cache/scan_job.json"
+
+DEFAULT_BUDGET_SEC = 90       # gunicorn kills requests at 120s
+SAFETY_MARGIN_SEC = 15        # Leave room for the checkpoint and response
+LEASE_GRACE_SEC = 30
+CHUNK_SIZE = 20
+COMPLETED_KEYS_KEPT = 50      # Finished windows remembered, so re-triggers don't re-export
+DEFAULT_RATE_LIMIT_WAIT_SEC = 3600
+RETRY_AFTER_RE = re.compile(r"Wait time (\d+)s")
+
+
+def job_key(settings):
+    """
+    Identifies the run a job is for: its window and settings. Daily runs leave
+    start_date out, since a same-day re-trigger plans a later start for the same run.
+    """
+    keyed = {k: v for k, v in settings.items() if not (k == "start_date" and settings.get("accumulate"))}
+    return hashlib.sha1(json.dumps(keyed, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class BudgetedScanRunner:
+    """
+    Runs a scan as a series of short invocations. The first one freezes the roster
+    into a job document; every invocation then processes artists from the job's
+    cursor until its wall-clock budget (or SCAN_CALL_BUDGET API calls) is spent,
+    checkpoints, and reports 'continue', so scans too big for one run are
+    spread over several triggers instead of refused. A lease in the job document (written with compare-and-swap) keeps
+    two concurrent triggers from working on the same slice.
+    """
+
+    def __init__(self, filename=SCAN_JOB_FILE):
+        self.filename = filename
+
+    def _checkpoint(self, job, version):
+        new_version = storage.save_json_if_version(self.filename, job, version)
+        if new_version is None:
+            raise LeaseLost()
+        return new_version
+
+    def get_job_summary(self):
+        job, _ = storage.load_json_versioned(self.filename)
+        if not job:
+            return {"status": "none"}
+        return {
+            "job_id": job.get("job_id"),
+            "status": job.get("status"),
+            "cursor": job.get("cursor", 0),
+            "total": len(job.get("artists") or []),
+            "results_count": len(job.get("results", [])),
+            "steps": job.get("steps", 0),
+            "estimate": job.get("estimate"),
+            "lease": job.get("lease")
+        }
+
+    def live_lease(self, now=None):
+        """The running job's lease if it hasn't expired, i.e. a step may be scanning right now."""
+        now = time.time() if now is None else now
+        job, _ = storage.load_json_versioned(self.filename)
+        lease = (job or {}).get("lease") or {}
+        if job and job.get("status") == "running" and lease.get("expires_at", 0) > now:
+            return {"job_id": job["job_id"], "expires_in": int(lease["expires_at"] - now)}
+        return None
+
+    async def run_step(self, sp, app_sp, settings_factory, budget_sec=DEFAULT_BUDGET_SEC, auto_export_name=None):
+        started = time.time()
+        deadline = started + max(budget_sec - SAFETY_MARGIN_SEC, 5)
+        owner = uuid.uuid4().hex
+        work_sp = app_sp if app_sp else sp
+
+        job, version = storage.load_json_versioned(self.filename)
+        lease = (job or {}).get("lease") or {}
+        if job and job.get("status") == "running" and lease.get("expires_at", 0) > started:
+            return {"status": "busy", "job_id": job["job_id"], "lease_expires_in": int(lease["expires_at"] - started)}
+        if job and job.get("status") == "running" and job.get("retry_not_before", 0) > started:
+            return {"status": "rate_limited", "job_id": job["job_id"], "retry_after": int(job["retry_not_before"] - started)}
+        if scanner.get_status()["is_running"]:
+            # No live lease, so this is a full scan (/start or a non-budgeted run) using the scanner
+            return {"status": "busy", "message": "A full scan is running"}
+
+        if not job or job.get("status") != "running":
+            settings = with_window_span(settings_factory())
+            key = job_key(settings)
+            completed_keys = (job or {}).get("completed_keys", [])
+            if key in completed_keys:
+                return {"status": "completed", "job_id": job["job_id"], "key": key, "message": "This window was already scanned"}
+            job = {
+                "job_id": uuid.uuid4().hex[:12],
+                "key": key,
+                "completed_keys": completed_keys,
+                "created_at": datetime.datetime.now().isoformat(),
+                "settings": settings,
+                "status": "running",
+                "artists": None,
+                "plan": {},
+                "cursor": 0,
+                "results": [],
+                "steps": 0
+            }
+
+        job["lease"] = {"owner": owner, "expires_at": started + budget_sec + LEASE_GRACE_SEC}
+        job["steps"] = job.get("steps", 0) + 1
+        version = storage.save_json_if_version(self.filename, job, version)
+        if version is None:
+            return {"status": "busy", "job_id": job["job_id"]}
+
+        settings = job["settings"]
+        scanner.state["status"] = "scanning"
+        scanner.state["is_running"] = True
+        try:
+            executor = scanner.begin_scan_context()
+            if job["artists"] is None:
+                artists = await scanner.gather_artists(sp, settings)
+                params = scanner.build_scan_params(settings)
+                plan = await scanner.plan_feed_discovery(executor, work_sp, settings, artists, params)
+                job["artists"] = [{"id": a["id"], "name": a.get("name", "")} for a in artists]
+                job["plan"] = {k: v for k, v in plan.items() if v is not None}
+                job["estimate"] = estimate_scan(artists, settings)
+                version = self._checkpoint(job, version)
+
+            calls_at_start = scanner.scan_context.calls
+            params = scanner.build_scan_params(settings)
+            artists = job["artists"]
+            candidate_cache.resume(job["job_id"], settings)
+            scanner.state["total"] = len(artists)
+            scanner.state["plan"] = job.get("estimate")
+            scanner.mark_run_start(job["cursor"])
+            apply_pacing(scanner.scan_context.pacer, job.get("estimate"))
+            call_budget = app_settings.SCAN_CALL_BUDGET
+            critical_error = None
+
+            while job["cursor"] < len(artists) and time.time() < deadline:
+                if call_budget and scanner.scan_context.calls - calls_at_start >= call_budget:
+                    scanner.log(f"Budgeted scan: step used its {call_budget} call budget, continuing next trigger")
+                    break
+                chunk = artists[job["cursor"]:job["cursor"] + CHUNK_SIZE]
+                scanner.state["current_artist"] = f"Processing batch {job['cursor']}-{job['cursor'] + len(chunk)}"
+                kept, critical_error = await scanner.process_chunk(executor, work_sp, chunk, params, job["plan"])
+                if critical_error:
+                    # Don't advance the cursor: the next trigger after the wait retries this chunk
+                    scanner.log(f"⛔ CRITICAL ERROR (budgeted step): {critical_error}")
+                    wait = RETRY_AFTER_RE.search(critical_error)
+                    job["retry_not_before"] = time.time() + (int(wait.group(1)) if wait else DEFAULT_RATE_LIMIT_WAIT_SEC)
+                    break
+                job["results"].extend(kept)
+                job["cursor"] += len(chunk)
+                scanner.state["progress"] = job["cursor"]
+                scanner.state["results_count"] = len(job["results"])
+                version = self._checkpoint(job, version)
+
+            job["api_calls"] = job.get("api_calls", 0) + scanner.scan_context.calls - calls_at_start
+            job["elapsed_sec"] = round(job.get("elapsed_sec", 0) + time.time() - started, 1)
+            if job["cursor"] >= len(artists):
+                job["status"] = "completed"
+                job["completed_keys"] = (job.get("completed_keys", []) + [job.get("key")])[-COMPLETED_KEYS_KEPT:]
+
+            # Release the lease (and mark completion) before exporting, so a
+            # re-trigger can't export the same job twice
+            job["lease"] = None
+            self._checkpoint(job, version)
+
+            if job["status"] == "completed":
+                run_stats = {
+                    "scan_id": job["job_id"],
+                    "started_at": job["created_at"],
+                    "duration_sec": job["elapsed_sec"],
+                    "api_calls": job["api_calls"]
+                }
+                scanner.finish_scan(sp, settings, job["results"], auto_export_name, run_stats=run_stats)
+        except LeaseLost:
+            scanner.log("Budgeted scan: lease lost to another trigger, stopping this step.")
+            return {"status": "lease_lost", "job_id": job["job_id"]}
+        finally:
+            album_cache.save()
+            discography_cache.save()
+            candidate_cache.save()
+            enrichment_cache.save()
+            scanner.state["is_running"] = False
+            if job.get("status") == "running":
+                scanner.state["status"] = "paused"
+            scanner._save_state()
+
+        if critical_error:
+            return {
+                "status": "rate_limited",
+                "job_id": job["job_id"],
+                "cursor": job["cursor"],
+                "retry_after": int(job["retry_not_before"] - time.time()),
+                "message": critical_error
+            }
+        return {
+            "status": "completed" if job["status"] == "completed" else "continue",
+            "job_id": job["job_id"],
+            "cursor": job["cursor"],
+            "total": len(job["artists"]),
+            "results_count": len(job["results"]),
+            "step_sec": round(time.time() - started, 1)
+        }
+
+# Global instance
+budgeted_runner = BudgetedScanRunner()
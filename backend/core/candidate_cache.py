@@ -0,0 +1,153 @@
+import time
+import datetime
+import threading
+from .storage_manager import storage
+from .engine import classify_tracks, parse_release_date
+from .release_calendar import release_ordinal
+from .near_duplicates import dedup_near_duplicates
+from .enrichment import dedup_by_isrc
+from .artist_policy import artist_policy
+
+CANDIDATES_FILE = "cache/scan_candidates.json"
+
+
+def build_filter_options(settings):
+    """The filter_options dict process_artist gets for a scan's settings."""
+    album_types = settings.get('album_types', ['album', 'single'])
+    return {
+        "min_duration_ms": settings.get('min_duration_sec', 90) * 1000,
+        "max_duration_ms": settings.get('max_duration_sec', 270) * 1000,
+        "forbidden_keywords": settings.get('forbidden_keywords', []),
+        "include_groups": ",".join(album_types),
+        "skip_exported": settings.get('skip_exported', False)
+    }
+
+
+def entry_artists(albums):
+    """The roster artists of candidate entries, as the artist dicts ArtistPolicy.no_filter_for takes."""
+    return list({e['artist_id']: {'id': e['artist_id'], 'name': e['artist_name']} for e in albums}.values())
+
+
+class CandidateCache:
+    """
+    The last scan's raw (pre-filter) candidate tracks, per album, tagged with the
+    roster artist they were found for. refilter() re-runs the filter stage on it
+    with new settings, so changing durations, keywords or exclusions doesn't
+    need another scan.
+    """
+
+    def __init__(self, filename=CANDIDATES_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.data = None
+
+    def _load(self):
+        if self.data is None:
+            self.data = storage.load_json(self.filename) or {}
+        return self.data
+
+    def begin(self, scan_id, settings):
+        with self.lock:
+            self.data = {
+                "scan_id": scan_id,
+                "start_date": settings.get('start_date'),
+                "end_date": settings.get('end_date'),
+                "album_types": settings.get('album_types', ['album', 'single']),
+                "created_at": datetime.datetime.now().isoformat(),
+                "albums": {}
+            }
+
+    def resume(self, scan_id, settings):
+        """For scans split over several processes (budgeted steps): reuse the stored set if it's the same scan."""
+        with self.lock:
+            if self._load().get("scan_id") == scan_id:
+                return
+        self.begin(scan_id, settings)
+
+    def add(self, artist, candidates):
+        if not candidates:
+            return
+        with self.lock:
+            albums = self._load().setdefault("albums", {})
+            for album_id, entry in candidates.items():
+                albums.setdefault(album_id, {
+                    "artist_id": artist['id'],
+                    "artist_name": artist.get('name', ''),
+                    **entry
+                })
+
+    def save(self):
+        with self.lock:
+            if self.data:
+                storage.save_json(self.filename, self.data)
+
+    def select(self, settings):
+        """
+        The cached albums inside the settings' window and album types (which can only
+        narrow the scanned ones). Returns (scan info, albums) or raises ValueError.
+        """
+        with self.lock:
+            data = self._load()
+            albums = list(data.get("albums", {}).values())
+        if not data.get("scan_id"):
+            raise ValueError("No scan candidates cached yet. Run a scan first.")
+
+        start_date = parse_release_date(settings.get('start_date') or data["start_date"])
+        end_date = parse_release_date(settings.get('end_date') or data["end_date"])
+        if start_date < parse_release_date(data["start_date"]) or end_date > parse_release_date(data["end_date"]):
+            raise ValueError(f"Window outside the cached scan ({data['start_date']} - {data['end_date']}).")
+
+        album_types = set(settings.get('album_types') or data["album_types"])
+        lo_key, hi_key = start_date.toordinal(), end_date.toordinal()
+        selected = []
+        for entry in albums:
+            ordinal = release_ordinal(entry.get('release_date'))
+            if ordinal is None or not (lo_key <= ordinal <= hi_key):
+                continue
+            if entry.get('album_group') in album_types:
+                selected.append(entry)
+
+        scan = {k: data.get(k) for k in ("scan_id", "start_date", "end_date", "created_at")}
+        return scan, selected
+
+    def refilter(self, settings):
+        """Applies settings to the cached candidates. Returns kept tracks and excluded tracks with reasons."""
+        started = time.time()
+        try:
+            scan, albums = self.select(settings)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+        filter_options = build_filter_options(settings)
+        policy = artist_policy.for_settings(settings)
+        no_filter = policy.no_filter_for(entry_artists(albums))
+
+        kept = []
+        excluded = []
+        for entry in albums:
+            if policy.is_excluded(entry['artist_id'], entry['artist_name']):
+                excluded.extend({"track": t, "reason": "excluded artist"} for t in entry['tracks'])
+                continue
+            f_tracks, e_tracks = classify_tracks(entry['tracks'], no_filter, filter_options)
+            kept.extend(f_tracks)
+            excluded.extend({"track": t, "reason": reason} for t, reason in e_tracks)
+
+        if settings.get('enrich'):
+            kept, same_recording = dedup_by_isrc(kept)
+            excluded.extend({"track": t, "reason": reason} for t, reason in same_recording)
+
+        if settings.get('near_duplicate_threshold'):
+            kept, near_dups, _ = dedup_near_duplicates(kept, settings['near_duplicate_threshold'])
+            excluded.extend({"track": t, "reason": reason} for t, reason in near_dups)
+
+        return {
+            "status": "success",
+            "scan": scan,
+            "kept": kept,
+            "excluded": excluded,
+            "albums": len(albums),
+            "refilter_ms": int((time.time() - started) * 1000)
+        }
+
+# Global instance
+candidate_cache = CandidateCache()
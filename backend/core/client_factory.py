@@ -0,0 +1,97 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+import spotipy
+from .token_manager import AppTokenAuth, token_manager
+from ..config import settings as app_settings
+
+REQUESTS_TIMEOUT = 20
+POOL_HEADROOM = 4   # Request handlers running next to the scan threads
+
+
+class PooledSpotify(spotipy.Spotify):
+    """Spotify client on a shared session. spotipy closes its session on __del__, which would drop the shared pool."""
+
+    def __del__(self):
+        pass
+
+
+def build_session(pool_size):
+    """Keep-alive session whose pool holds one connection per worker (no retries: safe_api_call handles 429s)."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class SpotifyClientFactory:
+    """
+    Long-lived HTTP sessions per credential type ('app' for Client Credentials,
+    'user' for OAuth tokens), so TLS connections survive across requests and
+    scans. The app client is a single shared instance; user clients are cheap
+    wrappers built per token on the shared user session.
+    """
+
+    def __init__(self, concurrency=None):
+        self.concurrency = concurrency or app_settings.SCAN_CONCURRENCY
+        self.lock = threading.Lock()
+        self.sessions = {}
+        self._app_client = None
+        self.clients_built = {"app": 0, "user": 0}
+
+    def session(self, kind):
+        with self.lock:
+            if kind not in self.sessions:
+                self.sessions[kind] = build_session(self.concurrency + POOL_HEADROOM)
+            return self.sessions[kind]
+
+    def _build(self, kind, **auth):
+        with self.lock:
+            self.clients_built[kind] += 1
+        return PooledSpotify(
+            requests_session=self.session(kind),
+            requests_timeout=REQUESTS_TIMEOUT,
+            retries=0,
+            status_retries=0,
+            **auth
+        )
+
+    def app_client(self):
+        if self._app_client is None:
+            client = self._build("app", client_credentials_manager=AppTokenAuth(token_manager))
+            with self.lock:
+                if self._app_client is None:
+                    self._app_client = client
+        return self._app_client
+
+    def user_client(self, access_token):
+        return self._build("user", auth=access_token)
+
+    def stats(self):
+        """Connection reuse per session, from the urllib3 pools' own counters."""
+        with self.lock:
+            sessions = dict(self.sessions)
+            built = dict(self.clients_built)
+
+        result = {"concurrency": self.concurrency, "clients_built": built}
+        for kind, session in sessions.items():
+            connections = 0
+            requests_sent = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    connections += pool.num_connections
+                    requests_sent += pool.num_requests
+            result[kind] = {
+                "connections_opened": connections,
+                "requests": requests_sent,
+                "reuse_ratio": round(1 - connections / requests_sent, 3) if requests_sent else None
+            }
+        return result
+
+# Global instance
+client_factory = SpotifyClientFactory()
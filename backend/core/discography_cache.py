@@ -0,0 +1,119 @@
+import time
+import threading
+from .storage_manager import storage
+
+# Discographies are user-independent, so one store serves every user and scan
+DISCOGRAPHY_CACHE_FILE = "cache/discography_cache.json"
+
+DEFAULT_MAX_ARTISTS = 20000
+DEFAULT_MAX_AGE_SEC = 60 * 24 * 3600   # Drop artists nobody scanned for two months
+DEFAULT_REFRESH_INTERVAL_SEC = 3600    # Re-runs within the hour skip the API entirely
+
+
+def slim_album(item):
+    """Keeps only the listing fields the engine and release calendar read."""
+    return {
+        'id': item.get('id'),
+        'name': item.get('name'),
+        'uri': item.get('uri'),
+        'release_date': item.get('release_date'),
+        'release_date_precision': item.get('release_date_precision'),
+        'album_group': item.get('album_group') or item.get('album_type'),
+        'album_type': item.get('album_type'),
+        'total_tracks': item.get('total_tracks'),
+        'images': item.get('images', []),
+        'artists': [{'id': a.get('id'), 'name': a.get('name')} for a in item.get('artists', [])]
+    }
+
+
+class DiscographyCache:
+    """
+    Persisted per-artist album listings. Each entry records the known albums
+    (newest first), the newest release date, the date the listing is complete
+    back to ('covered_since'), and which include_groups it covers.
+    """
+
+    def __init__(self, filename=DISCOGRAPHY_CACHE_FILE, max_artists=DEFAULT_MAX_ARTISTS,
+                 max_age_sec=DEFAULT_MAX_AGE_SEC, refresh_interval_sec=DEFAULT_REFRESH_INTERVAL_SEC):
+        self.filename = filename
+        self.max_artists = max_artists
+        self.max_age_sec = max_age_sec
+        self.refresh_interval_sec = refresh_interval_sec
+        self.lock = threading.Lock()
+        self.entries = None
+        self.dirty = False
+        self.version = 0  # Bumped on every change so derived indexes know to rebuild
+        self.stats_counters = {"cold": 0, "delta": 0, "fresh": 0}
+
+    def _ensure_loaded(self):
+        if self.entries is None:
+            self.entries = storage.load_json(self.filename, {}) or {}
+
+    def get(self, artist_id):
+        with self.lock:
+            self._ensure_loaded()
+            return self.entries.get(artist_id)
+
+    def snapshot(self):
+        """Returns (version, shallow copy of entries) for building derived indexes."""
+        with self.lock:
+            self._ensure_loaded()
+            return self.version, dict(self.entries)
+
+    def covers(self, entry, include_groups, start_date_str):
+        """True if the entry lists every album in these groups released on/after start_date."""
+        if not entry:
+            return False
+        return (set(include_groups.split(',')) <= set(entry.get('groups', []))
+                and entry.get('covered_since', '9999') <= start_date_str)
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get('refreshed_at', 0) < self.refresh_interval_sec
+
+    def put(self, artist_id, albums, include_groups, covered_since):
+        newest = max((a['release_date'] for a in albums if a.get('release_date')), default=None)
+        with self.lock:
+            self._ensure_loaded()
+            self.entries[artist_id] = {
+                'albums': albums,
+                'newest_release': newest,
+                'covered_since': covered_since,
+                'groups': sorted(set(include_groups.split(','))),
+                'refreshed_at': time.time()
+            }
+            self.dirty = True
+            self.version += 1
+
+    def count(self, kind):
+        with self.lock:
+            self.stats_counters[kind] += 1
+
+    def evict(self):
+        """Drops entries older than max_age, then the least recently refreshed beyond max_artists."""
+        with self.lock:
+            self._ensure_loaded()
+            cutoff = time.time() - self.max_age_sec
+            live = {k: v for k, v in self.entries.items() if v.get('refreshed_at', 0) >= cutoff}
+            if len(live) > self.max_artists:
+                newest = sorted(live.items(), key=lambda kv: kv[1].get('refreshed_at', 0), reverse=True)
+                live = dict(newest[:self.max_artists])
+            if len(live) != len(self.entries):
+                self.entries = live
+                self.dirty = True
+                self.version += 1
+
+    def save(self):
+        self.evict()
+        with self.lock:
+            if not self.dirty:
+                return
+            storage.save_json(self.filename, self.entries)
+            self.dirty = False
+
+    def stats(self):
+        with self.lock:
+            self._ensure_loaded()
+            return {"artists": len(self.entries), **self.stats_counters}
+
+# Global instance
+discography_cache = DiscographyCache()
@@ -0,0 +1,177 @@
+import time
+import datetime
+from .engine import safe_api_call, parse_release_date, log_message
+from .discography_cache import discography_cache, slim_album
+from .storage_manager import storage
+
+COVERAGE_FILE = "cache/discovery_coverage.json"
+
+FEED_PAGE_SIZE = 50
+FEED_MAX_OFFSET = 100      # browse/new-releases stops paging around here
+SEARCH_MAX_OFFSET = 1000   # Spotify search hard limit
+SEARCH_NEW_TAG_DAYS = 14   # tag:new only covers the last two weeks
+
+
+def _in_window(album, start_date, end_date, album_types):
+    r_date = parse_release_date(album.get('release_date'))
+    if r_date is None or not (start_date <= r_date <= end_date):
+        return False
+    return album.get('album_type') in album_types
+
+
+def _page_albums(fetch, max_offset):
+    albums = []
+    offset = 0
+    while offset <= max_offset:
+        try:
+            results = fetch(offset)
+        except Exception as e:
+            if "CRITICAL_RATE_LIMIT" in str(e):
+                raise e
+            log_message(f"Discovery: feed page at offset {offset} failed: {e}")
+            break
+        page = (results or {}).get('albums', {})
+        items = [a for a in page.get('items', []) if a]
+        albums.extend(items)
+        if len(items) < FEED_PAGE_SIZE or not page.get('next'):
+            break
+        offset += FEED_PAGE_SIZE
+    return albums
+
+
+def search_covers(end_date):
+    """Whether the tag:new search runs for a window ending on end_date (it only lists the last two weeks)."""
+    return end_date >= datetime.date.today() - datetime.timedelta(days=SEARCH_NEW_TAG_DAYS)
+
+
+def cache_trust_cutoff(end_date, max_cache_age_sec):
+    """
+    Oldest refresh time at which a cached discography that covers the window's
+    start answers it in feed mode. The listing is complete up to its refresh;
+    the feed lists what came out after that, provided the refresh falls inside
+    the tag:new horizon and max_cache_age_sec. Without the search (older
+    windows), only a listing refreshed on or after end_date qualifies.
+    """
+    window_closed_at = time.mktime(end_date.timetuple())
+    if not search_covers(end_date):
+        return window_closed_at
+    search_since = time.mktime((datetime.date.today() - datetime.timedelta(days=SEARCH_NEW_TAG_DAYS)).timetuple())
+    return min(window_closed_at, max(time.time() - max_cache_age_sec, search_since))
+
+
+def fetch_feed_albums(sp, start_date, end_date, album_types):
+    """Albums from browse/new-releases plus a tag:new search, restricted to the window."""
+    albums = _page_albums(
+        lambda offset: safe_api_call(sp.new_releases, limit=FEED_PAGE_SIZE, offset=offset),
+        FEED_MAX_OFFSET
+    )
+    if search_covers(end_date):
+        albums.extend(_page_albums(
+            lambda offset: safe_api_call(sp.search, q="tag:new", type="album", limit=FEED_PAGE_SIZE, offset=offset),
+            SEARCH_MAX_OFFSET
+        ))
+
+    unique = {}
+    for album in albums:
+        if album.get('id') and _in_window(album, start_date, end_date, album_types):
+            unique.setdefault(album['id'], album)
+    return list(unique.values())
+
+
+def plan_discovery(sp, artists, start_date, end_date, album_types, max_cache_age_sec):
+    """
+    Decides, per roster artist, where its releases for the window come from.
+    An artist whose cached discography covers the window and was refreshed
+    after cache_trust_cutoff is answered without an artist_albums call: the
+    cached albums up to the refresh plus the feed albums crediting the artist
+    for the days since. Everyone else (no cache, or one too old for the feed
+    to fill the gap) gets the normal per-artist check. How much a feed scan
+    misses is measured against full scans of the same window by record_coverage.
+    Returns ({artist_id: [albums] or None}, stats); None means "run the normal
+    per-artist check".
+    """
+    started = time.time()
+    roster = frozenset(a['id'] for a in artists)
+    feed_albums = fetch_feed_albums(sp, start_date, end_date, set(album_types))
+
+    hits = {}
+    for album in feed_albums:
+        slim = slim_album(album)
+        for artist in album.get('artists', []):
+            if artist.get('id') in roster:
+                hits.setdefault(artist['id'], {})[album['id']] = slim
+
+    start_str = start_date.strftime('%Y-%m-%d')
+    include_groups = ",".join(album_types)
+    cutoff = cache_trust_cutoff(end_date, max_cache_age_sec)
+    plan = {}
+    from_cache = 0
+    from_feed = 0
+    targeted = 0
+
+    for artist_id in roster:
+        entry = discography_cache.get(artist_id)
+        cached_ok = discography_cache.covers(entry, include_groups, start_str) and entry.get('refreshed_at', 0) >= cutoff
+
+        if cached_ok:
+            releases = {}
+            for album in entry['albums']:
+                if album.get('album_group') in album_types:
+                    releases[album['id']] = album
+            feed_only = {album_id: album for album_id, album in hits.get(artist_id, {}).items() if album_id not in releases}
+            releases.update(feed_only)
+            if feed_only:
+                from_feed += 1
+            in_window = []
+            for album in releases.values():
+                r_date = parse_release_date(album.get('release_date'))
+                if r_date is not None and start_date <= r_date <= end_date:
+                    in_window.append(album)
+            plan[artist_id] = in_window
+            from_cache += 1
+        else:
+            plan[artist_id] = None
+            targeted += 1
+
+    stats = {
+        "feed_albums": len(feed_albums),
+        "feed_artists": len(hits),
+        "from_cache": from_cache,
+        "with_feed_releases": from_feed,
+        "targeted": targeted,
+        "roster": len(roster),
+        "plan_sec": round(time.time() - started, 2)
+    }
+    log_message(f"Discovery plan: {stats}")
+    return plan, stats
+
+
+def record_coverage(mode, start_date_str, end_date_str, album_ids):
+    """
+    Stores the album IDs a scan found for its window. When both a 'full' and a
+    'feed' scan exist for the same window, returns how much of the full result
+    the feed scan found.
+    """
+    data = storage.load_json(COVERAGE_FILE, {}) or {}
+    window = f"{start_date_str}|{end_date_str}"
+    entry = data.setdefault(window, {})
+    entry[mode] = sorted(set(album_ids))
+    entry[f"{mode}_at"] = datetime.datetime.now().isoformat()
+
+    # Keep the last few windows only
+    for old in sorted(data)[:-12]:
+        del data[old]
+    storage.save_json(COVERAGE_FILE, data)
+
+    if "full" in entry and "feed" in entry:
+        full = set(entry["full"])
+        feed = set(entry["feed"])
+        found = len(full & feed)
+        return {
+            "window": window,
+            "full_albums": len(full),
+            "feed_albums": len(feed),
+            "found": found,
+            "coverage": round(found / len(full), 3) if full else 1.0
+        }
+    return None
@@ -1,21 +1,42 @@
+import re
 import time
 import datetime
 import logging
 from spotipy.exceptions import SpotifyException
 import threading
+from .singleflight import SingleFlight, freeze
+from .pacing import current_scan_context
+from .album_cache import album_cache, slim_album_tracks
+from .discography_cache import discography_cache, slim_album
+from .export_index import export_index
 
 # Global locks for Rate Limit Synchronization
 rate_limit_event = threading.Event()
 rate_limit_event.set() # Initially Green
 
+# Catalog endpoints whose responses don't depend on the calling user
+COALESCED_ENDPOINTS = {'artist_albums', 'albums', 'album', 'artists', 'artist', 'tracks', 'track'}
+api_single_flight = SingleFlight()
+
 def safe_api_call(func, *args, **kwargs):
     """
     Thread-safe wrapper for Spotify API calls.
     Blocks all threads if a Rate Limit (429) is hit by any thread.
+    Identical concurrent catalog requests share one network call.
     """
+    endpoint = getattr(func, '__name__', None)
+    if endpoint in COALESCED_ENDPOINTS:
+        key = (endpoint, freeze(args), freeze(kwargs))
+        return api_single_flight.do(key, lambda: _rate_limited_call(func, *args, **kwargs))
+    return _rate_limited_call(func, *args, **kwargs)
+
+def _rate_limited_call(func, *args, **kwargs):
     while True:
         rate_limit_event.wait() # Wait if Red Light is on
-
+        scan_context = current_scan_context()
+        if scan_context is not None:
+            scan_context.pacer.acquire()  # Planned pacing for large scans (no-op when unpaced)
+            scan_context.count_call()     # Requests actually sent, retries included
         try:
             return func(*args, **kwargs)
         except SpotifyException as e:
@@ -56,12 +77,27 @@ def log_message(message):
 
 # --- Core Logic ---
 
+DEFAULT_FORBIDDEN_KEYWORDS = [" live ", "session", "לייב", "קאבר", "a capella", "acapella", "FSOE",
+                              "techno", "extended", "sped up", "speed up", "intro", "slow", "remaster", "instrumental"]
+
+# "Song (Clean)", "Song - Clean Version", "Song [clean]" -> "song"
+CLEAN_MARKER_RE = re.compile(r"\s*(?:[\(\[]\s*clean(?:\s+version)?\s*[\)\]]|-\s*clean(?:\s+version)?)\s*$")
+
+def normalize_track_name(name):
+    """Lowercased, stripped track name with any trailing 'clean' marker removed."""
+    normalized = name.lower().strip()
+    return CLEAN_MARKER_RE.sub("", normalized).strip()
+
 def get_normalized_key(track):
-    normalized_name = track['name'].lower().strip()
+    normalized_name = normalize_track_name(track['name'])
     artists = [artist['name'].lower().strip() for artist in track.get('artists', [])][:2]
     return (normalized_name, tuple(artists))
 
-def filter_tracks(tracks, no_filter_artists, filter_options={}):
+def classify_tracks(tracks, no_filter_artists, filter_options={}):
+    """
+    The filter stage with the reason for every exclusion.
+    Returns (kept, [(track, reason)]); filter_tracks is the plain version.
+    """
     filtered_tracks = []
     excluded_tracks = []
     basic_tracks = []
@@ -70,13 +106,12 @@ def filter_tracks(tracks, no_filter_artists, filter_options={}):
     min_ms = filter_options.get('min_duration_ms', 90000)
     max_ms = filter_options.get('max_duration_ms', 270000)
     
-    default_forbidden = [" live ", "session", "לייב", "קאבר", "a capella", "acapella", "FSOE",
-                       "techno", "extended", "sped up", "speed up", "intro", "slow", "remaster", "instrumental"]
-    forbidden_words = filter_options.get('forbidden_keywords', default_forbidden)
-    if not forbidden_words: forbidden_words = default_forbidden
+    forbidden_words = filter_options.get('forbidden_keywords', DEFAULT_FORBIDDEN_KEYWORDS)
+    if not forbidden_words: forbidden_words = DEFAULT_FORBIDDEN_KEYWORDS
     
     if 'forbidden_keywords' in filter_options:
          forbidden_words = filter_options['forbidden_keywords']
+    skip_exported = filter_options.get('skip_exported', False)
 
     for track in tracks:
         name = track['name'].lower()
@@ -84,18 +119,24 @@ def filter_tracks(tracks, no_filter_artists, filter_options={}):
         if not track.get('artists'): continue
         artist_id = track['artists'][0]['id']
         
+        # Already in an earlier export playlist (applies to no-filter artists too)
+        if skip_exported:
+            exported_to = export_index.lookup(track)
+            if exported_to is not None:
+                excluded_tracks.append((track, f"exported: '{exported_to}'"))
+                continue
+        
         if artist_id in no_filter_artists:
             filtered_tracks.append(track)
             continue
         
-        if any(forbidden in name for forbidden in forbidden_words):
-            log_message(f"DEBUG: Skipping '{track['name']}' - Keyword match")
-            excluded_tracks.append(track)
+        matched = next((forbidden for forbidden in forbidden_words if forbidden in name), None)
+        if matched is not None:
+            excluded_tracks.append((track, f"keyword: '{matched.strip()}'"))
             continue
         
         if duration_ms < min_ms or duration_ms > max_ms:
-            log_message(f"DEBUG: Skipping '{track['name']}' (Time: {duration_ms/1000}s) - Outside {min_ms/1000}s-{max_ms/1000}s range")
-            excluded_tracks.append(track)
+            excluded_tracks.append((track, f"duration: {duration_ms/1000:.0f}s outside {min_ms/1000:.0f}s-{max_ms/1000:.0f}s"))
             continue
             
         basic_tracks.append(track)
@@ -111,65 +152,186 @@ def filter_tracks(tracks, no_filter_artists, filter_options={}):
         
         if explicit_tracks:
             filtered_tracks.extend(explicit_tracks)
-            excluded_tracks.extend(non_explicit_tracks)
+            excluded_tracks.extend((t, "duplicate: clean version of an explicit track") for t in non_explicit_tracks)
         else:
             filtered_tracks.extend(group)
 
     return filtered_tracks, excluded_tracks
 
+def filter_tracks(tracks, no_filter_artists, filter_options={}):
+    filtered_tracks, excluded = classify_tracks(tracks, no_filter_artists, filter_options)
+    excluded_tracks = []
+    for track, reason in excluded:
+        if not reason.startswith("duplicate"):
+            log_message(f"DEBUG: Skipping '{track['name']}' - {reason}")
+        excluded_tracks.append(track)
+    return filtered_tracks, excluded_tracks
+
 # --- Spotify Interactions (Synchronous & Robust) ---
 
-def get_artist_albums(sp, artist_id, include_groups, start_date_obj):
-    all_albums = []
-    offset = 0
-    limit = 50
-    
-    while True:
-        try:
-            # Use GLOBAL SAFE API CALL
-            results = safe_api_call(sp.artist_albums, artist_id, include_groups=include_groups, limit=limit, offset=offset)
-            items = results.get('items', [])
-            
-            if not items:
-                break
+def parse_release_date(r_date_str):
+    """Parses Spotify's day / month / year precision release dates. Returns None if invalid."""
+    if not r_date_str:
+        return None
+    try:
+        if len(r_date_str) == 4:
+            return datetime.datetime.strptime(r_date_str, '%Y').date()
+        elif len(r_date_str) == 7:
+            return datetime.datetime.strptime(r_date_str, '%Y-%m').date()
+        else:
+            return datetime.datetime.strptime(r_date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return None
 
-            for item in items:
-                r_date_str = item.get('release_date')
-                if not r_date_str: continue
-
-                try:
-                    if len(r_date_str) == 4:
-                        r_date = datetime.datetime.strptime(r_date_str, '%Y').date()
-                    elif len(r_date_str) == 7:
-                        r_date = datetime.datetime.strptime(r_date_str, '%Y-%m').date()
-                    else:
-                        r_date = datetime.datetime.strptime(r_date_str, '%Y-%m-%d').date()
-                except ValueError:
-                    continue
-                
-                # Check if item is within or after start date
-                if r_date >= start_date_obj:
-                    all_albums.append(item)
-                else:
-                    # Optimized return: Stop if we hit old albums (assuming sorted)
-                    return all_albums
-            
-            if len(items) < limit:
+MAX_ALBUM_PAGE_SIZE = 50
+MIN_ALBUM_PAGE_SIZE = 5
+
+def estimate_album_page_size(entry, since_date):
+    """
+    Sizes the first album page from the artist's cached release cadence: roughly the
+    number of releases expected since `since_date`, with headroom. Unknown artists
+    get a full page.
+    """
+    if not entry or not entry.get('albums'):
+        return MAX_ALBUM_PAGE_SIZE
+    today = datetime.date.today()
+    year_ago = today - datetime.timedelta(days=365)
+    recent = 0
+    for album in entry['albums']:
+        r_date = parse_release_date(album.get('release_date'))
+        if r_date is not None and r_date >= year_ago:
+            recent += 1
+    days = max((today - since_date).days, 1)
+    expected = recent * days / 365.0
+    return max(MIN_ALBUM_PAGE_SIZE, min(MAX_ALBUM_PAGE_SIZE, int(expected * 1.5) + 3))
+
+def _album_group(item):
+    return item.get('album_group') or item.get('album_type')
+
+def _fetch_album_page(sp, artist_id, include_groups, limit, offset):
+    try:
+        # Use GLOBAL SAFE API CALL
+        results = safe_api_call(sp.artist_albums, artist_id, include_groups=include_groups, limit=limit, offset=offset)
+        return results.get('items', [])
+    except Exception as e:
+        # Check for critical errors raised by safe_api_call
+        if "CRITICAL_RATE_LIMIT" in str(e):
+            raise e # Propagate up to scanner
+        log_message(f"Error fetching albums for artist {artist_id}: {e}")
+        raise
+
+def page_artist_albums(sp, artist_id, include_groups, should_stop, page_size=MAX_ALBUM_PAGE_SIZE):
+    """
+    Collects items until should_stop(item) is True, terminating each album group
+    independently. Spotify lists one group after another (each newest-first), so a
+    single mixed stream can't stop at the first old album without missing newer
+    singles behind it.
+
+    One mixed page is fetched first; if it isn't full, every group is complete.
+    Otherwise each group that hasn't stopped continues in its own stream from the
+    number of its items already seen, with the page size doubling as it goes.
+    """
+    groups = [g for g in include_groups.split(',') if g]
+    done = set()
+    seen = {g: 0 for g in groups}
+    collected = []
+
+    items = _fetch_album_page(sp, artist_id, include_groups, page_size, 0)
+    for item in items:
+        group = _album_group(item)
+        seen[group] = seen.get(group, 0) + 1
+        if group in done:
+            continue
+        if should_stop(item):
+            done.add(group)
+            continue
+        collected.append(item)
+
+    if len(items) < page_size:
+        return collected
+
+    for group in groups:
+        if group in done:
+            continue
+        offset = seen[group]
+        limit = page_size
+        while True:
+            group_items = _fetch_album_page(sp, artist_id, group, limit, offset)
+            stopped = False
+            for item in group_items:
+                if should_stop(item):
+                    stopped = True
+                    break
+                collected.append(item)
+            if stopped or len(group_items) < limit:
                 break
-                
             offset += limit
-            
-        except Exception as e:
-            # Check for critical errors raised by safe_api_call
-            if "CRITICAL_RATE_LIMIT" in str(e):
-                raise e # Propagate up to scanner
-            log_message(f"Error fetching albums for artist {artist_id}: {e}")
-            break
-            
+            limit = min(MAX_ALBUM_PAGE_SIZE, limit * 2)
+
+    return collected
+
+def get_artist_albums(sp, artist_id, include_groups, start_date_obj, use_cache=True):
+    """
+    Returns the artist's albums released on/after start_date_obj.
+    Warm artists are delta-refreshed: paging stops at the first already-known
+    album of each group. Cold artists page down to start_date_obj.
+    """
+    start_str = start_date_obj.strftime('%Y-%m-%d')
+    entry = discography_cache.get(artist_id) if use_cache else None
+
+    try:
+        if discography_cache.covers(entry, include_groups, start_str):
+            if discography_cache.is_fresh(entry):
+                discography_cache.count("fresh")
+                albums = entry['albums']
+            else:
+                discography_cache.count("delta")
+                known = {a['id'] for a in entry['albums']}
+                covered_since = parse_release_date(entry['covered_since'])
+
+                def is_known(item):
+                    r_date = parse_release_date(item.get('release_date'))
+                    return item['id'] in known or (r_date is not None and r_date < covered_since)
+
+                since = datetime.date.fromtimestamp(entry.get('refreshed_at', 0))
+                page_size = estimate_album_page_size(entry, since)
+                new_items = [slim_album(a) for a in page_artist_albums(sp, artist_id, include_groups, is_known, page_size)]
+                albums = new_items + entry['albums']
+                discography_cache.put(artist_id, albums, include_groups, entry['covered_since'])
+        else:
+            discography_cache.count("cold")
+
+            def is_old(item):
+                r_date = parse_release_date(item.get('release_date'))
+                return r_date is not None and r_date < start_date_obj
+
+            page_size = estimate_album_page_size(entry, start_date_obj)
+            albums = [slim_album(a) for a in page_artist_albums(sp, artist_id, include_groups, is_old, page_size)]
+            if use_cache:
+                discography_cache.put(artist_id, albums, include_groups, start_str)
+    except Exception as e:
+        if "CRITICAL_RATE_LIMIT" in str(e):
+            raise e
+        # Serve what we have rather than nothing
+        albums = entry['albums'] if entry else []
+
+    wanted = set(include_groups.split(','))
+    all_albums = []
+    for item in albums:
+        r_date = parse_release_date(item.get('release_date'))
+        if r_date is None:
+            continue
+        if r_date >= start_date_obj and _album_group(item) in wanted:
+            all_albums.append(item)
     return all_albums
 
-def get_tracks_for_albums_in_batch(sp, album_ids):
+def get_tracks_for_albums_in_batch(sp, album_ids, use_cache=True):
     all_tracks = {}
+    if use_cache:
+        all_tracks, album_ids = album_cache.get_many(album_ids)
+        if not album_ids:
+            return all_tracks
+
     batch_size = 20
     idx = 0
     while idx < len(album_ids):
@@ -179,19 +341,10 @@ def get_tracks_for_albums_in_batch(sp, album_ids):
             for album in albums_data['albums']:
                 if album and 'id' in album:
                     aid = album['id']
-                    if 'tracks' in album and album['tracks']['items']:
-                        # Inject metadata
-                        items = album['tracks']['items']
-                        for t in items:
-                            t['album'] = {
-                                'id': album['id'], 
-                                'name': album['name'],
-                                'images': album['images'], 
-                                'release_date': album['release_date']
-                            }
-                        all_tracks[aid] = items
-                    else:
-                        all_tracks[aid] = []
+                    # Slim tracks with album metadata injected
+                    all_tracks[aid] = slim_album_tracks(album)
+                    if use_cache:
+                        album_cache.put(aid, all_tracks[aid])
         except SpotifyException as e:
             if e.http_status == 429:
                 retry_after = int(e.headers.get('Retry-After', 5))
@@ -216,26 +369,58 @@ def get_new_releases(sp, artist_id, start_date, end_date, filter_options={}):
     releases = get_artist_albums(sp, artist_id, include_groups, start_date)
     
     for album in releases:
-        try:
-            r_date_str = album['release_date']
-            if len(r_date_str) == 4:
-                r_date = datetime.datetime.strptime(r_date_str, '%Y').date()
-            elif len(r_date_str) == 7: 
-                 r_date = datetime.datetime.strptime(r_date_str, '%Y-%m').date()
-            else:
-                r_date = datetime.datetime.strptime(r_date_str, '%Y-%m-%d').date()
-
-            # Double check range (End Date)
-            if start_date <= r_date <= end_date:
-                new_releases.append(album)
-        except ValueError:
+        r_date = parse_release_date(album['release_date'])
+        if r_date is None:
             continue
+
+        # Double check range (End Date)
+        if start_date <= r_date <= end_date:
+            new_releases.append(album)
             
     return new_releases
 
-def process_artist(sp, artist, exclusion_artists, no_filter_artists, start_date, end_date, filter_options={}):
+def fetch_artist_candidates(sp, artist_id, start_date, end_date, filter_options={}, releases=None):
+    """
+    The unfiltered tracks of an artist's releases in the window:
+    {album_id: {'album_group', 'release_date', 'tracks'}}.
+    If `releases` is given (e.g. from the discovery feed), the album listing call is skipped.
+    """
+    if releases is not None:
+        new_releases = releases
+    else:
+        new_releases = get_new_releases(sp, artist_id, start_date, end_date, filter_options)
+    if not new_releases:
+        return {}
+
+    # Note: If an artist has multiple new releases, verify we don't spam.
+    # usually 1 or 2 new releases.
+    batched_tracks = get_tracks_for_albums_in_batch(sp, [release['id'] for release in new_releases])
+
+    candidates = {}
+    for release in new_releases:
+        aid = release['id']
+        if aid in batched_tracks:
+            candidates[aid] = {
+                'album_group': release.get('album_group') or release.get('album_type'),
+                'release_date': release.get('release_date'),
+                'tracks': batched_tracks[aid]
+            }
+    return candidates
+
+def filter_candidates(candidates, no_filter_artists, filter_options={}):
+    """Runs the filter per album, as process_artist always has (explicit/clean dedup is album-local)."""
+    filtered = []
+    excluded = []
+    for entry in candidates.values():
+        f_tracks, e_tracks = filter_tracks(entry['tracks'], no_filter_artists, filter_options)
+        filtered.extend(f_tracks)
+        excluded.extend(e_tracks)
+    return (filtered, excluded)
+
+def process_artist(sp, artist, exclusion_artists, no_filter_artists, start_date, end_date, filter_options={}, releases=None):
     """
     Orchestrates the check for a single artist.
+    If `releases` is given (e.g. from the discovery feed), the album listing call is skipped.
     """
     artist_id = artist['id']
     if artist_id in exclusion_artists:
@@ -243,22 +428,5 @@ def process_artist(sp, artist, exclusion_artists, no_filter_artists, start_date,
         
     # log_message(f"Processing artist: {artist['name']}") # Too verbose for 2000 artists
     
-    new_releases = get_new_releases(sp, artist_id, start_date, end_date, filter_options)
-    filtered = []
-    excluded = []
-    
-    if new_releases:
-        album_ids = [release['id'] for release in new_releases]
-        # Note: If an artist has multiple new releases, verify we don't spam.
-        # usually 1 or 2 new releases.
-        
-        batched_tracks = get_tracks_for_albums_in_batch(sp, album_ids)
-        
-        for release in new_releases:
-            aid = release['id']
-            if aid in batched_tracks:
-                f_tracks, e_tracks = filter_tracks(batched_tracks[aid], no_filter_artists, filter_options)
-                filtered.extend(f_tracks)
-                excluded.extend(e_tracks)
-                
-    return (filtered, excluded)
+    candidates = fetch_artist_candidates(sp, artist_id, start_date, end_date, filter_options, releases)
+    return filter_candidates(candidates, no_filter_artists, filter_options)
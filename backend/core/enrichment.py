@@ -0,0 +1,166 @@
+import time
+import threading
+from .storage_manager import storage
+
+ENRICHMENT_CACHE_FILE = "cache/enrichment_cache.json"
+
+# Spotify's several-tracks and several-artists endpoints take up to 50 IDs
+TRACKS_BATCH_SIZE = 50
+ARTISTS_BATCH_SIZE = 50
+
+TRACK_TTL_SEC = 7 * 24 * 3600     # Popularity drifts; the ISRC never changes
+ARTIST_TTL_SEC = 30 * 24 * 3600   # Genres are close to static
+DEFAULT_MAX_ENTRIES = 100000      # Per kind; oldest entries go first
+
+
+def slim_track_details(track):
+    return {
+        'popularity': track.get('popularity'),
+        'isrc': (track.get('external_ids') or {}).get('isrc')
+    }
+
+
+def slim_artist_details(artist):
+    return {
+        'popularity': artist.get('popularity'),
+        'genres': artist.get('genres', []),
+        'followers': (artist.get('followers') or {}).get('total')
+    }
+
+
+class EnrichmentCache:
+    """
+    Popularity and ISRC per track, genres and popularity per artist: the fields
+    the simplified objects from sp.albums and liked songs lack. Misses are
+    fetched 50 IDs per call and kept in a persisted store with a TTL per kind,
+    so re-scans of the same window cost nothing.
+    """
+
+    def __init__(self, filename=ENRICHMENT_CACHE_FILE, track_ttl_sec=TRACK_TTL_SEC,
+                 artist_ttl_sec=ARTIST_TTL_SEC, max_entries=DEFAULT_MAX_ENTRIES):
+        self.filename = filename
+        self.ttl = {"tracks": track_ttl_sec, "artists": artist_ttl_sec}
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = None   # kind -> {id: {..., "stored_at"}}
+        self.dirty = False
+        self.counters = {"hits": 0, "misses": 0, "track_calls": 0, "artist_calls": 0}
+
+    def _ensure_loaded(self):
+        if self.entries is None:
+            loaded = storage.load_json(self.filename, {}) or {}
+            self.entries = {"tracks": loaded.get("tracks", {}), "artists": loaded.get("artists", {})}
+
+    def _split(self, kind, ids):
+        """Returns ({id: details} for fresh hits, [missing ids])."""
+        now = time.time()
+        found = {}
+        missing = []
+        with self.lock:
+            self._ensure_loaded()
+            for item_id in dict.fromkeys(ids):
+                entry = self.entries[kind].get(item_id)
+                if entry is not None and now - entry["stored_at"] <= self.ttl[kind]:
+                    found[item_id] = entry
+                else:
+                    missing.append(item_id)
+            self.counters["hits"] += len(found)
+            self.counters["misses"] += len(missing)
+        return found, missing
+
+    def _fetch(self, sp, kind, ids):
+        from .engine import safe_api_call, log_message
+
+        found, missing = self._split(kind, ids)
+        batch_size = TRACKS_BATCH_SIZE if kind == "tracks" else ARTISTS_BATCH_SIZE
+        fetch = sp.tracks if kind == "tracks" else sp.artists
+        slim = slim_track_details if kind == "tracks" else slim_artist_details
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            try:
+                response = safe_api_call(fetch, batch)
+            except Exception as e:
+                if "CRITICAL_RATE_LIMIT" in str(e):
+                    raise e
+                log_message(f"Enrichment: {kind} batch failed: {e}")
+                continue
+            fetched = {item['id']: {**slim(item), "stored_at": time.time()} for item in response.get(kind, []) if item}
+            with self.lock:
+                self.counters["track_calls" if kind == "tracks" else "artist_calls"] += 1
+                self.entries[kind].update(fetched)
+                self.dirty = True
+            found.update(fetched)
+        return found
+
+    def get_tracks(self, sp, track_ids):
+        return self._fetch(sp, "tracks", [tid for tid in track_ids if tid])
+
+    def get_artists(self, sp, artist_ids):
+        return self._fetch(sp, "artists", [aid for aid in artist_ids if aid])
+
+    def enrich_tracks(self, sp, tracks):
+        """
+        Copies of the tracks with 'popularity', 'isrc' and the primary artist's
+        'genres' filled in. Copies, because the inputs may be album cache entries.
+        """
+        track_details = self.get_tracks(sp, [t.get('id') for t in tracks])
+        artist_details = self.get_artists(sp, [t['artists'][0].get('id') for t in tracks if t.get('artists')])
+        enriched = []
+        for track in tracks:
+            details = track_details.get(track.get('id'), {})
+            artist = artist_details.get(track['artists'][0].get('id'), {}) if track.get('artists') else {}
+            enriched.append({
+                **track,
+                'popularity': details.get('popularity'),
+                'isrc': details.get('isrc'),
+                'genres': artist.get('genres', [])
+            })
+        return enriched
+
+    def cached_tracks(self, track_ids):
+        """[{'id', 'isrc'}] from the store alone (no API calls), for registering exports."""
+        with self.lock:
+            self._ensure_loaded()
+            return [{'id': tid, 'isrc': self.entries["tracks"].get(tid, {}).get('isrc')} for tid in track_ids]
+
+    def save(self):
+        with self.lock:
+            if self.entries is None or not self.dirty:
+                return
+            for kind, entries in self.entries.items():
+                if len(entries) > self.max_entries:
+                    newest = sorted(entries.items(), key=lambda kv: kv[1]["stored_at"])[-self.max_entries:]
+                    self.entries[kind] = dict(newest)
+            storage.save_json(self.filename, self.entries)
+            self.dirty = False
+
+    def stats(self):
+        with self.lock:
+            self._ensure_loaded()
+            return {
+                "tracks": len(self.entries["tracks"]),
+                "artists": len(self.entries["artists"]),
+                **self.counters
+            }
+
+
+def dedup_by_isrc(tracks):
+    """
+    Keeps the first track per ISRC (the same recording on a single and its
+    album). Tracks without an ISRC are always kept. Returns (kept, [(track, reason)]).
+    """
+    seen = {}
+    kept = []
+    excluded = []
+    for track in tracks:
+        isrc = track.get('isrc')
+        if isrc and isrc in seen:
+            excluded.append((track, f"duplicate: same recording as '{seen[isrc].get('name')}'"))
+            continue
+        if isrc:
+            seen[isrc] = track
+        kept.append(track)
+    return kept, excluded
+
+# Global instance
+enrichment_cache = EnrichmentCache()
@@ -0,0 +1,122 @@
+import threading
+from .storage_manager import storage
+
+EXPORT_INDEX_FILE = "cache/exported_tracks.json"
+PLAYLISTS_PAGE_SIZE = 50
+
+
+def track_isrc(track):
+    return track.get('isrc') or (track.get('external_ids') or {}).get('isrc')
+
+
+class ExportedTrackIndex:
+    """
+    Membership index of every track that went into an exported playlist: track
+    ID -> playlist label and ISRC -> playlist label. Plain dicts, so the filter
+    stage checks each track in O(1); a few hundred weekly playlists is well
+    under a megabyte.
+
+    The ISRC side only matches tracks that carry an ISRC: full track objects
+    (backfilled playlists) and scan candidates enriched with settings.enrich.
+    The simplified tracks from sp.albums have no external_ids, so without
+    enrichment a re-release under a new track ID is not caught.
+    """
+
+    def __init__(self, filename=EXPORT_INDEX_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.by_id = None
+        self.by_isrc = {}
+        self.playlists = {}   # Backfilled playlist ID -> snapshot_id
+
+    def _ensure_loaded(self):
+        if self.by_id is None:
+            data = storage.load_json(self.filename, {}) or {}
+            self.by_isrc = data.get("isrcs", {})
+            self.playlists = data.get("playlists", {})
+            self.by_id = data.get("ids", {})
+
+    def lookup(self, track):
+        """
+        Label of the playlist the track was exported to, else None. Falls back to
+        the ISRC when the track has one (enriched or full track objects).
+        """
+        if self.by_id is None:
+            with self.lock:
+                self._ensure_loaded()
+        label = self.by_id.get(track.get('id'))
+        if label is None:
+            isrc = track_isrc(track)
+            if isrc:
+                label = self.by_isrc.get(isrc)
+        return label
+
+    def add_tracks(self, tracks, label):
+        added = 0
+        with self.lock:
+            self._ensure_loaded()
+            for track in tracks:
+                if track.get('id') and track['id'] not in self.by_id:
+                    self.by_id[track['id']] = label
+                    added += 1
+                isrc = track_isrc(track)
+                if isrc:
+                    self.by_isrc.setdefault(isrc, label)
+        return added
+
+    def add_uris(self, uris, label):
+        return self.add_tracks([{'id': uri.split(":")[-1]} for uri in uris if uri.startswith("spotify:track:")], label)
+
+    def save(self):
+        with self.lock:
+            if self.by_id is None:
+                return
+            storage.save_json(self.filename, {"ids": self.by_id, "isrcs": self.by_isrc, "playlists": self.playlists})
+
+    def backfill(self, sp, name_prefix=None, playlist_links=()):
+        """
+        One-time import of existing playlists: the given links plus every playlist
+        of the user whose name starts with name_prefix. Playlists already imported
+        at the same snapshot are skipped, so re-running only picks up new ones.
+        """
+        from .engine import safe_api_call, log_message
+        from .playlists import fetch_playlist_tracks, extract_playlist_id
+
+        targets = {extract_playlist_id(link): None for link in playlist_links}
+        if name_prefix:
+            results = safe_api_call(sp.current_user_playlists, limit=PLAYLISTS_PAGE_SIZE)
+            while results:
+                for playlist in results.get('items', []):
+                    if playlist and (playlist.get('name') or "").startswith(name_prefix):
+                        targets[playlist['id']] = playlist.get('snapshot_id')
+                results = safe_api_call(sp.next, results) if results.get('next') else None
+
+        with self.lock:
+            self._ensure_loaded()
+            done = dict(self.playlists)
+
+        imported = 0
+        skipped = 0
+        added = 0
+        for playlist_id, snapshot_id in targets.items():
+            if snapshot_id and done.get(playlist_id) == snapshot_id:
+                skipped += 1
+                continue
+            name = safe_api_call(sp.playlist, playlist_id, fields="name").get('name', playlist_id)
+            tracks, snapshot_id = fetch_playlist_tracks(sp, playlist_id)
+            added += self.add_tracks(tracks, name)
+            with self.lock:
+                self.playlists[playlist_id] = snapshot_id
+            imported += 1
+            log_message(f"Export index: imported '{name}' ({len(tracks)} tracks)")
+
+        self.save()
+        return {"imported_playlists": imported, "skipped_playlists": skipped, "added_tracks": added, **self.stats()}
+
+    def stats(self):
+        with self.lock:
+            self._ensure_loaded()
+            return {"track_ids": len(self.by_id), "isrcs": len(self.by_isrc), "playlists": len(self.playlists)}
+
+# Global instance
+export_index = ExportedTrackIndex()
@@ -0,0 +1,232 @@
+import time
+import importlib.util
+from .engine import classify_tracks, get_normalized_key, DEFAULT_FORBIDDEN_KEYWORDS
+from .candidate_cache import candidate_cache, build_filter_options, entry_artists
+from .artist_policy import artist_policy, normalize_artist_name
+from .export_index import export_index
+
+# NumPy is optional: without it presets are evaluated one by one through classify_tracks.
+# It's imported on the first preset request, not at startup (cold start)
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+HISTOGRAM_BIN_SEC = 15
+HISTOGRAM_MAX_SEC = 600
+REASONS = ["excluded_artist", "exported", "keyword", "duration", "duplicate"]
+
+
+def _preset_options(preset):
+    return {
+        "name": preset.get("name"),
+        "min_ms": preset.get("min_duration_sec", 90) * 1000,
+        "max_ms": preset.get("max_duration_sec", 270) * 1000,
+        # Matched as given against the lowercased name, exactly like classify_tracks
+        "keywords": list(preset.get("forbidden_keywords", DEFAULT_FORBIDDEN_KEYWORDS)),
+        "exclude_artists": preset.get("exclude_artists", []),
+        "skip_exported": preset.get("skip_exported", False)
+    }
+
+
+def _histogram_bins():
+    return [i * HISTOGRAM_BIN_SEC for i in range(HISTOGRAM_MAX_SEC // HISTOGRAM_BIN_SEC + 1)]
+
+
+class CandidateMatrix:
+    """
+    Column arrays over a candidate set, built once per request: durations,
+    explicit and already-exported flags, a track x keyword match matrix,
+    album-local dedup groups and the album (hence roster artist) of every
+    track. evaluate() scores all presets at once as (tracks x presets)
+    boolean matrices.
+    """
+
+    def __init__(self, albums, keywords, no_filter=frozenset()):
+        import numpy as np
+
+        self.keywords = sorted(set(keywords))
+        keyword_index = {k: i for i, k in enumerate(self.keywords)}
+        self.keyword_index = keyword_index
+
+        durations = []
+        explicit = []
+        exported = []
+        bypass = []
+        groups = []
+        album_codes = []
+        self.album_entries = []
+        group_ids = {}
+        matches = []
+
+        for entry in albums:
+            album_code = len(self.album_entries)
+            self.album_entries.append(entry)
+            for track in entry['tracks']:
+                if not track.get('artists'):
+                    continue  # classify_tracks skips these too
+                name = track['name'].lower()
+                durations.append(track['duration_ms'])
+                explicit.append(bool(track.get('explicit', False)))
+                exported.append(export_index.lookup(track) is not None)
+                bypass.append(track['artists'][0]['id'] in no_filter)
+                key = (album_code, get_normalized_key(track))
+                groups.append(group_ids.setdefault(key, len(group_ids)))
+                album_codes.append(album_code)
+                matches.append([i for k, i in keyword_index.items() if k in name])
+
+        n = len(durations)
+        self.size = n
+        self.group_count = len(group_ids)
+        self.durations = np.array(durations, dtype=np.int64)
+        self.explicit = np.array(explicit, dtype=bool)
+        self.exported = np.array(exported, dtype=bool)
+        self.no_filter = np.array(bypass, dtype=bool)
+        self.groups = np.array(groups, dtype=np.int64)
+        self.album_codes = np.array(album_codes, dtype=np.int64)
+        self.keyword_matrix = np.zeros((n, len(self.keywords)), dtype=np.float32)  # float: matmuls go through BLAS
+        for row, cols in enumerate(matches):
+            if cols:
+                self.keyword_matrix[row, cols] = 1
+
+        self.album_artist_ids = np.array([e['artist_id'] for e in self.album_entries], dtype=object)
+        self.album_artist_names = np.array([normalize_artist_name(e['artist_name']) for e in self.album_entries], dtype=object)
+
+        edges = np.array(_histogram_bins(), dtype=np.int64) * 1000
+        bins = np.clip(np.searchsorted(edges, self.durations, side='right') - 1, 0, len(edges) - 2)
+        self.histogram_onehot = np.zeros((n, len(edges) - 1), dtype=np.float32)
+        self.histogram_onehot[np.arange(n), bins] = 1
+
+    def evaluate(self, presets):
+        import numpy as np
+
+        p = len(presets)
+        options = [_preset_options(preset) for preset in presets]
+
+        # Preset parameters as row vectors, broadcast against track columns
+        min_ms = np.array([o["min_ms"] for o in options], dtype=np.int64)
+        max_ms = np.array([o["max_ms"] for o in options], dtype=np.int64)
+        skip_exported = np.array([o["skip_exported"] for o in options], dtype=bool)
+        keyword_masks = np.zeros((len(self.keywords), p), dtype=np.float32)
+        artist_masks = np.zeros((len(self.album_entries), p), dtype=bool)
+        for j, o in enumerate(options):
+            for k in o["keywords"]:
+                keyword_masks[self.keyword_index[k], j] = 1
+            policy = artist_policy.for_settings(o)
+            artist_masks[:, j] = (np.isin(self.album_artist_ids, list(policy.exclude_ids))
+                                  | np.isin(self.album_artist_names, list(policy.exclude_names)))
+
+        excluded_artist = artist_masks[self.album_codes]
+        exported = self.exported[:, None] & skip_exported[None, :] & ~excluded_artist
+        # No-filter artists skip keyword, duration and dedup checks, like in classify_tracks
+        bypass = self.no_filter[:, None] & ~excluded_artist & ~exported
+        keyword_hit = ((self.keyword_matrix @ keyword_masks) > 0) & ~excluded_artist & ~exported & ~bypass
+        too_short = self.durations[:, None] < min_ms[None, :]
+        too_long = self.durations[:, None] > max_ms[None, :]
+        duration_out = (too_short | too_long) & ~excluded_artist & ~exported & ~bypass & ~keyword_hit
+        passed = ~(excluded_artist | exported | keyword_hit | duration_out)
+        checked = passed & ~bypass
+
+        # Album-local explicit/clean dedup: drop clean tracks whose group has a passing explicit one
+        explicit_passed = checked & self.explicit[:, None]
+        explicit_in_group = np.stack(
+            [np.bincount(self.groups, weights=explicit_passed[:, j], minlength=self.group_count) for j in range(p)],
+            axis=1
+        )
+        duplicate = checked & ~self.explicit[:, None] & (explicit_in_group[self.groups] > 0)
+        kept = passed & ~duplicate
+
+        histograms = (kept.T.astype(np.float32) @ self.histogram_onehot).astype(np.int64)
+        keyword_counts = (self.keyword_matrix.T @ (~excluded_artist).astype(np.float32)).astype(np.int64)
+        reason_counts = {
+            "excluded_artist": excluded_artist.sum(axis=0),
+            "exported": exported.sum(axis=0),
+            "keyword": keyword_hit.sum(axis=0),
+            "duration": duration_out.sum(axis=0),
+            "duplicate": duplicate.sum(axis=0)
+        }
+        kept_counts = kept.sum(axis=0)
+
+        results = []
+        for j, o in enumerate(options):
+            results.append({
+                "name": o["name"],
+                "kept": int(kept_counts[j]),
+                "excluded": {reason: int(reason_counts[reason][j]) for reason in REASONS},
+                "keyword_hits": {k: int(keyword_counts[self.keyword_index[k], j]) for k in sorted(set(o["keywords"]))},
+                "kept_duration_histogram": histograms[j].tolist()
+            })
+        return results
+
+
+def _evaluate_one(albums, preset, no_filter=frozenset()):
+    """Pure-Python evaluation of one preset, used when NumPy isn't installed."""
+    o = _preset_options(preset)
+    options = build_filter_options(preset)
+    options["forbidden_keywords"] = o["keywords"]
+    policy = artist_policy.for_settings(o)
+    bins = _histogram_bins()
+    histogram = [0] * (len(bins) - 1)
+    excluded = dict.fromkeys(REASONS, 0)
+    keyword_hits = dict.fromkeys(sorted(set(o["keywords"])), 0)
+    kept = 0
+
+    for entry in albums:
+        tracks = [t for t in entry['tracks'] if t.get('artists')]
+        if policy.is_excluded(entry['artist_id'], entry['artist_name']):
+            excluded["excluded_artist"] += len(tracks)
+            continue
+        for track in tracks:
+            name = track['name'].lower()
+            for k in keyword_hits:
+                if k in name:
+                    keyword_hits[k] += 1
+        f_tracks, e_tracks = classify_tracks(tracks, no_filter, options)
+        for _, reason in e_tracks:
+            excluded[reason.split(":")[0]] += 1
+        for track in f_tracks:
+            kept += 1
+            histogram[min(track['duration_ms'] // (HISTOGRAM_BIN_SEC * 1000), len(histogram) - 1)] += 1
+
+    return {
+        "name": o["name"],
+        "kept": kept,
+        "excluded": excluded,
+        "keyword_hits": keyword_hits,
+        "kept_duration_histogram": histogram
+    }
+
+
+def evaluate_presets(settings, presets):
+    """
+    What-if counts for several filter presets over the last scan's candidates.
+    `settings` picks the window and album types; each preset sets durations,
+    keywords and excluded artists.
+    """
+    if not presets:
+        return {"status": "error", "message": "At least one preset is required"}
+    started = time.time()
+    try:
+        scan, albums = candidate_cache.select(settings)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    no_filter = artist_policy.current().no_filter_for(entry_artists(albums))
+    if NUMPY_AVAILABLE:
+        keywords = [k for preset in presets for k in _preset_options(preset)["keywords"]]
+        matrix = CandidateMatrix(albums, keywords, no_filter)
+        build_ms = int((time.time() - started) * 1000)
+        results = matrix.evaluate(presets)
+        tracks = matrix.size
+    else:
+        build_ms = 0
+        results = [_evaluate_one(albums, preset, no_filter) for preset in presets]
+        tracks = sum(1 for entry in albums for t in entry['tracks'] if t.get('artists'))
+
+    return {
+        "status": "success",
+        "scan": scan,
+        "tracks": tracks,
+        "histogram_bins_sec": _histogram_bins(),
+        "presets": results,
+        "vectorized": NUMPY_AVAILABLE,
+        "build_ms": build_ms,
+        "total_ms": int((time.time() - started) * 1000)
+    }
@@ -0,0 +1,207 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from .ttl_cache import PersistentTTLCache
+from .engine import log_message
+
+# Selenium (and a local Chrome) are only available on the curator's machine.
+# The webdriver package is heavy, so it's imported when the first browser starts.
+try:
+    from selenium.common.exceptions import WebDriverException, TimeoutException
+    SELENIUM_AVAILABLE = True
+except ImportError:
+    SELENIUM_AVAILABLE = False
+    WebDriverException = TimeoutException = Exception
+
+INSTAGRAM_CACHE_FILE = "cache/instagram_validation.json"
+INSTAGRAM_BASE_URL = os.getenv("INSTAGRAM_BASE_URL", "https://www.instagram.com/")
+NOT_FOUND_TEXT = "Sorry, this page isn't available."
+PROFILE_MARKER = 'content="profile"'  # <meta property="og:type" content="profile">
+
+VALID_TTL_SEC = 30 * 24 * 3600   # Profiles rarely disappear
+INVALID_TTL_SEC = 7 * 24 * 3600  # Retry dead handles weekly
+PAGE_TIMEOUT_SEC = 10
+RENDER_WAIT_SEC = 2  # Upper bound; returns as soon as either marker is rendered
+
+
+def create_headless_chrome():
+    from selenium import webdriver
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(PAGE_TIMEOUT_SEC)
+    return driver
+
+
+def wait_for_profile_markers(driver):
+    """Chrome renders Instagram's page asynchronously: waits until either marker shows up (or RENDER_WAIT_SEC)."""
+    from selenium.webdriver.support.ui import WebDriverWait
+    try:
+        WebDriverWait(driver, RENDER_WAIT_SEC, poll_frequency=0.1).until(
+            lambda d: NOT_FOUND_TEXT in d.page_source or PROFILE_MARKER in d.page_source
+        )
+    except TimeoutException:
+        pass
+
+
+class BrowserPool:
+    """
+    Bounded pool of reusable browser sessions. Drivers are created lazily up to
+    `size`; a driver that raises a WebDriverException is quit and replaced.
+    """
+
+    def __init__(self, size=3, driver_factory=None):
+        self.size = size
+        self.driver_factory = driver_factory or create_headless_chrome
+        self.idle = queue.Queue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def _acquire(self):
+        while True:
+            try:
+                return self.idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self.lock:
+                can_create = self.created < self.size
+                if can_create:
+                    self.created += 1
+            if can_create:
+                try:
+                    return self.driver_factory()
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+            try:
+                # Re-check periodically in case a broken session was discarded
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    @contextmanager
+    def session(self):
+        driver = self._acquire()
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            if healthy:
+                self.idle.put(driver)
+            else:
+                self._discard(driver)
+
+    def _discard(self, driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        with self.lock:
+            self.created -= 1
+
+    def close(self):
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+class InstagramValidator:
+    """
+    Checks whether Instagram handles exist. Results (valid and invalid) are cached
+    with a TTL, so repeat artists never reach the browser; misses are spread over
+    a bounded pool of headless sessions.
+
+    driver_factory creates a session (default: headless Chrome) and render_wait
+    waits for a loaded page to render (default: the Selenium marker wait). Drivers
+    whose page_source is complete once get() returns pass render_wait=None.
+    """
+
+    def __init__(self, pool_size=3, base_url=INSTAGRAM_BASE_URL, driver_factory=None,
+                 render_wait=wait_for_profile_markers, cache=None):
+        self.pool_size = pool_size
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.driver_factory = driver_factory
+        self.render_wait = render_wait
+        self.cache = cache or PersistentTTLCache(INSTAGRAM_CACHE_FILE, ttl_sec=VALID_TTL_SEC)
+        self.pool = None
+
+    def _get_pool(self):
+        if self.pool is None:
+            if self.driver_factory is None and not SELENIUM_AVAILABLE:
+                raise Exception("Selenium is not installed; Instagram validation is unavailable.")
+            self.pool = BrowserPool(self.pool_size, self.driver_factory)
+        return self.pool
+
+    def get_cached(self, username):
+        key = username.lower()
+        valid = self.cache.get(key, ttl_sec=VALID_TTL_SEC)
+        if valid is True:
+            return True
+        # Invalid results expire sooner than valid ones
+        if self.cache.get(key, ttl_sec=INVALID_TTL_SEC) is False:
+            return False
+        return None
+
+    def _check_in_browser(self, username):
+        with self._get_pool().session() as driver:
+            driver.get(self.base_url + username)
+            if self.render_wait is not None:
+                self.render_wait(driver)
+            return NOT_FOUND_TEXT not in driver.page_source
+
+    def validate(self, username):
+        if not username or username == "NONE":
+            return False
+        cached = self.get_cached(username)
+        if cached is not None:
+            return cached
+        try:
+            is_valid = self._check_in_browser(username)
+        except Exception as e:
+            # Don't cache transient browser failures
+            log_message(f"Error checking Instagram profile {username}: {e}")
+            return False
+        self.cache.set(username.lower(), is_valid)
+        return is_valid
+
+    def validate_many(self, usernames):
+        """Validates a batch concurrently (one worker per pooled session). Returns {username: bool}."""
+        unique = list(dict.fromkeys(u for u in usernames if u))
+        results = {}
+        misses = []
+        for username in unique:
+            cached = self.get_cached(username)
+            if cached is None and username != "NONE":
+                misses.append(username)
+            else:
+                results[username] = bool(cached)
+
+        if misses:
+            log_message(f"Instagram validation: {len(results)} cached, {len(misses)} to check in browser")
+            self._get_pool()
+            with ThreadPoolExecutor(max_workers=self.pool_size) as executor:
+                for username, is_valid in zip(misses, executor.map(self.validate, misses)):
+                    results[username] = is_valid
+
+        self.cache.save()
+        return results
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+# Global instance
+instagram_validator = InstagramValidator()
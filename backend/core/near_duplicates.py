@@ -0,0 +1,185 @@
+import re
+import zlib
+import random
+import importlib.util
+
+# NumPy is optional: it makes signing a large result set much faster.
+# It's imported when a scan first signs titles, not at startup (cold start)
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+NUM_PERM = 64
+SHINGLE_SIZE = 3
+MERSENNE_PRIME = (1 << 31) - 1
+DEFAULT_THRESHOLD = 0.7
+SIGN_CHUNK = 4096   # Tracks signed per NumPy block (bounds the temporary matrix)
+
+# "(feat. X)", "[ft. X]", "- featuring X", "feat. X" at the end
+FEATURE_RE = re.compile(r"\s*(?:[\(\[]\s*(?:feat\.?|ft\.?|featuring|with)\s[^\)\]]*[\)\]]|-?\s*\b(?:feat\.?|ft\.?|featuring)\s.*$)")
+# "(Radio Edit)", "- Clean Version", "[Single Version]", "- Edit" at the end
+EDIT_WORDS = r"(?:radio\s+edit|edit|clean|explicit|dirty|single\s+version|album\s+version|original\s+version|short\s+version|radio\s+version|clean\s+version|explicit\s+version)"
+EDIT_RE = re.compile(r"\s*(?:[\(\[]\s*" + EDIT_WORDS + r"\s*[\)\]]|-\s*" + EDIT_WORDS + r")\s*$")
+PUNCT_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_title(name):
+    """
+    Lowercased title without feature credits and edit/version suffixes, punctuation
+    removed. Returns (title, had_suffix); had_suffix marks the variant of a pair.
+    """
+    title = name.lower().strip()
+    original = title
+    previous = None
+    while previous != title:  # "Song (feat. X) - Radio Edit" needs both passes
+        previous = title
+        title = FEATURE_RE.sub("", title).strip()
+        title = EDIT_RE.sub("", title).strip()
+    title = " ".join(PUNCT_RE.sub(" ", title).split())
+    return title, title != " ".join(PUNCT_RE.sub(" ", original).split())
+
+
+def shingles(title):
+    """Character n-grams over the normalized title, hashed to 31-bit ints."""
+    padded = f" {title} "
+    if len(padded) <= SHINGLE_SIZE:
+        return {zlib.crc32(padded.encode("utf-8")) & MERSENNE_PRIME}
+    return {zlib.crc32(padded[i:i + SHINGLE_SIZE].encode("utf-8")) & MERSENNE_PRIME
+            for i in range(len(padded) - SHINGLE_SIZE + 1)}
+
+
+def lsh_params(threshold, num_perm=NUM_PERM):
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to the threshold."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    """Fixed random permutations (a*x + b mod p), seeded so signatures are reproducible."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.a = [rng.randrange(1, MERSENNE_PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_perm)]
+
+    def sign(self, shingle_sets):
+        """One signature (tuple of num_perm ints) per shingle set."""
+        if NUMPY_AVAILABLE:
+            return self._sign_numpy(shingle_sets)
+        return [
+            tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in zip(self.a, self.b))
+            for hashes in shingle_sets
+        ]
+
+    def _sign_numpy(self, shingle_sets):
+        import numpy as np
+
+        a = np.array(self.a, dtype=np.uint64)[:, None]
+        b = np.array(self.b, dtype=np.uint64)[:, None]
+        signatures = []
+        for start in range(0, len(shingle_sets), SIGN_CHUNK):
+            chunk = shingle_sets[start:start + SIGN_CHUNK]
+            lengths = np.array([len(s) for s in chunk])
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            flat = np.fromiter((h for s in chunk for h in s), dtype=np.uint64, count=int(lengths.sum()))
+            permuted = (a * flat[None, :] + b) % MERSENNE_PRIME
+            signatures.extend(map(tuple, np.minimum.reduceat(permuted, offsets, axis=1).T.tolist()))
+        return signatures
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+
+def find_near_duplicates(tracks, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM):
+    """
+    Groups tracks whose normalized titles have shingle Jaccard >= threshold and
+    share an artist. Titles are MinHashed and banded (LSH) with the artist ID in
+    the bucket key, so only colliding pairs are compared: roughly linear in the
+    number of tracks. Returns (clusters as lists of indices, stats, normalized titles).
+    """
+    normalized = [normalize_title(t.get('name') or "") for t in tracks]
+    shingle_sets = [shingles(title) for title, _ in normalized]
+    signatures = MinHasher(num_perm).sign(shingle_sets)
+    bands, rows = lsh_params(threshold, num_perm)
+
+    buckets = {}
+    for idx, (track, signature) in enumerate(zip(tracks, signatures)):
+        artist_ids = [a.get('id') for a in track.get('artists', [])[:2] if a.get('id')]
+        for band in range(bands):
+            band_key = hash(signature[band * rows:(band + 1) * rows])
+            for artist_id in artist_ids:
+                buckets.setdefault((artist_id, band, band_key), []).append(idx)
+
+    union_find = _UnionFind(len(tracks))
+    compared = set()
+    matches = 0
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i in range(len(members)):
+            for j in range(i + 1, len(members)):
+                x, y = members[i], members[j]
+                if x == y or (x, y) in compared:
+                    continue
+                compared.add((x, y))
+                a, b = shingle_sets[x], shingle_sets[y]
+                if len(a & b) / len(a | b) >= threshold:
+                    union_find.union(x, y)
+                    matches += 1
+
+    clusters = {}
+    for idx in range(len(tracks)):
+        clusters.setdefault(union_find.find(idx), []).append(idx)
+    duplicate_clusters = [members for members in clusters.values() if len(members) > 1]
+
+    stats = {
+        "tracks": len(tracks),
+        "bands": bands,
+        "rows": rows,
+        "candidate_pairs": len(compared),
+        "matched_pairs": matches,
+        "clusters": len(duplicate_clusters)
+    }
+    return duplicate_clusters, stats, normalized
+
+
+def dedup_near_duplicates(tracks, threshold=DEFAULT_THRESHOLD):
+    """
+    Keeps one track per near-duplicate cluster: explicit over clean, then the
+    plain title over a feature/edit variant, then the earliest in scan order.
+    Returns (kept, [(track, reason)], stats).
+    """
+    if not tracks or not threshold:
+        return list(tracks), [], {}
+    clusters, stats, normalized = find_near_duplicates(tracks, threshold)
+
+    dropped = {}
+    for members in clusters:
+        keeper = min(members, key=lambda i: (not tracks[i].get('explicit', False), normalized[i][1], i))
+        for idx in members:
+            if idx != keeper:
+                dropped[idx] = f"near-duplicate of '{tracks[keeper].get('name')}'"
+
+    kept = [t for i, t in enumerate(tracks) if i not in dropped]
+    excluded = [(tracks[i], reason) for i, reason in sorted(dropped.items())]
+    stats["dropped"] = len(excluded)
+    return kept, excluded, stats
@@ -0,0 +1,75 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CallPacer:
+    """
+    Token bucket in front of a scan's Spotify requests. Unpaced (rate None) by
+    default; the scan planner sets a sustainable rate for scans big enough to
+    run into Spotify's rolling-window limit, instead of bursting into a 429.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rate = None
+        self.burst = 1
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.waited_sec = 0.0
+
+    def configure(self, rate, burst=1):
+        with self.lock:
+            self.rate = rate
+            self.burst = max(1, burst)
+            self.tokens = float(self.burst)
+            self.updated = time.monotonic()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                if self.rate is None:
+                    return
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited_sec += wait
+            time.sleep(wait)
+
+    def stats(self):
+        with self.lock:
+            return {"calls_per_sec": self.rate, "burst": self.burst, "waited_sec": round(self.waited_sec, 1)}
+
+
+class ScanContext:
+    """Per-scan state shared by the scan's worker threads: its pacer and the Spotify requests it sent."""
+
+    def __init__(self):
+        self.pacer = CallPacer()
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def count_call(self):
+        with self.lock:
+            self.calls += 1
+
+
+_thread_scan = threading.local()
+
+
+def bind_scan_context(context):
+    _thread_scan.context = context
+
+
+def current_scan_context():
+    """The ScanContext of the scan running on this thread, else None (requests outside a scan)."""
+    return getattr(_thread_scan, "context", None)
+
+
+def scan_executor(context, max_workers):
+    """Thread pool whose workers run under `context`, so only the scan's own calls are paced and counted."""
+    return ThreadPoolExecutor(max_workers=max_workers, initializer=bind_scan_context, initargs=(context,))
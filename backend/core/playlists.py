@@ -0,0 +1,104 @@
+import time
+from .engine import safe_api_call, filter_tracks, log_message
+
+# Spotify caps playlist item reads and removals at 100 per request
+PLAYLIST_PAGE_SIZE = 100
+REMOVE_BATCH_SIZE = 100
+REMOVE_PACING_SEC = 0.5
+
+
+def extract_playlist_id(playlist_link):
+    """Accepts a full playlist URL, a spotify:playlist: URI or a bare ID."""
+    playlist_link = playlist_link.strip()
+    if "playlist/" in playlist_link:
+        return playlist_link.split("playlist/")[-1].split("?")[0]
+    if playlist_link.startswith("spotify:playlist:"):
+        return playlist_link.split(":")[-1]
+    return playlist_link
+
+
+def fetch_playlist_tracks(sp, playlist_id):
+    """
+    Pages through the whole playlist and returns (tracks, snapshot_id).
+    Local files and removed tracks (no ID) are skipped.
+    """
+    playlist = safe_api_call(sp.playlist, playlist_id, fields="snapshot_id")
+    snapshot_id = playlist.get('snapshot_id')
+
+    tracks = []
+    results = safe_api_call(sp.playlist_items, playlist_id, limit=PLAYLIST_PAGE_SIZE, offset=0,
+                            additional_types=('track',))
+    while results:
+        for item in results.get('items', []):
+            track = item.get('track')
+            if not track or not track.get('id') or item.get('is_local'):
+                continue
+            tracks.append(track)
+        if results.get('next'):
+            results = safe_api_call(sp.next, results)
+        else:
+            break
+
+    return tracks, snapshot_id
+
+
+def remove_tracks_chained(sp, playlist_id, uris, snapshot_id=None):
+    """
+    Removes URIs in batches of 100. Each batch is issued against the snapshot
+    returned by the previous one, and safe_api_call retries the same batch
+    after a 429 instead of skipping it.
+    Returns the final snapshot_id.
+    """
+    for i in range(0, len(uris), REMOVE_BATCH_SIZE):
+        chunk = uris[i:i + REMOVE_BATCH_SIZE]
+        result = safe_api_call(
+            sp.playlist_remove_all_occurrences_of_items,
+            playlist_id,
+            chunk,
+            snapshot_id=snapshot_id
+        )
+        if result and result.get('snapshot_id'):
+            snapshot_id = result['snapshot_id']
+        log_message(f"Removed batch {i // REMOVE_BATCH_SIZE + 1} ({len(chunk)} tracks) from playlist {playlist_id}")
+
+        if i + REMOVE_BATCH_SIZE < len(uris):
+            time.sleep(REMOVE_PACING_SEC)  # Gentle cooldown between write batches
+
+    return snapshot_id
+
+
+def clean_playlist(sp, playlist_link, no_filter_artists, filter_options={}, dry_run=False):
+    """
+    Applies the engine's filter rules (keywords, duration, clean/explicit dedup)
+    to an existing playlist and removes every excluded track.
+    """
+    playlist_id = extract_playlist_id(playlist_link)
+    tracks, snapshot_id = fetch_playlist_tracks(sp, playlist_id)
+    log_message(f"Playlist cleanup: loaded {len(tracks)} tracks from {playlist_id}")
+
+    kept, excluded = filter_tracks(tracks, no_filter_artists, filter_options)
+
+    # A URI can appear in the playlist more than once; remove each one only once,
+    # and never remove a URI that is also kept (remove_all_occurrences would drop both).
+    kept_uris = {t['uri'] for t in kept}
+    removed = {}
+    for t in excluded:
+        if t['uri'] not in kept_uris:
+            removed.setdefault(t['uri'], t)
+    remove_uris = list(removed)
+
+    if remove_uris and not dry_run:
+        snapshot_id = remove_tracks_chained(sp, playlist_id, remove_uris, snapshot_id)
+
+    return {
+        "playlist_id": playlist_id,
+        "snapshot_id": snapshot_id,
+        "total": len(tracks),
+        "kept_count": len(kept),
+        "removed_count": len(remove_uris),
+        "removed": [
+            {"uri": t['uri'], "name": t['name'], "artists": [a['name'] for a in t.get('artists', [])]}
+            for t in removed.values()
+        ],
+        "dry_run": dry_run
+    }
@@ -0,0 +1,126 @@
+import time
+import datetime
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from .discography_cache import discography_cache
+
+
+def release_ordinal(r_date_str):
+    """Day ordinal of a YYYY / YYYY-MM / YYYY-MM-DD date; None if invalid. Avoids strptime in the build loop."""
+    try:
+        if len(r_date_str) == 4:
+            return datetime.date(int(r_date_str), 1, 1).toordinal()
+        elif len(r_date_str) == 7:
+            return datetime.date(int(r_date_str[:4]), int(r_date_str[5:7]), 1).toordinal()
+        return datetime.date(int(r_date_str[:4]), int(r_date_str[5:7]), int(r_date_str[8:10])).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+class ReleaseCalendar:
+    """
+    Date-window index over the cached discographies. Release dates are parsed once
+    into sorted arrays of day ordinals (YYYY and YYYY-MM dates map to the first day,
+    exactly as get_new_releases treats them), with one global view and one view per
+    artist, so window queries are two bisects instead of an API sweep.
+    """
+
+    def __init__(self, cache=discography_cache):
+        self.cache = cache
+        self.lock = threading.Lock()
+        self.version = -1
+        self.ordinals = array('l')
+        self.albums = []          # Parallel to ordinals: (artist_id, album)
+        self.by_artist = {}       # artist_id -> (array of ordinals, [album])
+        self.covered_since = {}   # artist_id -> ordinal the listing is complete back to
+        self.refreshed_at = {}
+        self.build_ms = 0
+
+    def _ensure_built(self):
+        version, entries = self.cache.snapshot()
+        if version == self.version:
+            return
+        started = time.time()
+
+        rows = []
+        by_artist = {}
+        covered_since = {}
+        refreshed_at = {}
+        for artist_id, entry in entries.items():
+            artist_rows = []
+            for album in entry.get('albums', []):
+                ordinal = release_ordinal(album.get('release_date'))
+                if ordinal is not None:
+                    artist_rows.append((ordinal, album))
+            artist_rows.sort(key=lambda r: r[0])
+            by_artist[artist_id] = (array('l', (r[0] for r in artist_rows)), [r[1] for r in artist_rows])
+            rows.extend((o, artist_id, a) for o, a in artist_rows)
+
+            covered_since[artist_id] = release_ordinal(entry.get('covered_since'))
+            refreshed_at[artist_id] = entry.get('refreshed_at', 0)
+
+        rows.sort(key=lambda r: r[0])
+        with self.lock:
+            self.ordinals = array('l', (r[0] for r in rows))
+            self.albums = [(r[1], r[2]) for r in rows]
+            self.by_artist = by_artist
+            self.covered_since = covered_since
+            self.refreshed_at = refreshed_at
+            self.version = version
+            self.build_ms = int((time.time() - started) * 1000)
+
+    def query(self, start_date, end_date, artist_ids=None, album_groups=None):
+        """
+        Candidate albums released in [start_date, end_date] as [{'artist_id', **album}].
+        Restricting to artist_ids uses the per-artist views when that is cheaper.
+        """
+        self._ensure_built()
+        lo_key, hi_key = start_date.toordinal(), end_date.toordinal()
+        groups = set(album_groups) if album_groups else None
+        results = []
+
+        with self.lock:
+            if artist_ids is not None and len(artist_ids) < len(self.by_artist) // 10:
+                for artist_id in artist_ids:
+                    view = self.by_artist.get(artist_id)
+                    if not view:
+                        continue
+                    ordinals, albums = view
+                    for album in albums[bisect_left(ordinals, lo_key):bisect_right(ordinals, hi_key)]:
+                        results.append((artist_id, album))
+            else:
+                wanted = set(artist_ids) if artist_ids is not None else None
+                for artist_id, album in self.albums[bisect_left(self.ordinals, lo_key):bisect_right(self.ordinals, hi_key)]:
+                    if wanted is None or artist_id in wanted:
+                        results.append((artist_id, album))
+
+        return [
+            {'artist_id': artist_id, **album}
+            for artist_id, album in results
+            if groups is None or album.get('album_group') in groups
+        ]
+
+    def needs_refresh(self, artist_ids, start_date, max_age_sec):
+        """Artists whose cached listing doesn't reach back to start_date or is older than max_age_sec."""
+        self._ensure_built()
+        start_key = start_date.toordinal()
+        cutoff = time.time() - max_age_sec
+        with self.lock:
+            return [
+                artist_id for artist_id in artist_ids
+                if self.covered_since.get(artist_id) is None
+                or self.covered_since[artist_id] > start_key
+                or self.refreshed_at.get(artist_id, 0) < cutoff
+            ]
+
+    def stats(self):
+        self._ensure_built()
+        return {
+            "albums": len(self.albums),
+            "artists": len(self.by_artist),
+            "build_ms": self.build_ms
+        }
+
+# Global instance
+release_calendar = ReleaseCalendar()
@@ -0,0 +1,149 @@
+import math
+import time
+import datetime
+from ..config import settings as app_settings
+from .album_cache import album_cache
+from .discography_cache import discography_cache
+from .engine import parse_release_date, estimate_album_page_size
+from .discovery import FEED_PAGE_SIZE, FEED_MAX_OFFSET, SEARCH_MAX_OFFSET, search_covers, cache_trust_cutoff
+
+ALBUMS_BATCH_SIZE = 20             # get_tracks_for_albums_in_batch
+ENRICH_BATCH_SIZE = 50             # Several-tracks / several-artists endpoints
+CHUNK_SIZE = 20                    # Artists per scan loop chunk
+DEFAULT_RELEASES_PER_YEAR = 6.0    # Cadence assumed when no artist has a cached discography
+DEFAULT_TRACKS_PER_ALBUM = 4.0
+AVG_CALL_SEC = 0.35                # Typical request latency, per worker
+ALBUM_BATCH_PAUSE_SEC = 0.5        # Cooldown after each album details call
+CHUNK_PAUSE_SEC = 0.5              # Scan loop breathe between chunks
+
+
+def _releases_last_year(entry):
+    year_ago = datetime.date.today() - datetime.timedelta(days=365)
+    count = 0
+    for album in entry.get('albums', []):
+        r_date = parse_release_date(album.get('release_date'))
+        if r_date is not None and r_date >= year_ago:
+            count += 1
+    return count
+
+
+def estimate_scan(artists, settings):
+    """
+    Rough call count and duration for scanning `artists` with `settings`, from
+    the cached discographies (which artists are fresh, need a delta page or a
+    cold listing, and their release cadence) and the album cache. Also picks
+    the pacing: unpaced if the whole scan fits in one burst, else the
+    configured sustainable rate.
+    """
+    start = parse_release_date(settings['start_date'])
+    end = parse_release_date(settings['end_date'])
+    start_str = start.strftime('%Y-%m-%d')
+    days = max((end - start).days + 1, 1)
+    album_types = settings.get('album_types', ['album', 'single'])
+    include_groups = ",".join(album_types)
+    wanted = set(album_types)
+    feed_mode = settings.get('discovery_mode', 'full') == 'feed'
+    feed_cutoff = cache_trust_cutoff(end, settings.get('feed_max_cache_age_days', 28) * 24 * 3600)
+
+    entries = {a['id']: discography_cache.get(a['id']) for a in artists}
+    rates = [_releases_last_year(e) for e in entries.values() if e and e.get('albums')]
+    track_counts = [a['total_tracks'] for e in entries.values() if e for a in e.get('albums', []) if a.get('total_tracks')]
+    default_rate = sum(rates) / len(rates) if rates else DEFAULT_RELEASES_PER_YEAR
+    tracks_per_album = sum(track_counts) / len(track_counts) if track_counts else DEFAULT_TRACKS_PER_ALBUM
+
+    counts = {"fresh": 0, "delta": 0, "cold": 0}
+    listing_calls = 0
+    album_calls = 0.0
+    expected_albums = 0.0
+    artists_with_releases = 0.0
+    for artist in artists:
+        entry = entries[artist['id']]
+        if discography_cache.covers(entry, include_groups, start_str):
+            in_window = []
+            for album in entry['albums']:
+                r_date = parse_release_date(album.get('release_date'))
+                if r_date is not None and start <= r_date <= end and (album.get('album_group') or album.get('album_type')) in wanted:
+                    in_window.append(album['id'])
+            if discography_cache.is_fresh(entry) or (feed_mode and entry.get('refreshed_at', 0) >= feed_cutoff):
+                counts["fresh"] += 1
+            else:
+                counts["delta"] += 1
+                listing_calls += 1
+            albums = float(len(in_window))
+            new_albums = float(len(set(in_window) - album_cache.cached_ids(in_window)))
+        else:
+            counts["cold"] += 1
+            # Unknown artists get one full page; known ones a sized page, often one more per group
+            listing_calls += 1 if entry is None else len(album_types)
+            rate = _releases_last_year(entry) if entry and entry.get('albums') else default_rate
+            albums = new_albums = rate * days / 365.0
+
+        expected_albums += albums
+        artists_with_releases += min(1.0, albums)
+        # Below one album the expectation is the chance of needing the call
+        album_calls += new_albums if new_albums < 1 else math.ceil(new_albums / ALBUMS_BATCH_SIZE)
+
+    feed_calls = 0
+    if feed_mode:
+        feed_calls = FEED_MAX_OFFSET // FEED_PAGE_SIZE + 1
+        if search_covers(end):
+            feed_calls += SEARCH_MAX_OFFSET // FEED_PAGE_SIZE + 1
+
+    enrichment_calls = 0
+    if settings.get('enrich'):
+        enrichment_calls = (math.ceil(expected_albums * tracks_per_album / ENRICH_BATCH_SIZE)
+                            + math.ceil(artists_with_releases / ENRICH_BATCH_SIZE))
+
+    total_calls = int(math.ceil(listing_calls + album_calls + feed_calls + enrichment_calls))
+    pace = app_settings.SPOTIFY_CALLS_PER_SEC if total_calls > app_settings.SPOTIFY_BURST_CALLS else None
+    throughput = app_settings.SCAN_CONCURRENCY / AVG_CALL_SEC
+    effective_rate = min(throughput, pace) if pace else throughput
+    duration = (total_calls / effective_rate
+                + album_calls * ALBUM_BATCH_PAUSE_SEC / app_settings.SCAN_CONCURRENCY
+                + math.ceil(len(artists) / CHUNK_SIZE) * CHUNK_PAUSE_SEC)
+
+    budget = app_settings.SCAN_CALL_BUDGET
+    return {
+        "artists": len(artists),
+        "discographies": counts,
+        "expected_albums": round(expected_albums, 1),
+        "calls": {
+            "listing": listing_calls,
+            "album_details": int(math.ceil(album_calls)),
+            "feed": feed_calls,
+            "enrichment": enrichment_calls
+        },
+        "estimated_calls": total_calls,
+        "pacing_calls_per_sec": pace,
+        "estimated_duration_sec": int(duration),
+        "budget_calls": budget or None,
+        "within_budget": not budget or total_calls <= budget
+    }
+
+
+def apply_pacing(pacer, plan):
+    """Configures a scan's pacer for a run (plan None = unpaced)."""
+    pacer.configure(plan.get("pacing_calls_per_sec") if plan else None, app_settings.SPOTIFY_BURST_CALLS)
+
+
+def live_metrics(state, api_calls_now, pacer):
+    """ETA, artists/sec and calls/sec of the running scan, from the run markers the scanner keeps in its state."""
+    elapsed = max(time.time() - state["run_started_at"], 1e-6)
+    done = state.get("progress", 0) - state.get("run_progress_start", 0)
+    calls = api_calls_now - state.get("run_calls_start", api_calls_now)
+    artists_per_sec = done / elapsed
+    remaining = max(state.get("total", 0) - state.get("progress", 0), 0)
+
+    eta = None
+    if artists_per_sec > 0:
+        eta = remaining / artists_per_sec
+    elif state.get("plan"):
+        eta = max(state["plan"]["estimated_duration_sec"] - elapsed, 0)
+    return {
+        "elapsed_sec": round(elapsed, 1),
+        "api_calls": calls,
+        "artists_per_sec": round(artists_per_sec, 2),
+        "calls_per_sec": round(calls / elapsed, 2),
+        "eta_sec": int(eta) if eta is not None else None,
+        "pacing": pacer.stats()
+    }
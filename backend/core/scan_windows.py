@@ -0,0 +1,49 @@
+from .release_calendar import release_ordinal
+
+WINDOW_RESULTS_FILE = "cache/scan_results_windows.json"
+
+
+def scan_windows(settings):
+    """
+    The settings' date windows, oldest start first, each with a name (default
+    'start - end'). Empty for a plain single-window scan.
+    """
+    windows = []
+    for window in settings.get('windows') or []:
+        start, end = window['start_date'], window['end_date']
+        windows.append({
+            "name": window.get('name') or f"{start} - {end}",
+            "start_date": start,
+            "end_date": end,
+            "export_name": window.get('export_name')
+        })
+    return sorted(windows, key=lambda w: (w["start_date"], w["end_date"]))
+
+
+def with_window_span(settings):
+    """
+    Settings whose start_date/end_date cover every window, so one pass fetches
+    each artist's albums and album details once for all of them.
+    """
+    windows = scan_windows(settings)
+    if not windows:
+        return settings
+    return {
+        **settings,
+        "start_date": min(w["start_date"] for w in windows),
+        "end_date": max(w["end_date"] for w in windows)
+    }
+
+
+def split_by_window(tracks, windows):
+    """Routes tracks into per-window lists by album release date. Overlapping windows share tracks."""
+    bounds = [(release_ordinal(w["start_date"]), release_ordinal(w["end_date"])) for w in windows]
+    routed = [[] for _ in windows]
+    for track in tracks:
+        ordinal = release_ordinal((track.get('album') or {}).get('release_date'))
+        if ordinal is None:
+            continue
+        for idx, (lo, hi) in enumerate(bounds):
+            if lo <= ordinal <= hi:
+                routed[idx].append(track)
+    return routed
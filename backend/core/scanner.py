@@ -5,8 +5,24 @@ import time
 import datetime
 import logging
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from ..config import settings as app_settings
 from .storage_manager import storage
+from .album_cache import album_cache
+from .discography_cache import discography_cache
+from .engine import api_single_flight, log_message
+from .token_manager import token_manager
+from .client_factory import client_factory
+from .discovery import plan_discovery, record_coverage
+from .accumulator import weekly_accumulator, artist_in_slice, slice_of
+from .candidate_cache import candidate_cache, build_filter_options
+from .near_duplicates import dedup_near_duplicates
+from .archive import scan_archive
+from .export_index import export_index
+from .enrichment import enrichment_cache, dedup_by_isrc
+from .artist_policy import artist_policy
+from .scan_windows import scan_windows, with_window_span, split_by_window, WINDOW_RESULTS_FILE
+from .scan_planner import estimate_scan, apply_pacing, live_metrics
+from .pacing import ScanContext, scan_executor
 
 # Constants
 CACHE_DIR = "cache"
@@ -16,7 +32,22 @@ ARTISTS_CACHE_FILE = f"{CACHE_DIR}/artists_cache.json"
 
 class AdvancedEngine:
     def __init__(self):
-        self.state = {
+        # Loaded from storage on first access rather than at import time (cold start)
+        self._state = None
+        self.scan_context = ScanContext()
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._load_state()
+        return self._state
+
+    @state.setter
+    def state(self, value):
+        self._state = value
+
+    def _load_state(self):
+        self._state = {
             "is_running": False,
             "status": "idle",
             "progress": 0,
@@ -25,16 +56,13 @@ class AdvancedEngine:
             "logs": [],
             "results_count": 0
         }
-        self._load_state()
-
-    def _load_state(self):
         loaded = storage.load_json(SCAN_STATE_FILE)
         if loaded:
             # We don't necessarily want to carry over 'is_running' as True on restart
             # But for resuming maybe?
             # Let's trust the loaded state but force is_running false on init
-            self.state = loaded
-            self.state["is_running"] = False # Reset on boot
+            self._state = loaded
+            self._state["is_running"] = False # Reset on boot
 
     def _save_state(self):
         storage.save_json(SCAN_STATE_FILE, self.state)
@@ -66,7 +94,7 @@ class AdvancedEngine:
     def _load_artists_cache(self):
         return storage.load_json(ARTISTS_CACHE_FILE, [])
 
-    async def fetch_all_followed_artists(self, sp):
+    async def fetch_all_followed_artists(self, sp, report=True):
         artists = []
         last_artist_id = None
         
@@ -81,14 +109,15 @@ class AdvancedEngine:
                 artists.extend(chunk)
                 last_artist_id = chunk[-1]['id']
                 
-                self.log(f"Fetched {len(artists)} artists so far...")
-                self.state["current_artist"] = f"Loading Artist List ({len(artists)} found)..."
-                self._save_state()
+                if report:
+                    self.log(f"Fetched {len(artists)} artists so far...")
+                    self.state["current_artist"] = f"Loading Artist List ({len(artists)} found)..."
+                    self._save_state()
                 
                 if len(chunk) < 50:
                     break
             except Exception as e:
-                self.log(f"Error fetching artists: {e}")
+                (self.log if report else log_message)(f"Error fetching artists: {e}")
                 break
         
         if artists:
@@ -98,7 +127,7 @@ class AdvancedEngine:
 
 
 
-    async def fetch_liked_songs_artists(self, sp, min_count=1):
+    async def fetch_liked_songs_artists(self, sp, min_count=1, report=True):
         artist_counts = {}
         offset = 0
         limit = 50
@@ -122,8 +151,9 @@ class AdvancedEngine:
                         artist_counts[aid]['count'] += 1
                 
                 offset += limit
-                self.log(f"Scanned {offset} liked songs...")
-                self.state["current_artist"] = f"Scanning Liked Songs ({len(artist_counts)} artists found)..."
+                if report:
+                    self.log(f"Scanned {offset} liked songs...")
+                    self.state["current_artist"] = f"Scanning Liked Songs ({len(artist_counts)} artists found)..."
                 
                 # Safety break for huge libraries (optional, but good practice)
                 if offset > 10000: 
@@ -133,7 +163,7 @@ class AdvancedEngine:
                     break
                     
             except Exception as e:
-                self.log(f"Error fetching liked songs: {e}")
+                (self.log if report else log_message)(f"Error fetching liked songs: {e}")
                 break
                 
         # Filter by min_count
@@ -144,7 +174,339 @@ class AdvancedEngine:
                 
         return filtered_artists
 
+    async def gather_artists(self, sp, settings, report=True):
+        """
+        Builds the roster for a scan: followed + liked-song artists, minus exclusions
+        and slicing. With report=False it leaves the scan state and logs alone, for
+        callers that only need the roster while a scan may be running.
+        """
+        refresh_artists = settings.get('refresh_artists', True)
+        include_followed = settings.get('include_followed', True)
+        include_liked = settings.get('include_liked_songs', False)
+        min_liked = settings.get('min_liked_songs', 1)
+        
+        # Exclude logic: stored exclusion list + this scan's exclude_artists
+        policy = artist_policy.for_settings(settings)
+
+        followed_artists = []
+        if include_followed:
+            if not refresh_artists and storage.exists(ARTISTS_CACHE_FILE):
+                 if report:
+                     self.log("Loading followed artists from cache...")
+                 followed_artists = self._load_artists_cache()
+            if not followed_artists:
+                 if report:
+                     self.log("Fetching followed artists from Spotify...")
+                     self.state["status"] = "fetching_artists" # generic status
+                     self._save_state()
+                 followed_artists = await self.fetch_all_followed_artists(sp, report)
+                 self._save_artists_cache(followed_artists)
+
+        liked_artists = []
+        if include_liked:
+            if report:
+                self.log("Fetching artists from Liked Songs...")
+                self.state["status"] = "fetching_liked"
+                self._save_state()
+            liked_artists = await self.fetch_liked_songs_artists(sp, min_liked, report)
+            
+        # Merge lists unique by ID
+        unique_map = {a['id']: a for a in followed_artists}
+        for a in liked_artists:
+            unique_map[a['id']] = a
+        
+        all_artists = list(unique_map.values())
+
+        # Filter Excluded Artists
+        artists = [a for a in all_artists if not policy.is_excluded(a['id'], a['name'])]
+        
+        # Daily 'slice' runs only cover a stable rotating part of the roster
+        artist_slice = settings.get('artist_slice')
+        if artist_slice:
+            slice_index, slice_count = artist_slice
+            artists = [a for a in artists if artist_in_slice(a['id'], slice_index, slice_count)]
+            if report:
+                self.log(f"Scanning roster slice {slice_index + 1}/{slice_count} ({len(artists)} artists)")
+
+        # The finalize-day slice run: only slices with days left to check, each from its own start
+        slice_starts = settings.get('slice_starts')
+        if slice_starts is not None:
+            slice_count = settings['slice_count']
+            artists = [a for a in artists if str(slice_of(a['id'], slice_count)) in slice_starts]
+            if report:
+                self.log(f"Re-checking {len(slice_starts)}/{slice_count} roster slices since their last run ({len(artists)} artists)")
+
+        return artists
+
+    def build_scan_params(self, settings):
+        start_date_str = settings.get('start_date')
+        end_date_str = settings.get('end_date')
+        
+        # Album Types (include_groups)
+        album_types = settings.get('album_types', ['album', 'single'])
+        
+        return {
+            "start_date_str": start_date_str,
+            "end_date_str": end_date_str,
+            "start_date": datetime.datetime.strptime(start_date_str, '%Y-%m-%d').date(),
+            "end_date": datetime.datetime.strptime(end_date_str, '%Y-%m-%d').date(),
+            "album_types": album_types,
+            # Filter Config
+            "filter_config": build_filter_options(settings),
+            "enrich": settings.get('enrich', False),
+            "slice_count": settings.get('slice_count'),
+            "slice_starts": {int(index): datetime.datetime.strptime(start, '%Y-%m-%d').date()
+                             for index, start in (settings.get('slice_starts') or {}).items()},
+            # Snapshot for the whole run; edits apply to the next scan
+            "artist_policy": artist_policy.for_settings(settings)
+        }
+
+    def begin_scan_context(self):
+        """
+        Fresh per-run context (pacer) and the thread pool (SCAN_CONCURRENCY workers,
+        default 5 as in the legacy script) whose workers run under it.
+        """
+        self.scan_context = ScanContext()
+        return scan_executor(self.scan_context, app_settings.SCAN_CONCURRENCY)
+
+    async def plan_feed_discovery(self, executor, work_sp, settings, artists, params):
+        """Feed discovery: only roster artists the feed/cache can't answer get an artist_albums check."""
+        if settings.get('discovery_mode', 'full') != 'feed':
+            return {}
+        self.state["status"] = "discovering"
+        self._save_state()
+        loop = asyncio.get_event_loop()
+        max_age_sec = settings.get('feed_max_cache_age_days', 28) * 24 * 3600
+        discovery_plan, discovery_stats = await loop.run_in_executor(
+            executor, plan_discovery, work_sp, artists, params["start_date"], params["end_date"], params["album_types"], max_age_sec
+        )
+        self.state["discovery"] = discovery_stats
+        self.log(f"Discovery: {discovery_stats['from_cache']} artists answered from cache + feed "
+                 f"({discovery_stats['with_feed_releases']} with releases only the feed had), "
+                 f"{discovery_stats['targeted']} to check")
+        self.state["status"] = "scanning"
+        self._save_state()
+        return discovery_plan
+
+    def artist_start_date(self, params, artist_id):
+        """The window start for one artist: its slice's own start on a finalize-day slice run."""
+        if not params["slice_starts"]:
+            return params["start_date"]
+        return params["slice_starts"].get(slice_of(artist_id, params["slice_count"]), params["start_date"])
+
+    async def process_chunk(self, executor, work_sp, chunk, params, discovery_plan):
+        """
+        Fetches a chunk's candidates on the thread pool, records them in the candidate
+        cache and filters them. Returns (kept tracks, critical error or None).
+        """
+        from .engine import fetch_artist_candidates, filter_candidates
+
+        loop = asyncio.get_event_loop()
+        # Exclusions were applied to the roster; this catches ones added since a budgeted job froze it
+        policy = params["artist_policy"]
+        chunk = [a for a in chunk if not policy.is_excluded(a['id'], a.get('name'))]
+        tasks = []
+        for artist in chunk:
+            # Run sync function in thread
+            task = loop.run_in_executor(
+                executor,
+                fetch_artist_candidates,
+                work_sp,          # App Token (or User Token)
+                artist['id'],
+                self.artist_start_date(params, artist['id']),
+                params["end_date"],
+                params["filter_config"],
+                discovery_plan.get(artist['id'])
+            )
+            tasks.append(task)
+        
+        # Wait for batch
+        batch_results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        fetched = []
+        critical_error = None
+        for artist, res in zip(chunk, batch_results):
+            if isinstance(res, Exception):
+                err_msg = str(res)
+                print(f"Batch Error: {err_msg}")
+                
+                if "CRITICAL_RATE_LIMIT" in err_msg:
+                    critical_error = err_msg
+                    break
+                continue
+            
+            if not res: continue
+            fetched.append((artist, res))
+
+        # One enrichment pass per chunk, so the 50-ID batches fill up across artists
+        if params.get("enrich") and fetched and critical_error is None:
+            try:
+                await loop.run_in_executor(executor, self.enrich_candidates, work_sp, [res for _, res in fetched])
+            except Exception as e:
+                if "CRITICAL_RATE_LIMIT" not in str(e):
+                    raise
+                # Drop the chunk: a retry (budgeted steps) re-fetches it from the caches
+                return [], str(e)
+
+        no_filter = policy.no_filter_for(chunk)
+        kept_tracks = []
+        for artist, res in fetched:
+            candidate_cache.add(artist, res)
+            kept, excluded = filter_candidates(res, no_filter, params["filter_config"])
+            if kept:
+                kept_tracks.extend(kept)
+        return kept_tracks, critical_error
+
+    def enrich_candidates(self, sp, candidate_sets):
+        """Replaces the candidates' track lists with enriched copies (popularity, ISRC, genres)."""
+        entries = [entry for candidates in candidate_sets for entry in candidates.values()]
+        enriched = enrichment_cache.enrich_tracks(sp, [t for entry in entries for t in entry['tracks']])
+        position = 0
+        for entry in entries:
+            count = len(entry['tracks'])
+            entry['tracks'] = enriched[position:position + count]
+            position += count
+
+    def handle_critical_error(self, err_msg):
+        self.log(f"⛔ CRITICAL ERROR: {err_msg}")
+        self.state["status"] = "error"
+        self.state["error"] = "Spotify Rate Limit Hit (Too many requests). Please try again later."
+        self.stop_scan()
+
+    def archive_scan(self, settings, results_buffer, run_stats):
+        """Appends the finished scan (kept + excluded with reasons) to the history archive."""
+        try:
+            outcome = candidate_cache.refilter(settings)
+            excluded = outcome["excluded"] if outcome["status"] == "success" else []
+            scan_archive.record_scan(run_stats["scan_id"], settings, results_buffer, excluded, run_stats)
+        except Exception as e:
+            self.log(f"Archive: failed to record scan: {e}")
+
+    def finish_scan(self, sp, settings, results_buffer, auto_export_name=None, completed=True, run_stats=None):
+        """Saves results, records discovery coverage and history, feeds the weekly accumulator and auto-exports."""
+        start_date_str = settings.get('start_date')
+        end_date_str = settings.get('end_date')
+
+        if settings.get('enrich'):
+            results_buffer, same_recording = dedup_by_isrc(results_buffer)
+            self.log(f"Enrichment: dropped {len(same_recording)} repeated recordings (ISRC), {enrichment_cache.stats()}")
+
+        near_dup_threshold = settings.get('near_duplicate_threshold', 0)
+        if near_dup_threshold:
+            results_buffer, dropped, dedup_stats = dedup_near_duplicates(results_buffer, near_dup_threshold)
+            self.log(f"Near-duplicates: dropped {len(dropped)} tracks ({dedup_stats.get('candidate_pairs', 0)} candidate pairs)")
+
+        self.log(f"DEBUG: Loop finished. Saving {len(results_buffer)} results.")
+        storage.save_json(RESULTS_FILE, results_buffer)
+        candidate_cache.save()
+        enrichment_cache.save()
+
+        if completed:
+            coverage = record_coverage(
+                settings.get('discovery_mode', 'full'), start_date_str, end_date_str,
+                [t['album']['id'] for t in results_buffer if t.get('album')]
+            )
+            if coverage:
+                self.state["discovery_coverage"] = coverage
+                self.log(f"Discovery coverage vs full scan: {coverage['found']}/{coverage['full_albums']} albums ({coverage['coverage']:.0%})")
+        # Multi-window scans: route the single pass's results into each window.
+        # Always written (empty for a single-window scan) so older windows aren't served with newer results
+        windows = scan_windows(settings)
+        window_results = split_by_window(results_buffer, windows)
+        storage.save_json(WINDOW_RESULTS_FILE, [
+            {**window, "count": len(tracks), "tracks": tracks} for window, tracks in zip(windows, window_results)
+        ])
+        if windows:
+            self.log("Windows: " + ", ".join(f"{w['name']} ({len(t)})" for w, t in zip(windows, window_results)))
+
+        if completed and run_stats:
+            if windows:
+                # One archive entry per window; duration and API calls are the shared pass's
+                for window, tracks in zip(windows, window_results):
+                    window_settings = {**settings, "start_date": window["start_date"], "end_date": window["end_date"]}
+                    self.archive_scan(window_settings, tracks, {**run_stats, "scan_id": f"{run_stats['scan_id']}#{window['name']}"})
+            else:
+                self.archive_scan(settings, results_buffer, run_stats)
+        self.log(f"Album cache: {album_cache.stats()}")
+        self.log(f"Discography cache: {discography_cache.stats()}")
+        self.log(f"Coalesced requests: {api_single_flight.stats()}")
+        
+        # Daily mini-scans: merge into the week, export only on the finalize run
+        export_tracks = results_buffer
+        export_start, export_end = start_date_str, end_date_str
+        if settings.get('accumulate'):
+            export_tracks = []
+            if completed:
+                added = weekly_accumulator.add(results_buffer, settings)
+                self.log(f"Weekly accumulator: {added} new tracks from this run")
+                if settings.get('finalize'):
+                    export_tracks = weekly_accumulator.finalize(settings)
+                    export_start, export_end = settings['week_start'], settings['week_end']
+                    self.log(f"Finalizing week {export_start} - {export_end} ({len(export_tracks)} tracks)")
+
+        # Auto Export Logic (one playlist per window when the scan covered several)
+        exports = []
+        if windows and not settings.get('accumulate'):
+            for window, tracks in zip(windows, window_results):
+                name = window["export_name"] or auto_export_name
+                if name and tracks:
+                    exports.append((f"{name} {window['start_date']} - {window['end_date']}", tracks))
+        elif auto_export_name and export_tracks:
+            # Calculate Date Range for name
+            exports.append((f"{auto_export_name} {export_start} - {export_end}", export_tracks))
+        for final_name, tracks in exports:
+            self.export_playlist(sp, final_name, tracks)
+        
+        self.state["results_count"] = len(results_buffer)
+        if self.state.get("status") != "error":
+            self.state["status"] = "completed"
+
+    def plan_run(self, artists, settings):
+        """
+        Estimates the scan's cost and sets its pacing. Returns False (status
+        'refused') if the estimate exceeds SCAN_CALL_BUDGET and the settings
+        don't say ignore_budget.
+        """
+        plan = estimate_scan(artists, settings)
+        self.state["plan"] = plan
+        pacing = f", paced at {plan['pacing_calls_per_sec']} calls/s" if plan["pacing_calls_per_sec"] else ""
+        self.log(f"Plan: ~{plan['estimated_calls']} API calls for {plan['artists']} artists, "
+                 f"~{plan['estimated_duration_sec']}s{pacing}")
+        if not plan["within_budget"] and not settings.get('ignore_budget'):
+            self.state["status"] = "refused"
+            self.state["error"] = (f"Estimated {plan['estimated_calls']} API calls exceeds the budget of {plan['budget_calls']}. "
+                                   f"Narrow the window or roster, run it as budgeted automation steps, or set ignore_budget.")
+            self.log(f"⛔ {self.state['error']}")
+            return False
+        apply_pacing(self.scan_context.pacer, plan)
+        return True
+
+    def mark_run_start(self, progress=0):
+        """Markers live_metrics measures the run's rates from."""
+        self.state["run_started_at"] = time.time()
+        self.state["run_calls_start"] = self.scan_context.calls
+        self.state["run_progress_start"] = progress
+
+    def export_playlist(self, sp, final_name, tracks):
+        self.log(f"Starting Auto-Export to playlist '{final_name}'...")
+        try:
+             user_id = sp.current_user()['id']
+             
+             pl = sp.user_playlist_create(user_id, final_name, public=False)
+             uris = [t['uri'] for t in tracks]
+             
+             # Batch add
+             for j in range(0, len(uris), 100):
+                 sp.playlist_add_items(pl['id'], uris[j:j+100])
+             export_index.add_tracks(tracks, final_name)
+             export_index.save()
+                 
+             self.log(f"SUCCESS: Auto-exported to {final_name}")
+        except Exception as exp:
+             self.log(f"ERROR: Auto-export failed: {exp}")
+
     async def scan_process(self, sp, settings, app_sp=None, auto_export_name=None):
+        settings = with_window_span(settings)
         # Use App Client for heavy lifting if provided, else fallback to User Client
         work_sp = app_sp if app_sp else sp
         
@@ -153,89 +515,34 @@ class AdvancedEngine:
         self.state["progress"] = 0
         self.state["results_count"] = 0
         self.state["logs"] = []
+        for key in ("discovery", "discovery_coverage", "plan", "run_started_at", "error"):
+            self.state.pop(key, None)
         self._save_state()
         
         try:
+            executor = self.begin_scan_context()
+
             # 1. Gather Artists
-            refresh_artists = settings.get('refresh_artists', True)
-            include_followed = settings.get('include_followed', True)
-            include_liked = settings.get('include_liked_songs', False)
-            min_liked = settings.get('min_liked_songs', 1)
-            
-            # Exclude logic
-            exclude_raw = settings.get('exclude_artists', [])
-            exclude_ids = set()
-            exclude_names = set()
-            for ex in exclude_raw:
-                if len(ex) == 22 and " " not in ex: # Simple ID check
-                     exclude_ids.add(ex)
-                else:
-                     exclude_names.add(ex.lower().strip())
-
-            followed_artists = []
-            if include_followed:
-                if not refresh_artists and storage.exists(ARTISTS_CACHE_FILE):
-                     self.log("Loading followed artists from cache...")
-                     followed_artists = self._load_artists_cache()
-                if not followed_artists:
-                     self.log("Fetching followed artists from Spotify...")
-                     self.state["status"] = "fetching_artists" # generic status
-                     self._save_state()
-                     followed_artists = await self.fetch_all_followed_artists(sp)
-                     self._save_artists_cache(followed_artists)
+            artists = await self.gather_artists(sp, settings)
 
-            liked_artists = []
-            if include_liked:
-                self.log("Fetching artists from Liked Songs...")
-                self.state["status"] = "fetching_liked"
-                self._save_state()
-                liked_artists = await self.fetch_liked_songs_artists(sp, min_liked)
-                
-            # Merge lists unique by ID
-            unique_map = {a['id']: a for a in followed_artists}
-            for a in liked_artists:
-                unique_map[a['id']] = a
-            
-            all_artists = list(unique_map.values())
-
-            # Filter Excluded Artists
-            artists = []
-            for a in all_artists:
-                if a['id'] in exclude_ids: continue
-                if a['name'].lower().strip() in exclude_names: continue
-                artists.append(a)
-            
             self.state["total"] = len(artists)
+            if not self.plan_run(artists, settings):
+                return
             self.state["status"] = "scanning"
             self._save_state()
             
-            concurrency_limit = 5
-            
-            start_date_str = settings.get('start_date')
-            end_date_str = settings.get('end_date')
-            start_date = datetime.datetime.strptime(start_date_str, '%Y-%m-%d').date()
-            end_date = datetime.datetime.strptime(end_date_str, '%Y-%m-%d').date()
-            
-            # Album Types (include_groups)
-            album_types = settings.get('album_types', ['album', 'single'])
-            include_groups_str = ",".join(album_types)
-            
-            # Filter Config
-            filter_config = {
-                "min_duration_ms": settings.get('min_duration_sec', 90) * 1000,
-                "max_duration_ms": settings.get('max_duration_sec', 270) * 1000,
-                "forbidden_keywords": settings.get('forbidden_keywords', []),
-                "include_groups": include_groups_str
+            params = self.build_scan_params(settings)
+            results_buffer = []
+            run_stats = {
+                "scan_id": datetime.datetime.now().isoformat(),
+                "started_at": datetime.datetime.now().isoformat(),
+                "api_calls": self.scan_context.calls
             }
+            started = time.time()
+            self.mark_run_start()
+            candidate_cache.begin(run_stats["scan_id"], settings)
+            discovery_plan = await self.plan_feed_discovery(executor, work_sp, settings, artists, params)
 
-            from .engine import process_artist
-            
-            results_buffer = []
-            loop = asyncio.get_event_loop()
-            
-            # THREAD POOL for Synchronous Engine (Matches legacy script max_workers=5)
-            executor = ThreadPoolExecutor(max_workers=5)
-            
             chunk_size = 20
             self.log(f"DEBUG: Starting scan loop for {len(artists)} artists")
             
@@ -245,44 +552,10 @@ class AdvancedEngine:
                 chunk = artists[i:i + chunk_size]
                 self.state["current_artist"] = f"Processing batch {i}-{i+len(chunk)}"
                 
-                tasks = []
-                for artist in chunk:
-                    # Run sync function in thread
-                    task = loop.run_in_executor(
-                        executor,
-                        process_artist,
-                        work_sp,          # App Token (or User Token)
-                        artist,
-                        [],               # exclusion_artists handled above
-                        [],               # no_filter_artists
-                        start_date,
-                        end_date,
-                        filter_config
-                    )
-                    tasks.append(task)
-                
-                # Wait for batch
-                batch_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for res in batch_results:
-                    if isinstance(res, Exception):
-                        err_msg = str(res)
-                        print(f"Batch Error: {err_msg}")
-                        
-                        if "CRITICAL_RATE_LIMIT" in err_msg:
-                            self.log(f"⛔ CRITICAL ERROR: {err_msg}")
-                            self.state["status"] = "error"
-                            self.state["error"] = "Spotify Rate Limit Hit (Too many requests). Please try again later."
-                            self.stop_scan()
-                            # Break out of the results processing
-                            break 
-                        continue
-                    
-                    if not res: continue
-
-                    kept, excluded = res
-                    if kept:
-                        results_buffer.extend(kept)
+                kept, critical_error = await self.process_chunk(executor, work_sp, chunk, params, discovery_plan)
+                results_buffer.extend(kept)
+                if critical_error:
+                    self.handle_critical_error(critical_error)
                 
                 self.state["progress"] += len(chunk)
                 self.state["results_count"] = len(results_buffer)
@@ -292,30 +565,9 @@ class AdvancedEngine:
                 await asyncio.sleep(0.5)
                 
             # Finalize
-            self.log(f"DEBUG: Loop finished. Saving {len(results_buffer)} results.")
-            storage.save_json(RESULTS_FILE, results_buffer)
-            
-            # Auto Export Logic
-            if auto_export_name and results_buffer:
-                self.log(f"Starting Auto-Export to playlist '{auto_export_name}'...")
-                try:
-                     # Calculate Date Range for name
-                     final_name = f"{auto_export_name} {start_date_str} - {end_date_str}"
-                     user_id = sp.current_user()['id']
-                     
-                     pl = sp.user_playlist_create(user_id, final_name, public=False)
-                     uris = [t['uri'] for t in results_buffer]
-                     
-                     # Batch add
-                     for j in range(0, len(uris), 100):
-                         sp.playlist_add_items(pl['id'], uris[j:j+100])
-                         
-                     self.log(f"SUCCESS: Auto-exported to {final_name}")
-                except Exception as exp:
-                     self.log(f"ERROR: Auto-export failed: {exp}")
-            
-            self.state["results_count"] = len(results_buffer)
-            self.state["status"] = "completed"
+            run_stats["api_calls"] = self.scan_context.calls - run_stats["api_calls"]
+            run_stats["duration_sec"] = round(time.time() - started, 1)
+            self.finish_scan(sp, settings, results_buffer, auto_export_name, completed=self.state["is_running"], run_stats=run_stats)
             
         except Exception as e:
             self.state["status"] = "error"
@@ -325,6 +577,8 @@ class AdvancedEngine:
             traceback.print_exc()
         finally:
             self.log("DEBUG: scan_process cleanup (finally block).")
+            album_cache.save() # Keep whatever was fetched, even on errors
+            discography_cache.save()
             self.state["is_running"] = False
             self._save_state()
 
@@ -336,11 +590,27 @@ class AdvancedEngine:
         if time.time() < rate_limit_until:
             current_state["status"] = "rate_limited"
             current_state["retry_after"] = int(rate_limit_until - time.time())
-            
+
+        current_state["coalescing"] = api_single_flight.stats()
+        current_state["tokens"] = token_manager.stats()
+        current_state["http"] = client_factory.stats()
+        if current_state.get("is_running") and current_state.get("run_started_at"):
+            current_state["live"] = live_metrics(current_state, self.scan_context.calls, self.scan_context.pacer)
         return current_state
     
-    def get_results(self):
-        return storage.load_json(RESULTS_FILE, [])
+    def get_results(self, sort=None, window=None):
+        if window:
+            windows = storage.load_json(WINDOW_RESULTS_FILE, [])
+            results = next((w["tracks"] for w in windows if w["name"] == window), [])
+        else:
+            results = storage.load_json(RESULTS_FILE, [])
+        if sort == "popularity":
+            # Unenriched tracks (no popularity) go last
+            results.sort(key=lambda t: t.get('popularity') if t.get('popularity') is not None else -1, reverse=True)
+        return results
+
+    def get_window_summary(self):
+        return [{k: v for k, v in w.items() if k != "tracks"} for w in storage.load_json(WINDOW_RESULTS_FILE, [])]
     
     def stop_scan(self):
         self.state["is_running"] = False
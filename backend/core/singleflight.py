@@ -0,0 +1,69 @@
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+def freeze(value):
+    """Turns call arguments into a hashable key (lists/dicts -> tuples)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return tuple(sorted(freeze(v) for v in value))
+    return value
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs the
+    function, callers arriving while it is in flight wait and share its result
+    (or its exception). Nothing is cached once the call returns.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.counters = {"executed": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.in_flight.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.counters["coalesced"] += 1
+                leader = False
+            else:
+                call = _Call()
+                self.in_flight[key] = call
+                self.counters["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            call.event.set()
+
+    def stats(self):
+        with self.lock:
+            return {**self.counters, "in_flight": len(self.in_flight)}
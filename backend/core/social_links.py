@@ -0,0 +1,202 @@
+import os
+import re
+import json
+import base64
+import asyncio
+import httpx
+from .ttl_cache import PersistentTTLCache
+from .artist_directory import artist_directory
+from .engine import log_message, safe_api_call
+
+SOCIAL_LINKS_CACHE_FILE = "cache/artist_social_links.json"
+SPOTIFY_ARTIST_BASE_URL = os.getenv("SPOTIFY_ARTIST_BASE_URL", "https://open.spotify.com/artist/")
+
+FOUND_TTL_SEC = 30 * 24 * 3600
+NOT_FOUND_TTL_SEC = 7 * 24 * 3600
+HTTP_TIMEOUT_SEC = 10
+DEFAULT_CONCURRENCY = 8
+ARTISTS_BATCH_SIZE = 50  # sp.artists takes up to 50 IDs
+
+# Not profile handles: instagram.com/p/<post>, /reel/<id>, /explore/...
+RESERVED_PATHS = {"p", "reel", "reels", "explore", "accounts", "stories", "tv", "about", "developer", "legal"}
+# Spotify's own accounts, linked from the page chrome (footer, share menus) on every artist page
+SPOTIFY_ACCOUNTS = {"spotify", "spotifyartists", "spotifyforartists", "spotifynews", "spotifyuk", "spotifyusa"}
+INSTAGRAM_RE = re.compile(r"instagram\.com\\?/([A-Za-z0-9_.]{1,30})")
+# Spotify ships the page state as base64 JSON in <script id="initialState">
+INITIAL_STATE_RE = re.compile(r'<script[^>]+id="initialState"[^>]*>([^<]+)</script>')
+
+NOT_FOUND = ""  # Cached marker for "page parsed, artist has no Instagram link"
+
+
+def _external_link_urls(node):
+    """URLs listed under any 'externalLinks' key of the decoded page state (the artist's own links)."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "externalLinks":
+                items = value.get("items", []) if isinstance(value, dict) else value
+                for item in items or []:
+                    if isinstance(item, dict) and item.get("url"):
+                        yield item["url"]
+            else:
+                yield from _external_link_urls(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _external_link_urls(item)
+
+
+def _first_handle(text):
+    for handle in INSTAGRAM_RE.findall(text):
+        handle = handle.rstrip(".")
+        if handle.lower() not in RESERVED_PATHS and handle.lower() not in SPOTIFY_ACCOUNTS:
+            return handle
+    return None
+
+
+def extract_instagram_handle(html):
+    """
+    Returns the Instagram handle the artist links from their Spotify page, NOT_FOUND when
+    the page parsed but the artist has no Instagram link, or None when the page doesn't
+    look like an artist page. With the page state available only its externalLinks are
+    read; otherwise (a rendered DOM without it) any link but Spotify's own accounts counts.
+    """
+    states = []
+    for encoded in INITIAL_STATE_RE.findall(html):
+        try:
+            states.append(json.loads(base64.b64decode(encoded.strip()).decode("utf-8", errors="ignore")))
+        except Exception:
+            continue
+
+    if states:
+        for state in states:
+            for url in _external_link_urls(state):
+                handle = _first_handle(url)
+                if handle:
+                    return handle
+        return NOT_FOUND
+
+    handle = _first_handle(html)
+    if handle:
+        return handle
+    if "externalLinks" in html:
+        return NOT_FOUND
+    return None
+
+
+class SocialLinkResolver:
+    """
+    Resolves artist Instagram handles from the Spotify artist page over plain HTTP,
+    with a bounded number of concurrent requests and a persistent cache. Pages that
+    can't be parsed fall back to the pooled browser from instagram_validator.
+    """
+
+    def __init__(self, base_url=SPOTIFY_ARTIST_BASE_URL, concurrency=DEFAULT_CONCURRENCY, cache=None, browser_pool=None):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.concurrency = concurrency
+        self.cache = cache or PersistentTTLCache(SOCIAL_LINKS_CACHE_FILE, ttl_sec=FOUND_TTL_SEC)
+        self.browser_pool = browser_pool
+        self.stats = {"cached": 0, "http": 0, "browser": 0, "failed": 0}
+
+    def get_cached(self, artist_id):
+        handle = self.cache.get(artist_id, ttl_sec=FOUND_TTL_SEC)
+        if handle:
+            return handle
+        if self.cache.get(artist_id, ttl_sec=NOT_FOUND_TTL_SEC) == NOT_FOUND:
+            return NOT_FOUND
+        return None
+
+    def _resolve_in_browser(self, artist_id):
+        """Fallback: let Chrome render the page and scan the live DOM for the link."""
+        if self.browser_pool is None:
+            from .instagram_validator import BrowserPool, SELENIUM_AVAILABLE
+            if not SELENIUM_AVAILABLE:
+                return None
+            self.browser_pool = BrowserPool(size=1)
+        with self.browser_pool.session() as driver:
+            driver.get(self.base_url + artist_id)
+            return extract_instagram_handle(driver.page_source)
+
+    async def _resolve_one(self, client, semaphore, artist_id):
+        cached = self.get_cached(artist_id)
+        if cached is not None:
+            self.stats["cached"] += 1
+            return cached
+
+        handle = None
+        async with semaphore:
+            try:
+                response = await client.get(self.base_url + artist_id)
+                if response.status_code == 200:
+                    handle = extract_instagram_handle(response.text)
+            except httpx.HTTPError as e:
+                log_message(f"Social links: HTTP error for artist {artist_id}: {e}")
+
+        if handle is not None:
+            self.stats["http"] += 1
+        else:
+            try:
+                loop = asyncio.get_event_loop()
+                handle = await loop.run_in_executor(None, self._resolve_in_browser, artist_id)
+            except Exception as e:
+                log_message(f"Social links: browser fallback failed for artist {artist_id}: {e}")
+            if handle is None:
+                self.stats["failed"] += 1
+                return None  # Don't cache failures
+            self.stats["browser"] += 1
+
+        self.cache.set(artist_id, handle)
+        return handle
+
+    def _hydrate_names(self, sp, unique):
+        """Fills in missing artist names with one sp.artists call per 50 IDs."""
+        nameless = [aid for aid, artist in unique.items() if not artist.get('name')]
+        for start in range(0, len(nameless), ARTISTS_BATCH_SIZE):
+            batch = nameless[start:start + ARTISTS_BATCH_SIZE]
+            try:
+                response = safe_api_call(sp.artists, batch)
+            except Exception as e:
+                log_message(f"Social links: could not fetch artist names: {e}")
+                continue
+            for artist in response.get('artists', []):
+                if artist and artist.get('id') in unique:
+                    unique[artist['id']] = {**unique[artist['id']], 'name': artist.get('name', '')}
+
+    async def resolve_many(self, artists, sp=None):
+        """
+        artists: iterable of {'id', 'name'}. Returns {artist_id: handle or None}.
+        Found handles are recorded in the artist handle directory, keyed by
+        name, so artists given without one are named through sp first. Any
+        still without a name are not recorded.
+        """
+        unique = {}
+        for artist in artists:
+            if artist.get('id') and not unique.get(artist['id'], {}).get('name'):
+                unique[artist['id']] = artist
+        self.stats = {"cached": 0, "http": 0, "browser": 0, "failed": 0}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; AumRadar)", "Accept-Language": "en"}
+
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SEC, headers=headers, follow_redirects=True) as client:
+            ids = list(unique)
+            handles = await asyncio.gather(*(self._resolve_one(client, semaphore, aid) for aid in ids))
+
+        results = {}
+        for artist_id, handle in zip(ids, handles):
+            results[artist_id] = handle or None
+
+        def persist():
+            found = {aid: unique[aid] for aid, handle in results.items() if handle}
+            if sp is not None:
+                self._hydrate_names(sp, found)
+            for artist_id, artist in found.items():
+                if artist.get('name'):
+                    artist_directory.record(artist['name'], results[artist_id], artist_id)
+            self.cache.save()
+            artist_directory.flush()
+
+        # Storage and sheet writes are blocking
+        await asyncio.get_event_loop().run_in_executor(None, persist)
+        log_message(f"Social links: resolved {len(results)} artists {self.stats}")
+        return results
+
+# Global instance
+social_link_resolver = SocialLinkResolver()
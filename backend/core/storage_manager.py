@@ -2,12 +2,15 @@ import os
 import json
 import datetime
 import logging
-from typing import Any, Dict, Optional
+import tempfile
+import threading
+import importlib.util
+from typing import Any, Dict, Optional, Tuple
 
-# Try importing google cloud storage, handle if not installed (for local dev without it)
+# google-cloud-storage is slow to import, so only check that it's installed here;
+# the client module is imported the first time a bucket is touched.
 try:
-    from google.cloud import storage
-    GCS_AVAILABLE = True
+    GCS_AVAILABLE = importlib.util.find_spec("google.cloud.storage") is not None
 except ImportError:
     GCS_AVAILABLE = False
 
@@ -18,13 +21,32 @@ class StorageManager:
         self.use_cloud = GCS_AVAILABLE and self.bucket_name is not None
         
         self.local_cache_dir = "cache"
+        self._local_lock = threading.Lock()
         if not self.use_cloud:
             os.makedirs(self.local_cache_dir, exist_ok=True)
             print(f"StorageManager: Using LOCAL storage in '{self.local_cache_dir}'")
         else:
             print(f"StorageManager: Using GOOGLE CLOUD STORAGE bucket '{self.bucket_name}'")
-            self.client = storage.Client()
-            self.bucket = self.client.bucket(self.bucket_name)
+        self._client = None
+        self._bucket = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Built on first use: requests that never touch storage (/me, /login)
+        # don't pay for the GCS import and credential discovery.
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google.cloud import storage as gcs
+                    self._client = gcs.Client()
+        return self._client
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            self._bucket = self.client.bucket(self.bucket_name)
+        return self._bucket
 
     def _get_local_path(self, filename: str) -> str:
         # If filename already has the dir, don't double it. 
@@ -78,6 +100,107 @@ class StorageManager:
             except:
                 return default
 
+    def load_json_versioned(self, filename: str, default: Any = None) -> Tuple[Any, int]:
+        """
+        Like load_json, but also returns a version token for save_json_if_version.
+        Version 0 means the file doesn't exist.
+        """
+        if self.use_cloud:
+            try:
+                blob = self.bucket.get_blob(filename)
+                if not blob:
+                    return default, 0
+                return json.loads(blob.download_as_string()), blob.generation
+            except Exception:
+                return default, 0
+        else:
+            path = self._get_local_path(filename)
+            with self._local_lock:
+                if not os.path.exists(path):
+                    return default, 0
+                try:
+                    with open(path, 'r') as f:
+                        return json.load(f), os.stat(path).st_mtime_ns
+                except:
+                    return default, 0
+
+    def save_json_if_version(self, filename: str, data: Any, version: int) -> Optional[int]:
+        """
+        Compare-and-swap write: only saves if the file is still at `version`.
+        Returns the new version, or None if someone else wrote in between.
+        """
+        if self.use_cloud:
+            try:
+                blob = self.bucket.blob(filename)
+                blob.upload_from_string(
+                    json.dumps(data, default=str),
+                    content_type='application/json',
+                    if_generation_match=version
+                )
+                return blob.generation
+            except Exception as e:
+                print(f"Conditional save rejected ({filename}): {e}")
+                return None
+        else:
+            path = self._get_local_path(filename)
+            with self._local_lock:
+                current = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+                if current != version:
+                    return None
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w') as f:
+                    json.dump(data, f, default=str)
+                new_version = os.stat(path).st_mtime_ns
+                if new_version == version:  # Coarse mtime resolution; force a distinct token
+                    os.utime(path, ns=(new_version + 1, new_version + 1))
+                    new_version += 1
+                return new_version
+
+    def get_version(self, filename: str) -> int:
+        """The file's current version token (0 if missing), without downloading it."""
+        if self.use_cloud:
+            try:
+                blob = self.bucket.get_blob(filename)
+                return blob.generation if blob else 0
+            except Exception:
+                return 0
+        path = self._get_local_path(filename)
+        return os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+
+    # --- Binary files (e.g. SQLite databases) worked on through a local copy ---
+
+    def local_path_for(self, filename: str) -> str:
+        """Where to keep the working copy: the file itself locally, a temp copy on GCS."""
+        if self.use_cloud:
+            return os.path.join(tempfile.gettempdir(), filename.replace("/", "_"))
+        return self._get_local_path(filename)
+
+    def fetch_file(self, filename: str, local_path: str) -> int:
+        """Refreshes the working copy from the bucket. Returns its version (0 if it doesn't exist yet)."""
+        if not self.use_cloud:
+            return os.stat(local_path).st_mtime_ns if os.path.exists(local_path) else 0
+        try:
+            blob = self.bucket.get_blob(filename)
+            if not blob:
+                return 0
+            blob.download_to_filename(local_path)
+            return blob.generation
+        except Exception as e:
+            print(f"Error downloading from GCS ({filename}): {e}")
+            return 0
+
+    def push_file_if_version(self, local_path: str, filename: str, version: int) -> Optional[int]:
+        """Uploads the working copy if the bucket copy is still at `version`. Returns the new version or None."""
+        if not self.use_cloud:
+            return os.stat(local_path).st_mtime_ns
+        try:
+            blob = self.bucket.blob(filename)
+            blob.upload_from_filename(local_path, if_generation_match=version)
+            return blob.generation
+        except Exception as e:
+            print(f"Conditional upload rejected ({filename}): {e}")
+            return None
+
     def exists(self, filename: str) -> bool:
         if self.use_cloud:
             try:
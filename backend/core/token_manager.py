@@ -0,0 +1,139 @@
+import time
+import threading
+from collections import OrderedDict
+from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
+from .singleflight import SingleFlight
+from ..config import settings as app_settings
+
+EXPIRY_MARGIN_SEC = 60      # Refresh a bit before Spotify actually rejects the token
+PROFILE_TTL_SEC = 300
+MAX_PROFILES = 1000
+
+
+def is_token_fresh(token_info):
+    return bool(token_info) and token_info.get('expires_at', 0) - time.time() >= EXPIRY_MARGIN_SEC
+
+
+class AppTokenAuth:
+    """
+    Auth manager for spotipy.Spotify backed by the shared app token, so every
+    app client (scans, exports) reuses one Client Credentials token.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def get_access_token(self, as_dict=False, check_cache=True):
+        token_info = self.manager.get_app_token()
+        return token_info if as_dict else token_info['access_token']
+
+
+class TokenManager:
+    """
+    Process-wide Spotify token handling:
+    - the Client Credentials token is cached until shortly before it expires;
+    - user token refreshes are single-flight per refresh token, and the result is
+      remembered so requests still carrying the old session token reuse it;
+    - /me profiles are cached for a few minutes per user.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flight = SingleFlight()
+        self._oauth = None
+        self._credentials = None
+        self.app_token = None
+        self.refreshed = {}              # refresh_token -> latest token_info
+        self.profiles = OrderedDict()    # refresh_token -> (fetched_at, profile)
+        self.counters = {"app_fetches": 0, "user_refreshes": 0, "refresh_reused": 0, "profile_hits": 0, "profile_misses": 0}
+
+    @property
+    def oauth(self):
+        # Refreshing only needs the client credentials; scope and redirect are for the login flow
+        if self._oauth is None:
+            self._oauth = SpotifyOAuth(
+                client_id=app_settings.CLIENT_ID,
+                client_secret=app_settings.CLIENT_SECRET,
+                redirect_uri=app_settings.REDIRECT_URI,
+                scope=app_settings.SCOPE,
+                cache_handler=None
+            )
+        return self._oauth
+
+    @property
+    def credentials(self):
+        if self._credentials is None:
+            self._credentials = SpotifyClientCredentials(
+                client_id=app_settings.CLIENT_ID,
+                client_secret=app_settings.CLIENT_SECRET
+            )
+        return self._credentials
+
+    # --- App token ---
+
+    def _fetch_app_token(self):
+        token_info = self.credentials.get_access_token(as_dict=True, check_cache=False)
+        if 'expires_at' not in token_info:
+            token_info['expires_at'] = int(time.time()) + token_info.get('expires_in', 3600)
+        with self.lock:
+            self.app_token = token_info
+            self.counters["app_fetches"] += 1
+        return token_info
+
+    def get_app_token(self):
+        token_info = self.app_token
+        if is_token_fresh(token_info):
+            return token_info
+        return self.flight.do("app", self._fetch_app_token)
+
+    # --- User tokens ---
+
+    def _refresh_user_token(self, refresh_token):
+        token_info = self.oauth.refresh_access_token(refresh_token)
+        with self.lock:
+            self.counters["user_refreshes"] += 1
+            for key in [k for k, v in self.refreshed.items() if not is_token_fresh(v)]:
+                del self.refreshed[key]
+            self.refreshed[refresh_token] = token_info
+            # Spotify may rotate the refresh token; the new one maps to the same result
+            self.refreshed[token_info.get('refresh_token', refresh_token)] = token_info
+        return token_info
+
+    def get_user_token(self, token_info):
+        """Returns token_info if it's still fresh, otherwise the refreshed token (one refresh per user)."""
+        if is_token_fresh(token_info):
+            return token_info
+        refresh_token = token_info['refresh_token']
+        with self.lock:
+            latest = self.refreshed.get(refresh_token)
+            if is_token_fresh(latest):
+                self.counters["refresh_reused"] += 1
+                return latest
+        return self.flight.do(("user", refresh_token), lambda: self._refresh_user_token(refresh_token))
+
+    # --- Profile ---
+
+    def get_profile(self, sp, token_info):
+        """sp.current_user(), cached per user for PROFILE_TTL_SEC."""
+        key = token_info.get('refresh_token') or token_info['access_token']
+        with self.lock:
+            cached = self.profiles.get(key)
+            if cached and time.time() - cached[0] < PROFILE_TTL_SEC:
+                self.counters["profile_hits"] += 1
+                return cached[1]
+            self.counters["profile_misses"] += 1
+
+        profile = self.flight.do(("profile", key), sp.current_user)
+        with self.lock:
+            self.profiles[key] = (time.time(), profile)
+            self.profiles.move_to_end(key)
+            while len(self.profiles) > MAX_PROFILES:
+                self.profiles.popitem(last=False)
+        return profile
+
+    def stats(self):
+        with self.lock:
+            return {**self.counters, "app_token_fresh": is_token_fresh(self.app_token)}
+
+# Global instance
+token_manager = TokenManager()
@@ -0,0 +1,63 @@
+import time
+import threading
+from typing import Any, Optional
+from .storage_manager import storage
+
+_MISSING = object()
+
+
+class PersistentTTLCache:
+    """
+    Small thread-safe key -> value cache with per-entry expiry, persisted as one
+    JSON document through StorageManager. Entries are stored as [value, stored_at].
+    """
+
+    def __init__(self, filename: str, ttl_sec: float, max_entries: int = 10000):
+        self.filename = filename
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = None
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def _ensure_loaded(self):
+        if self.entries is None:
+            self.entries = storage.load_json(self.filename, {}) or {}
+
+    def get(self, key: str, default: Any = None, ttl_sec: Optional[float] = None) -> Any:
+        ttl = self.ttl_sec if ttl_sec is None else ttl_sec
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(key, _MISSING)
+            if entry is _MISSING or time.time() - entry[1] > ttl:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any):
+        with self.lock:
+            self._ensure_loaded()
+            self.entries[key] = [value, time.time()]
+            self.dirty = True
+
+    def save(self):
+        """Drops expired entries, trims to max_entries (oldest first) and writes if anything changed."""
+        with self.lock:
+            if self.entries is None or not self.dirty:
+                return
+            now = time.time()
+            live = {k: v for k, v in self.entries.items() if now - v[1] <= self.ttl_sec}
+            if len(live) > self.max_entries:
+                newest = sorted(live.items(), key=lambda kv: kv[1][1], reverse=True)[:self.max_entries]
+                live = dict(newest)
+            self.entries = live
+            storage.save_json(self.filename, live)
+            self.dirty = False
+
+    def stats(self):
+        with self.lock:
+            self._ensure_loaded()
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from .config import settings
-from .routers import auth, scan
+from .routers import auth, scan, playlists, social, archive, artist_policy
 import os
 
 app = FastAPI(title="Antigravity Spotify Connect")
@@ -37,6 +37,10 @@ app.add_middleware(
 # Routers
 app.include_router(auth.router, tags=["Auth"])
 app.include_router(scan.router, prefix="/api", tags=["Scan"])
+app.include_router(playlists.router, prefix="/api", tags=["Playlists"])
+app.include_router(social.router, prefix="/api", tags=["Social"])
+app.include_router(archive.router, prefix="/api", tags=["Archive"])
+app.include_router(artist_policy.router, prefix="/api", tags=["Artist Policy"])
 
 @app.get("/")
 def read_root():
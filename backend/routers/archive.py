@@ -0,0 +1,32 @@
+import datetime
+from typing import Optional
+from fastapi import APIRouter
+from ..core.archive import scan_archive, iso_week
+
+router = APIRouter()
+
+
+@router.get("/archive/scans")
+def list_archived_scans(limit: int = 50):
+    return {"scans": scan_archive.list_scans(limit)}
+
+
+@router.get("/archive/artists/{artist_id}")
+def get_artist_history(artist_id: str, limit: int = 100):
+    """Every release the artist was credited on across archived scans."""
+    return scan_archive.artist_history(artist_id, limit)
+
+
+@router.get("/archive/weeks/{week}")
+def get_week_summary(week: str):
+    """A scan week ('2026-W42', or any date inside it): scans, exclusion reasons and kept tracks."""
+    if "-W" not in week:
+        week = iso_week(week)
+    return scan_archive.week_summary(week)
+
+
+@router.get("/archive/activity")
+def get_artist_activity(since: Optional[str] = None, limit: int = 500):
+    """Most active artists by kept releases (default: the last 26 weeks)."""
+    since = since or (datetime.date.today() - datetime.timedelta(weeks=26)).isoformat()
+    return {"since": since, "artists": scan_archive.artist_activity(since, limit)}
@@ -0,0 +1,28 @@
+from typing import List, Optional
+from fastapi import APIRouter
+from pydantic import BaseModel
+from ..core.artist_policy import artist_policy
+
+router = APIRouter()
+
+
+class ArtistListUpdate(BaseModel):
+    # Artist IDs, artist links/URIs or artist names
+    add: List[str] = []
+    remove: List[str] = []
+    replace: Optional[List[str]] = None   # Overwrites the list (before add/remove)
+
+
+@router.get("/artist-policy")
+def get_artist_policy():
+    """The stored exclusion and no-filter lists, with the compiled set sizes."""
+    return artist_policy.describe()
+
+
+@router.post("/artist-policy/{list_name}")
+def update_artist_list(list_name: str, req: ArtistListUpdate):
+    """Edits 'exclude' or 'no_filter'. Takes effect for the next scan or refilter."""
+    try:
+        return {"status": "success", **artist_policy.update(list_name, req.add, req.remove, req.replace)}
+    except (ValueError, RuntimeError) as e:
+        return {"status": "error", "message": str(e)}
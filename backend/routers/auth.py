@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Request, HTTPException, Depends
 from fastapi.responses import RedirectResponse, JSONResponse
-import spotipy
-from spotipy.oauth2 import SpotifyOAuth, SpotifyClientCredentials
+from spotipy.oauth2 import SpotifyOAuth
 from ..config import settings
 from ..core.automation import automation_manager
-import time
+from ..core.token_manager import token_manager
+from ..core.client_factory import client_factory
 
 router = APIRouter()
 
@@ -23,17 +23,9 @@ def get_app_client():
     Returns a Spotify client authenticated with Client Credentials (App Token).
     Used for scanning albums/tracks where user context is not needed.
     Higher rate limits!
+    One shared client on a pooled session; its token is cached until shortly before expiry.
     """
-    client_credentials_manager = SpotifyClientCredentials(
-        client_id=settings.CLIENT_ID, 
-        client_secret=settings.CLIENT_SECRET
-    )
-    return spotipy.Spotify(
-        client_credentials_manager=client_credentials_manager,
-        requests_timeout=20,
-        retries=0,
-        status_retries=0
-    )
+    return client_factory.app_client()
 
 @router.get("/login")
 def login():
@@ -65,18 +57,17 @@ def get_current_user(request: Request):
         return JSONResponse({"authenticated": False}, status_code=401)
         
     # Check expiry and refresh if needed
-    now = int(time.time())
-    if token_info['expires_at'] - now < 60:
-        sp_oauth = get_spotify_oauth()
-        try:
-            token_info = sp_oauth.refresh_access_token(token_info['refresh_token'])
-            request.session["token_info"] = token_info
-        except:
-            return JSONResponse({"authenticated": False}, status_code=401)
+    try:
+        fresh_token = token_manager.get_user_token(token_info)
+    except:
+        return JSONResponse({"authenticated": False}, status_code=401)
+    if fresh_token is not token_info:
+        token_info = fresh_token
+        request.session["token_info"] = token_info
             
-    sp = spotipy.Spotify(auth=token_info['access_token'])
+    sp = client_factory.user_client(token_info['access_token'])
     try:
-        user = sp.current_user()
+        user = token_manager.get_profile(sp, token_info)
         return {"authenticated": True, "user": user}
     except:
         return JSONResponse({"authenticated": False}, status_code=401)
@@ -91,18 +82,12 @@ def get_spotify_client(request: Request):
     if not token_info:
         raise HTTPException(status_code=401, detail="Not Authenticated")
         
-    now = int(time.time())
-    if token_info['expires_at'] - now < 60:
-        sp_oauth = get_spotify_oauth()
-        try:
-            token_info = sp_oauth.refresh_access_token(token_info['refresh_token'])
-            request.session["token_info"] = token_info
-        except:
-             raise HTTPException(status_code=401, detail="Session Expired")
+    try:
+        fresh_token = token_manager.get_user_token(token_info)
+    except:
+        raise HTTPException(status_code=401, detail="Session Expired")
+    if fresh_token is not token_info:
+        token_info = fresh_token
+        request.session["token_info"] = token_info
     
-    return spotipy.Spotify(
-        auth=token_info['access_token'], 
-        requests_timeout=20, 
-        retries=0, 
-        status_retries=0
-    )
+    return client_factory.user_client(token_info['access_token'])
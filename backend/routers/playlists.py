@@ -0,0 +1,73 @@
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from typing import List, Optional
+from .auth import get_spotify_client
+from ..core.engine import DEFAULT_FORBIDDEN_KEYWORDS
+from ..core.playlists import clean_playlist
+from ..core.follower import follow_playlist_artists
+from ..core.export_index import export_index
+from ..core.artist_policy import artist_policy
+
+router = APIRouter()
+
+
+class CleanupRequest(BaseModel):
+    playlist_url: str
+    dry_run: bool = False
+
+    # Same filter rules as ScanSettings
+    min_duration_sec: int = 90
+    max_duration_sec: int = 270
+    forbidden_keywords: List[str] = DEFAULT_FORBIDDEN_KEYWORDS
+    no_filter_artists: List[str] = [] # Artist IDs that bypass all filters (on top of the stored no-filter list)
+
+
+@router.post("/playlists/cleanup")
+def cleanup_playlist(req: CleanupRequest, sp=Depends(get_spotify_client)):
+    filter_config = {
+        "min_duration_ms": req.min_duration_sec * 1000,
+        "max_duration_ms": req.max_duration_sec * 1000,
+        "forbidden_keywords": req.forbidden_keywords
+    }
+    try:
+        no_filter = artist_policy.current().no_filter_ids | set(req.no_filter_artists)
+        result = clean_playlist(sp, req.playlist_url, no_filter, filter_config, dry_run=req.dry_run)
+        return {"status": "success", **result}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+class FollowRequest(BaseModel):
+    playlist_url: str
+    dry_run: bool = False
+
+
+@router.post("/playlists/follow-artists")
+def follow_artists(req: FollowRequest, sp=Depends(get_spotify_client)):
+    try:
+        result = follow_playlist_artists(sp, req.playlist_url, dry_run=req.dry_run)
+        return {"status": "success", **result}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+class ExportIndexBackfillRequest(BaseModel):
+    name_prefix: Optional[str] = None   # e.g. the auto-export name: imports every matching playlist
+    playlist_urls: List[str] = []
+
+
+@router.get("/export-index")
+def get_export_index():
+    return export_index.stats()
+
+
+@router.post("/export-index/backfill")
+def backfill_export_index(req: ExportIndexBackfillRequest, sp=Depends(get_spotify_client)):
+    """One-time import of already exported playlists; re-running skips unchanged ones."""
+    if not req.name_prefix and not req.playlist_urls:
+        return {"status": "error", "message": "Give a name_prefix or playlist_urls"}
+    try:
+        result = export_index.backfill(sp, req.name_prefix, req.playlist_urls)
+        return {"status": "success", **result}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
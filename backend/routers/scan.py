@@ -2,15 +2,33 @@ from fastapi import APIRouter, Depends, BackgroundTasks
 from pydantic import BaseModel
 from typing import Optional, List
 import datetime
+import httpx
 from .auth import get_spotify_client, get_app_client
 from ..core.scanner import scanner
+from ..core.release_calendar import release_calendar
+from ..core.candidate_cache import candidate_cache
+from ..core.filter_presets import evaluate_presets
+from ..core.engine import DEFAULT_FORBIDDEN_KEYWORDS, log_message
+from ..core.export_index import export_index
+from ..core.enrichment import enrichment_cache
+from ..core.scan_windows import with_window_span
+from ..core.scan_planner import estimate_scan
 
 router = APIRouter()
 
 
+class ScanWindow(BaseModel):
+    start_date: str
+    end_date: str
+    name: Optional[str] = None          # Defaults to "start - end"
+    export_name: Optional[str] = None   # Exports this window as its own playlist
+
 class ScanSettings(BaseModel):
     start_date: str
     end_date: str
+    # Several windows (backfilled weeks, a weekly + monthly roundup) in one pass: the scan
+    # covers their span and routes results per window; start_date/end_date are then replaced
+    windows: List[ScanWindow] = []
     include_followed: bool = True
     include_liked_songs: bool = False
     min_liked_songs: int = 1
@@ -22,6 +40,22 @@ class ScanSettings(BaseModel):
     max_duration_sec: int = 270
     forbidden_keywords: List[str] = [" live ", "session", "לייב", "קאבר", "a capella", "acapella", "FSOE", "techno", "extended", "sped up", "speed up", "intro", "slow", "remaster", "instrumental"]
     exclude_artists: List[str] = [] # List of Artist names or IDs to skip
+    # Cross-album near-duplicate titles ("Song (feat. X)", "Song - Radio Edit"); 0 disables
+    near_duplicate_threshold: float = 0.0
+    # Drop tracks that already went into an exported playlist (by ID; also by ISRC with enrich).
+    # Off by default so refiltering a week that was just exported still shows it; automation
+    # turns it on through AutomationConfig.skip_exported
+    skip_exported: bool = False
+    # Fetch popularity, ISRC and primary-artist genres (about 2 extra calls per 50 tracks);
+    # also drops repeated recordings by ISRC
+    enrich: bool = False
+    # Run even if the estimated API calls exceed SCAN_CALL_BUDGET
+    ignore_budget: bool = False
+
+    # Discovery: 'full' checks every artist; 'feed' answers artists with a recent cached
+    # discography from the cache plus the new-releases feed, and checks only the rest
+    discovery_mode: str = 'full'
+    feed_max_cache_age_days: int = 28  # Capped by the feed's two-week tag:new horizon
 
 class AutomationConfig(BaseModel):
     enabled: bool = False
@@ -29,7 +63,18 @@ class AutomationConfig(BaseModel):
     run_time: str = "10:00"
     settings: ScanSettings
 
+    # 'weekly': one full scan on run_day. 'daily': trigger every day, results accumulate
+    # and the run_day trigger exports the week.
+    mode: str = "weekly"
+    daily_strategy: str = "window" # 'window' (new days only) or 'slice' (rotating roster slice)
+    roster_slices: int = 7
+    # Scheduled runs leave out tracks an earlier export already delivered
+    skip_exported: bool = True
+
 from ..core.automation import automation_manager
+from ..core.accumulator import weekly_accumulator
+from ..core.budgeted_scan import budgeted_runner
+from ..config import settings as app_settings
 
 @router.get("/automation/config")
 def get_automation_config():
@@ -41,7 +86,13 @@ def save_automation_config(config: AutomationConfig):
     return {"status": "saved", "config": config}
 
 @router.post("/automation/run")
-async def run_automation_headless(background_tasks: BackgroundTasks):
+async def run_automation_headless(background_tasks: BackgroundTasks, budget_sec: Optional[int] = None, chain: bool = False):
+    """
+    Without budget_sec the whole scan runs as a background task. With budget_sec the
+    scan runs in checkpointed slices inside the request and returns 'continue' until done;
+    chain=true re-triggers itself via SELF_URL after each slice that returned 'continue'
+    (never after 'rate_limited', which carries retry_after instead).
+    """
     config = automation_manager.load_config()
     if not config.get("enabled"):
         return {"status": "skipped", "reason": "Automation disabled"}
@@ -49,14 +100,29 @@ async def run_automation_headless(background_tasks: BackgroundTasks):
     try:
         headless_sp = automation_manager.get_headless_client()
         app_sp = get_app_client()
-        
-        # Use settings from config
-        settings_dict = config['settings']
+
+        def build_settings():
+            # Use settings from config
+            if config.get("mode") == "daily":
+                settings = weekly_accumulator.plan_run(config)
+            else:
+                settings = dict(config['settings'])
+            settings["skip_exported"] = config.get("skip_exported", True)
+            return settings
         
         # Determine Playlist Name
         # Maybe allow user to set it? For now default.
         playlist_name = "Weekly Radar" 
-        
+
+        if budget_sec:
+            result = await budgeted_runner.run_step(headless_sp, app_sp, build_settings, budget_sec, auto_export_name=playlist_name)
+            if chain and result["status"] == "continue":
+                background_tasks.add_task(trigger_next_step, budget_sec)
+            return result
+
+        if scanner.get_status()["is_running"] or budgeted_runner.live_lease():
+            return {"status": "busy", "message": "Scan already running"}
+        settings_dict = build_settings()
         background_tasks.add_task(
             scanner.scan_process, 
             headless_sp, 
@@ -65,9 +131,40 @@ async def run_automation_headless(background_tasks: BackgroundTasks):
             auto_export_name=playlist_name
         )
         
-        return {"status": "triggered"}
+        return {
+            "status": "triggered",
+            "window": [settings_dict.get('start_date'), settings_dict.get('end_date')],
+            "finalize": settings_dict.get('finalize', True)
+        }
     except Exception as e:
         return {"status": "error", "message": str(e)}
+
+async def trigger_next_step(budget_sec):
+    """
+    Fire-and-forget call to our own /automation/run, run as a background task after
+    the response is sent. The short timeout only waits for the send.
+    """
+    if not app_settings.SELF_URL:
+        return
+    try:
+        async with httpx.AsyncClient(timeout=2) as client:
+            await client.post(
+                f"{app_settings.SELF_URL.rstrip('/')}/api/automation/run",
+                params={"budget_sec": budget_sec, "chain": "true"}
+            )
+    except httpx.TimeoutException:
+        pass # Expected: the next step is now running in its own request
+    except Exception as e:
+        log_message(f"Self-chain trigger failed: {e}")
+
+@router.get("/automation/job")
+def get_automation_job():
+    return budgeted_runner.get_job_summary()
+
+@router.get("/automation/week")
+def get_weekly_accumulator():
+    config = automation_manager.load_config()
+    return weekly_accumulator.get_summary(config.get("run_day", "friday"))
     
 @router.get("/cache-info")
 def get_cache_info():
@@ -79,6 +176,9 @@ async def start_scan(settings: ScanSettings, background_tasks: BackgroundTasks,
     
     if scanner.get_status()["is_running"]:
         return {"status": "error", "message": "Scan already running"}
+    lease = budgeted_runner.live_lease()
+    if lease:
+        return {"status": "error", "message": f"Budgeted scan {lease['job_id']} is running (lease expires in {lease['expires_in']}s)"}
 
     # Initialize App Client for high-performance scanning
     app_sp = get_app_client()
@@ -86,13 +186,70 @@ async def start_scan(settings: ScanSettings, background_tasks: BackgroundTasks,
     background_tasks.add_task(scanner.scan_process, sp, engine_settings, app_sp)
     return {"status": "started", "settings": engine_settings}
 
+@router.post("/plan")
+async def plan_scan(settings: ScanSettings, sp=Depends(get_spotify_client)):
+    """Estimated API calls, duration and pacing for these settings, without scanning (or touching a running scan's status)."""
+    engine_settings = with_window_span(settings.dict())
+    artists = await scanner.gather_artists(sp, engine_settings, report=False)
+    return estimate_scan(artists, engine_settings)
+
+@router.get("/calendar")
+def get_release_calendar(start_date: str, end_date: str, followed_only: bool = True, max_age_hours: int = 24):
+    """Answers a date-window query from cached discographies, without Spotify calls."""
+    start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+    end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+
+    artist_ids = None
+    if followed_only:
+        artist_ids = [a['id'] for a in scanner._load_artists_cache()]
+
+    releases = release_calendar.query(start, end, artist_ids)
+    stale = release_calendar.needs_refresh(artist_ids or [], start, max_age_hours * 3600)
+    return {
+        "releases": releases,
+        "count": len(releases),
+        "stale_artists": len(stale),
+        "index": release_calendar.stats()
+    }
+
 @router.get("/status")
 def get_scan_status():
     return scanner.get_status()
 
 @router.get("/results")
-def get_scan_results():
-    return scanner.get_results()
+def get_scan_results(sort: Optional[str] = None, window: Optional[str] = None):
+    """sort=popularity orders by Spotify popularity (needs an enriched scan); window picks one window of a multi-window scan."""
+    return scanner.get_results(sort, window)
+
+@router.get("/results/windows")
+def get_window_summary():
+    return scanner.get_window_summary()
+
+@router.post("/refilter")
+def refilter_results(settings: ScanSettings):
+    """Re-applies filter settings to the last scan's raw candidates, without Spotify calls."""
+    return candidate_cache.refilter(settings.dict())
+
+class FilterPreset(BaseModel):
+    name: str
+    min_duration_sec: int = 90
+    max_duration_sec: int = 270
+    forbidden_keywords: List[str] = DEFAULT_FORBIDDEN_KEYWORDS
+    exclude_artists: List[str] = []
+    skip_exported: bool = False
+
+class PresetEvaluationRequest(BaseModel):
+    # Window and album types default to the cached scan's
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    album_types: Optional[List[str]] = None
+    presets: List[FilterPreset]
+
+@router.post("/refilter/presets")
+def evaluate_filter_presets(req: PresetEvaluationRequest):
+    """What-if kept counts, exclusion reasons and duration histograms for several filter presets."""
+    settings = req.dict(exclude={"presets"})
+    return evaluate_presets(settings, [p.dict() for p in req.presets])
 
 @router.post("/stop")
 def stop_scan():
@@ -119,6 +276,9 @@ def export_playlist(req: ExportRequest, sp=Depends(get_spotify_client)):
         for i in range(0, len(req.uris), 100):
             batch = req.uris[i:i+100]
             sp.playlist_add_items(playlist['id'], batch)
+        track_ids = [uri.split(":")[-1] for uri in req.uris if uri.startswith("spotify:track:")]
+        export_index.add_tracks(enrichment_cache.cached_tracks(track_ids), final_name)
+        export_index.save()
             
         return {"status": "success", "playlist_url": playlist['external_urls']['spotify']}
     except Exception as e:
@@ -0,0 +1,44 @@
+import asyncio
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from typing import List, Optional
+from .auth import get_spotify_client
+from ..core.instagram_validator import instagram_validator
+from ..core.social_links import social_link_resolver
+from ..core.playlists import extract_playlist_id, fetch_playlist_tracks
+
+router = APIRouter()
+
+
+class ValidateHandlesRequest(BaseModel):
+    usernames: List[str]
+
+
+@router.post("/instagram/validate")
+def validate_instagram_handles(req: ValidateHandlesRequest):
+    try:
+        results = instagram_validator.validate_many(req.usernames)
+        return {"status": "success", "results": results, "cache": instagram_validator.cache.stats()}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+class SocialLinksRequest(BaseModel):
+    playlist_url: Optional[str] = None
+    artist_ids: List[str] = []
+
+
+@router.post("/artists/social-links")
+async def resolve_social_links(req: SocialLinksRequest, sp=Depends(get_spotify_client)):
+    try:
+        artists = [{"id": aid} for aid in req.artist_ids]
+        if req.playlist_url:
+            loop = asyncio.get_event_loop()
+            tracks, _ = await loop.run_in_executor(None, fetch_playlist_tracks, sp, extract_playlist_id(req.playlist_url))
+            for track in tracks:
+                artists.extend(track.get('artists', []))
+
+        results = await social_link_resolver.resolve_many(artists, sp=sp)
+        return {"status": "success", "results": results, "stats": social_link_resolver.stats}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
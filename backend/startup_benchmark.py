@@ -0,0 +1,73 @@
+"""
+Cold start benchmark for the API.
+
+Reports the slowest imports when loading backend.main (from `python -X importtime`)
+and the cost of each lazily initialized singleton on first use.
+
+Usage (from the repo root):
+    python -m backend.startup_benchmark [--top 20]
+"""
+import sys
+import time
+import argparse
+import subprocess
+
+
+def measure_imports(top):
+    """Runs `import backend.main` in a fresh interpreter and parses -X importtime output."""
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"],
+        capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        print(proc.stderr.splitlines()[-1] if proc.stderr else "import backend.main failed")
+        sys.exit(1)
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+
+    # Top-level packages only (one row per third-party package or backend module)
+    by_package = {}
+    for cumulative_us, self_us, name in rows:
+        key = name if name.startswith("backend") else name.split(".")[0]
+        by_package[key] = max(by_package.get(key, 0), cumulative_us)
+
+    print(f"Process start + import backend.main: {wall_ms:.0f} ms")
+    print(f"\n{'cumulative ms':>14}  module")
+    for key, cumulative_us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{cumulative_us / 1000:>14.1f}  {key}")
+
+
+def measure_init():
+    """Imports the app in-process, then times the first touch of each lazy singleton."""
+    started = time.perf_counter()
+    import backend.main  # noqa: F401
+    print(f"\nIn-process import backend.main: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    from backend.core.storage_manager import storage
+    from backend.core.scanner import scanner
+    from backend.core.automation import automation_manager
+
+    steps = [("scanner.state", lambda: scanner.state), ("automation_manager.config", lambda: automation_manager.config)]
+    if storage.use_cloud:
+        steps.insert(0, ("storage.bucket", lambda: storage.bucket))
+
+    print(f"\n{'first use ms':>14}  singleton")
+    for name, touch in steps:
+        started = time.perf_counter()
+        touch()
+        print(f"{(time.perf_counter() - started) * 1000:>14.1f}  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to list")
+    args = parser.parse_args()
+    measure_imports(args.top)
+    measure_init()
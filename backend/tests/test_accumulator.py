@@ -0,0 +1,71 @@
+import datetime
+
+import pytest
+
+from backend.core import accumulator
+from backend.core.accumulator import WeeklyAccumulator
+
+SATURDAY = datetime.date(2026, 10, 17)  # Week of a Friday finalize: Sat 17th - Fri 23rd
+
+
+@pytest.fixture
+def weekly(monkeypatch):
+    stored = {}
+    monkeypatch.setattr(accumulator.storage, "load_json", lambda filename, default=None: stored.get(filename, default))
+    monkeypatch.setattr(accumulator.storage, "save_json", lambda filename, data: stored.__setitem__(filename, data))
+    return WeeklyAccumulator()
+
+
+def run_week(weekly, config):
+    """plan_run + add for each day Saturday to Friday, as the daily automation does."""
+    plans = []
+    for offset in range(7):
+        settings = weekly.plan_run(config, SATURDAY + datetime.timedelta(days=offset))
+        weekly.add([], settings)
+        plans.append(settings)
+    return plans
+
+
+def test_window_strategy_scans_each_day_once(weekly):
+    plans = run_week(weekly, {"run_day": "friday", "daily_strategy": "window", "settings": {}})
+
+    assert [(p["start_date"], p["end_date"]) for p in plans] == [
+        (str(SATURDAY + datetime.timedelta(days=d)), str(SATURDAY + datetime.timedelta(days=d))) for d in range(7)
+    ]
+    assert [p["finalize"] for p in plans] == [False] * 6 + [True]
+    assert all("artist_slice" not in p and "slice_starts" not in p for p in plans)
+
+
+def test_slice_strategy_finalize_rechecks_each_slice_since_its_own_run(weekly):
+    plans = run_week(weekly, {"run_day": "friday", "daily_strategy": "slice", "roster_slices": 7, "settings": {}})
+
+    # Saturday to Thursday: one slice each, from the week start (its first check)
+    for day, settings in enumerate(plans[:6]):
+        assert settings["artist_slice"] == [day, 7]
+        assert settings["start_date"] == str(SATURDAY)
+        assert settings["end_date"] == str(SATURDAY + datetime.timedelta(days=day))
+        assert not settings["finalize"]
+
+    # Friday: no full-roster week scan; each slice only since the day after its own run
+    friday = plans[6]
+    assert friday["finalize"]
+    assert "artist_slice" not in friday
+    assert friday["slice_count"] == 7
+    assert friday["slice_starts"] == {
+        str(index): str(SATURDAY + datetime.timedelta(days=index + 1)) for index in range(6)
+    } | {"6": str(SATURDAY)}  # Slice 6 falls on Friday itself, so it is checked for the whole week
+    assert friday["end_date"] == "2026-10-23"
+
+
+def test_slice_strategy_skips_slices_already_checked_through_today(weekly):
+    config = {"run_day": "friday", "daily_strategy": "slice", "roster_slices": 2, "settings": {}}
+    thursday = SATURDAY + datetime.timedelta(days=5)
+    weekly.add([], weekly.plan_run(config, thursday))  # Slice 1 through Thursday
+
+    friday = weekly.plan_run(config, thursday + datetime.timedelta(days=1))
+    weekly.add([], friday)
+    assert friday["slice_starts"] == {"0": str(SATURDAY), "1": "2026-10-23"}
+
+    # A second finalize-day trigger has nothing left to check
+    again = weekly.plan_run(config, thursday + datetime.timedelta(days=1))
+    assert again["slice_starts"] == {}
@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.core import budgeted_scan
+from backend.core.budgeted_scan import BudgetedScanRunner
+from backend.core.scanner import scanner
+
+
+@pytest.fixture
+def job_storage(monkeypatch):
+    stored = {}
+
+    def load_json_versioned(filename, default=None):
+        return stored.get(filename, (default, 0))
+
+    def save_json_if_version(filename, data, version):
+        if stored.get(filename, (None, 0))[1] != version:
+            return None
+        stored[filename] = (data, version + 1)
+        return version + 1
+
+    monkeypatch.setattr(budgeted_scan.storage, "load_json_versioned", load_json_versioned)
+    monkeypatch.setattr(budgeted_scan.storage, "save_json_if_version", save_json_if_version)
+    return stored
+
+
+def test_run_step_leaves_a_running_full_scan_alone(job_storage, monkeypatch):
+    monkeypatch.setitem(scanner.state, "is_running", True)
+    monkeypatch.setitem(scanner.state, "status", "scanning")
+
+    def settings_factory():
+        raise AssertionError("a busy step must not plan a job")
+
+    result = asyncio.run(BudgetedScanRunner().run_step(None, None, settings_factory))
+
+    assert result["status"] == "busy"
+    assert job_storage == {}
+    assert scanner.state["is_running"] and scanner.state["status"] == "scanning"
+
+
+def test_live_lease_only_while_unexpired(job_storage):
+    runner = BudgetedScanRunner()
+    assert runner.live_lease() is None
+
+    now = time.time()
+    job = {"job_id": "job1", "status": "running", "lease": {"owner": "x", "expires_at": now + 60}}
+    job_storage[runner.filename] = (job, 1)
+    assert runner.live_lease(now)["job_id"] == "job1"
+    assert runner.live_lease(now + 61) is None
+
+    job_storage[runner.filename] = ({**job, "lease": None}, 2)  # Between steps
+    assert runner.live_lease(now) is None
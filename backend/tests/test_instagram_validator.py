@@ -0,0 +1,113 @@
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.core import ttl_cache
+from backend.core.instagram_validator import InstagramValidator, NOT_FOUND_TEXT, PROFILE_MARKER
+from backend.core.ttl_cache import PersistentTTLCache
+
+PROFILES = {"known_artist", "another_artist"}
+
+
+class StubInstagramHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        username = self.path.strip("/")
+        StubInstagramHandler.requests.append(username)
+        if username in PROFILES:
+            body = f'<meta property="og:type" {PROFILE_MARKER}><title>@{username}</title>'
+        else:
+            body = f"<h2>{NOT_FOUND_TEXT}</h2>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class StubDriver:
+    """Stands in for a WebDriver session: get() loads the page synchronously."""
+
+    def __init__(self):
+        self.page_source = ""
+        self.quit_called = False
+
+    def get(self, url):
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.page_source = response.read().decode("utf-8")
+        except urllib.error.URLError:
+            self.page_source = ""
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def stub_server():
+    StubInstagramHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubInstagramHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def memory_storage(monkeypatch):
+    stored = {}
+    monkeypatch.setattr(ttl_cache.storage, "load_json", lambda filename, default=None: stored.get(filename, default))
+    monkeypatch.setattr(ttl_cache.storage, "save_json", lambda filename, data: stored.__setitem__(filename, data))
+    return stored
+
+
+def make_validator(base_url, drivers, pool_size=2):
+    def factory():
+        driver = StubDriver()
+        drivers.append(driver)
+        return driver
+
+    return InstagramValidator(pool_size=pool_size, base_url=base_url, driver_factory=factory, render_wait=None,
+                              cache=PersistentTTLCache("cache/test_instagram.json", ttl_sec=3600))
+
+
+def test_validate_many_against_stub_pages(stub_server, memory_storage):
+    drivers = []
+    validator = make_validator(stub_server, drivers)
+
+    results = validator.validate_many(["known_artist", "gone_artist", "another_artist", "known_artist", "NONE"])
+
+    assert results == {"known_artist": True, "gone_artist": False, "another_artist": True, "NONE": False}
+    assert sorted(StubInstagramHandler.requests) == ["another_artist", "gone_artist", "known_artist"]
+    assert 1 <= len(drivers) <= 2
+    validator.close()
+    assert all(driver.quit_called for driver in drivers)
+
+
+def test_cached_results_skip_the_browser(stub_server, memory_storage):
+    drivers = []
+    make_validator(stub_server, drivers).validate_many(["known_artist", "gone_artist"])
+    StubInstagramHandler.requests = []
+
+    # A new validator over the same store: both results, valid and invalid, come from the cache
+    validator = make_validator(stub_server, drivers)
+    assert validator.validate_many(["Known_Artist", "gone_artist"]) == {"Known_Artist": True, "gone_artist": False}
+    assert StubInstagramHandler.requests == []
+    assert validator.pool is None
+
+
+def test_browser_failures_are_not_cached(stub_server, memory_storage):
+    def broken_factory():
+        raise RuntimeError("Chrome failed to start")
+
+    validator = InstagramValidator(pool_size=1, base_url=stub_server, driver_factory=broken_factory, render_wait=None,
+                                   cache=PersistentTTLCache("cache/test_instagram.json", ttl_sec=3600))
+    assert validator.validate("known_artist") is False
+    assert validator.get_cached("known_artist") is None
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from backend.core import social_links, ttl_cache
+from backend.core.instagram_validator import BrowserPool
+from backend.core.social_links import NOT_FOUND, SocialLinkResolver, extract_instagram_handle
+from backend.core.ttl_cache import PersistentTTLCache
+
+FIXTURES = Path(__file__).parent / "fixtures" / "spotify_artist"
+
+
+def fixture_page(name):
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class StubSpotifyHandler(BaseHTTPRequestHandler):
+    """Serves fixtures/spotify_artist/<id>.html; ?rendered=1 serves the page as the browser renders it."""
+
+    requests = []
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        artist_id = url.path.strip("/")
+        StubSpotifyHandler.requests.append(self.path)
+        suffix = ".rendered.html" if "rendered=1" in url.query else ".html"
+        page = FIXTURES / f"{artist_id}{suffix}"
+        if not page.is_file():
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.end_headers()
+        self.wfile.write(page.read_bytes())
+
+    def log_message(self, *args):
+        pass
+
+
+class StubDriver:
+    """Stands in for a WebDriver session that has rendered the page."""
+
+    def __init__(self):
+        self.page_source = ""
+
+    def get(self, url):
+        try:
+            with urllib.request.urlopen(url + "?rendered=1", timeout=5) as response:
+                self.page_source = response.read().decode("utf-8")
+        except urllib.error.URLError:
+            self.page_source = ""
+
+    def quit(self):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    StubSpotifyHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSpotifyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def memory_storage(monkeypatch):
+    stored = {}
+    monkeypatch.setattr(ttl_cache.storage, "load_json", lambda filename, default=None: stored.get(filename, default))
+    monkeypatch.setattr(ttl_cache.storage, "save_json", lambda filename, data: stored.__setitem__(filename, data))
+    return stored
+
+
+class FakeSpotify:
+    def __init__(self, names):
+        self.names = names
+        self.artist_batches = []
+
+    def artists(self, artist_ids):
+        self.artist_batches.append(list(artist_ids))
+        return {"artists": [{"id": aid, "name": self.names[aid]} if aid in self.names else None for aid in artist_ids]}
+
+
+class FakeCache:
+    """Handles already resolved, so resolve_many never leaves the process."""
+
+    def __init__(self, handles):
+        self.handles = handles
+        self.lookups = []
+        self.saved = False
+
+    def get(self, key, default=None, ttl_sec=None):
+        self.lookups.append(key)
+        return self.handles.get(key, default)
+
+    def set(self, key, value):
+        self.handles[key] = value
+
+    def save(self):
+        self.saved = True
+
+
+class FakeDirectory:
+    def __init__(self):
+        self.recorded = []
+        self.flushed = False
+
+    def record(self, name, handle, artist_id=None, source="spotify"):
+        self.recorded.append((name, handle, artist_id))
+
+    def flush(self):
+        self.flushed = True
+
+
+def test_resolve_many_dedups_batches_names_and_persists(monkeypatch):
+    handles = {f"artist{i:03d}": f"handle{i:03d}" for i in range(120)}
+    handles["unnamed"] = "mystery_ig"
+    handles["no_link"] = ""  # Page parsed, no Instagram link
+    names = {f"artist{i:03d}": f"Artist {i}" for i in range(120)}
+    directory = FakeDirectory()
+    monkeypatch.setattr(social_links, "artist_directory", directory)
+    cache = FakeCache(handles)
+    sp = FakeSpotify(names)
+
+    artists = [{"id": f"artist{i:03d}"} for i in range(120)]
+    artists += [{"id": "artist000", "name": "Named Once"}, {"id": "artist001"}]  # Duplicates
+    artists += [{"id": "unnamed"}, {"id": "no_link", "name": "Quiet Artist"}]
+    results = asyncio.run(SocialLinkResolver(cache=cache).resolve_many(artists, sp=sp))
+
+    # One lookup per unique artist; the named duplicate keeps its name
+    assert len(results) == 122
+    assert cache.lookups.count("artist000") == cache.lookups.count("artist001") == 1
+    assert results["no_link"] is None
+
+    # Names only for artists with a handle and no name, 50 IDs per call
+    assert [len(batch) for batch in sp.artist_batches] == [50, 50, 20]
+    assert "artist000" not in {aid for batch in sp.artist_batches for aid in batch}
+    assert "no_link" not in {aid for batch in sp.artist_batches for aid in batch}
+
+    # Recorded with a name, never blank: 'unnamed' has no Spotify name and is skipped
+    recorded = {artist_id: (name, handle) for name, handle, artist_id in directory.recorded}
+    assert len(recorded) == len(directory.recorded) == 120
+    assert recorded["artist000"] == ("Named Once", "handle000")
+    assert recorded["artist001"] == ("Artist 1", "handle001")
+    assert "unnamed" not in recorded
+    assert all(name for name, _ in recorded.values())
+    assert cache.saved and directory.flushed
+
+
+def test_extract_reads_the_artists_links_not_the_page_chrome():
+    # Every fixture carries Spotify's own instagram.com/spotify in the footer
+    assert extract_instagram_handle(fixture_page("artist_with_instagram.html")) == "linked.artist_ig"
+    assert extract_instagram_handle(fixture_page("artist_without_instagram.html")) == NOT_FOUND
+    assert extract_instagram_handle(fixture_page("artist_consent_wall.html")) is None
+    assert extract_instagram_handle(fixture_page("artist_consent_wall.rendered.html")) == "rendered_artist"
+
+
+def test_resolve_many_against_saved_pages(stub_server, memory_storage, monkeypatch):
+    directory = FakeDirectory()
+    monkeypatch.setattr(social_links, "artist_directory", directory)
+    pool = BrowserPool(size=1, driver_factory=StubDriver)
+    resolver = SocialLinkResolver(base_url=stub_server, cache=PersistentTTLCache("cache/test_social_links.json", ttl_sec=3600),
+                                  browser_pool=pool)
+
+    artists = [
+        {"id": "artist_with_instagram", "name": "Linked Artist"},
+        {"id": "artist_without_instagram", "name": "Quiet Artist"},
+        {"id": "artist_consent_wall", "name": "Rendered Artist"},
+        {"id": "artist_missing", "name": "Gone Artist"},
+    ]
+    results = asyncio.run(resolver.resolve_many(artists))
+
+    assert results == {
+        "artist_with_instagram": "linked.artist_ig",
+        "artist_without_instagram": None,
+        "artist_consent_wall": "rendered_artist",
+        "artist_missing": None,
+    }
+    assert resolver.stats == {"cached": 0, "http": 2, "browser": 1, "failed": 1}
+    assert sorted(directory.recorded) == [
+        ("Linked Artist", "linked.artist_ig", "artist_with_instagram"),
+        ("Rendered Artist", "rendered_artist", "artist_consent_wall"),
+    ]
+
+    # Parsed pages, with or without a link, are cached; the missing page is retried next run
+    StubSpotifyHandler.requests = []
+    again = asyncio.run(resolver.resolve_many(artists))
+    assert again == results
+    assert resolver.stats == {"cached": 3, "http": 0, "browser": 0, "failed": 1}
+    assert StubSpotifyHandler.requests == ["/artist_missing", "/artist_missing?rendered=1"]